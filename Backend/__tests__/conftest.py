@@ -1,72 +1,271 @@
+import fcntl
+import hashlib
+import itertools
+import json
+import signal
 import subprocess
 import sys
 import pytest
 import time
 import requests
 import psycopg2
+from psycopg2 import sql
 import os
+from contextlib import contextmanager
 from dotenv import load_dotenv
 
-# wait_for_server_to_start does not currently work, leaving it here for future reference
-def wait_for_server_to_start(timeout=6):
-    """Wait for the server to start by polling a URL until it returns a successful response or the timeout expires."""
-    time.sleep(1)  # Wait a bit for the server to start
-    start_time = time.time()
-    while time.time() - start_time < timeout:
-        try:
-            response = requests.get(url)
-            if response.status_code == 200:
-                print("http://localhost:3000/health")
-                return
-        except requests.ConnectionError:
-            print("Server not ready, waiting...")
-            time.sleep(1)
-    raise RuntimeError("Server did not start within {} seconds".format(timeout))
-
-# TODO (optional): Get server to log to separate terminal window
+# Checks every API call the tests make for p95 latency regressions and query budgets
+pytest_plugins = ["latency_plugin", "query_count_plugin"]
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SERVER_URL = os.getenv("TEST_SERVER_URL", "http://localhost:3000")
+HEALTH_URL = f"{SERVER_URL}/api/health"
+
+def server_is_up():
+    try:
+        return requests.get(HEALTH_URL, timeout=1).status_code == 200
+    except requests.ConnectionError:
+        return False
+
+def wait_for_server_to_start(proc=None, timeout=30):
+    """Poll /api/health with exponential backoff (50ms doubling up to 1s) until it returns 200.
+    Fails early if the server process we started has already exited."""
+    delay = 0.05
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server_is_up():
+            return
+        if proc is not None and proc.poll() is not None:
+            raise RuntimeError(f"Server exited with code {proc.returncode} before becoming ready, see server.log")
+        time.sleep(delay)
+        delay = min(delay * 2, 1)
+    raise RuntimeError(f"Server did not answer {HEALTH_URL} within {timeout} seconds, see server.log")
+
+SRC_HASH_FILE = os.path.join(BACKEND_DIR, "dist", ".src-hash")
+
+def source_hash():
+    """sha256 over src/ (relative paths and contents), to tell whether dist/ was built from it"""
+    src = os.path.join(BACKEND_DIR, "src")
+    digest = hashlib.sha256()
+    paths = sorted(os.path.join(root, name) for root, _, names in os.walk(src) for name in names)
+    for path in paths:
+        digest.update(os.path.relpath(path, src).encode() + b"\0")
+        with open(path, "rb") as f:
+            digest.update(f.read() + b"\0")
+    return digest.hexdigest()
+
+def build_if_stale():
+    """Run `npm run build` unless dist/ was built from the current src/. Called with the
+    server.json lock held, so only one xdist worker builds."""
+    current = source_hash()
+    built = None
+    if os.path.exists(SRC_HASH_FILE):
+        with open(SRC_HASH_FILE) as f:
+            built = f.read().strip()
+    if built == current and os.path.exists(os.path.join(BACKEND_DIR, "dist", "index.js")):
+        return
+    result = subprocess.run(["npm", "run", "build"], cwd=BACKEND_DIR, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"`npm run build` failed, the tests would run stale code:\n{result.stdout}{result.stderr}")
+    with open(SRC_HASH_FILE, "w") as f:
+        f.write(current + "\n")
+
+def start_server():
+    """Build dist/ if src/ changed since the last build, then start it in its own session,
+    so it outlives the xdist worker that happened to start it."""
+    build_if_stale()
+    entry = os.path.join(BACKEND_DIR, "dist", "index.js")
+
+    log = open(os.path.join(BACKEND_DIR, "__tests__", "server.log"), "w")
+    proc = subprocess.Popen(
+        ["node", entry],
+        cwd=BACKEND_DIR,
+        env={**os.environ, "NODE_ENV": "test", "ALLOW_TEST_TOKENS": "1"},
+        stdout=log,
+        stderr=log,
+        start_new_session=True,
+    )
+    log.close()
+    wait_for_server_to_start(proc)
+    return proc.pid
+
+@contextmanager
+def locked_state(path):
+    """Exclusive lock on a small JSON file shared by all xdist workers"""
+    with open(path + ".lock", "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        state = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                state = json.load(f)
+        yield state
+        with open(path, "w") as f:
+            json.dump(state, f, indent=2, sort_keys=True)
+            f.write("\n")
+
 @pytest.fixture(scope="session", autouse=True)
-def server():
-    # Open a log file where server outputs will be redirected
-    with open('server.log', 'w') as f:
-        try:
-            response = requests.get("http://localhost:3000/health")
-            if response.status_code == 200:
-                print("Server is already running!")
-                yield
-                return
-        except requests.ConnectionError:
-            pass
-        
-        # Start the server as a subprocess, redirecting stdout and stderr to the log file
-        proc = subprocess.Popen(
-            ["npx", "ts-node", "daytz-app/BE-Daytz/src/index.ts"],
-            stdout=f,
-            stderr=f,
-        )
-        
-        # Wait for the server to start
-        # time.sleep(4)
-        wait_for_server_to_start()
-        
-        # Let pytest run tests while the server is running
+def server(request, tmp_path_factory, worker_id):
+    """One API server for the whole run. The first worker to get the lock starts dist/index.js
+    (or adopts a server that is already running), the others just register, and the last
+    worker to finish stops it if we started it. Not started when every test is db_only."""
+    if all(item.get_closest_marker("db_only") for item in request.session.items):
         yield
-        
-        # After tests complete, terminate the server and wait for it to finish
-        proc.terminate()
-        proc.wait()
+        return
+
+    # With xdist each worker has its own basetemp, their shared parent is the same for all
+    root = tmp_path_factory.getbasetemp()
+    if worker_id != "master":
+        root = root.parent
+    state_path = str(root / "server.json")
+
+    with locked_state(state_path) as state:
+        if not state.get("users"):
+            state["pid"] = None if server_is_up() else start_server()
+            print("Server is already running!" if state["pid"] is None else f"Started server (pid {state['pid']})")
+        state["users"] = state.get("users", 0) + 1
+
+    yield
+
+    with locked_state(state_path) as state:
+        state["users"] -= 1
+        if state["users"] == 0 and state["pid"] is not None:
+            try:
+                os.kill(state["pid"], signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+            state["pid"] = None
 
 
 load_dotenv()
 
+def pytest_addoption(parser):
+    parser.addoption("--plan-budget-update", action="store_true",
+                     help="test_queryPlans: write the shared buffers seen per query to plan_budgets.json "
+                          "instead of enforcing it")
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "db_only: talks to the database directly and needs no API server")
+
+@pytest.fixture(scope="session")
+def worker_id(request):
+    """pytest-xdist worker name (gw0, gw1, ...), or 'master' when running serially"""
+    if hasattr(request.config, "workerinput"):
+        return request.config.workerinput["workerid"]
+    return "master"
+
 @pytest.fixture(scope="session")
-def db_conn():
-    """Setup for the database connection"""
+def db_conn(worker_id):
+    """Setup for the database connection, one per xdist worker.
+    Test data is kept apart by the per-worker user IDs in test_setup_helpers (WORKER_PREFIX),
+    and application_name shows which worker a connection belongs to in pg_stat_activity."""
     conn = psycopg2.connect(
         dbname=os.getenv("DB_NAME"),
         user=os.getenv("DB_USER"),
         password=os.getenv("DB_PASSWORD"),
         host=os.getenv("DB_HOST"),
         port=os.getenv("DB_PORT"),
+        application_name=f"pytest-{worker_id}",
     )
     yield conn
-    conn.close()
\ No newline at end of file
+    conn.close()
+
+# --- Cheaper isolation than delete_user_cascade ---
+
+CREATE_SQL = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "db", "scripts", "create.sql")
+clone_numbers = itertools.count()
+
+def connect(dbname):
+    return psycopg2.connect(
+        dbname=dbname,
+        user=os.getenv("DB_USER"),
+        password=os.getenv("DB_PASSWORD"),
+        host=os.getenv("DB_HOST"),
+        port=os.getenv("DB_PORT"),
+    )
+
+class RollbackConnection:
+    """Stands in for db_conn inside db_rollback. commit() only moves the savepoint forward,
+    rollback() returns to it, and nothing is really committed until the fixture rolls it all back."""
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    def commit(self):
+        with self._conn.cursor() as cur:
+            cur.execute("RELEASE SAVEPOINT test_case; SAVEPOINT test_case")
+
+    def rollback(self):
+        with self._conn.cursor() as cur:
+            cur.execute("ROLLBACK TO SAVEPOINT test_case")
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+@pytest.fixture
+def db_rollback(db_conn):
+    """Direct DB setup wrapped in a SAVEPOINT and rolled back after the test, instead of
+    committed and cascade-deleted. The rows are never committed, so the API server can't
+    see them: tests that call the API should use server_db."""
+    db_conn.rollback()
+    with db_conn.cursor() as cur:
+        cur.execute("SAVEPOINT test_case")
+    yield RollbackConnection(db_conn)
+    db_conn.rollback()
+
+@pytest.fixture(scope="session")
+def template_database():
+    """Database with the current create.sql applied, used as the template for server_db clones.
+    Rebuilt when create.sql changes (its hash is kept as the database comment)."""
+    name = os.getenv("TEST_TEMPLATE_DB", f"{os.getenv('DB_NAME')}_template")
+    with open(CREATE_SQL, "rb") as f:
+        digest = hashlib.sha256(f.read()).hexdigest()[:16]
+
+    admin = connect(os.getenv("TEST_ADMIN_DB", "postgres"))
+    admin.autocommit = True
+    cur = admin.cursor()
+    # Only one xdist worker builds the template, the others wait here and then reuse it
+    cur.execute("SELECT pg_advisory_lock(hashtext(%s))", (name,))
+    try:
+        cur.execute("SELECT shobj_description(oid, 'pg_database') FROM pg_database WHERE datname = %s", (name,))
+        row = cur.fetchone()
+        if row is None or row[0] != digest:
+            cur.execute(sql.SQL("DROP DATABASE IF EXISTS {} WITH (FORCE)").format(sql.Identifier(name)))
+            cur.execute(sql.SQL("CREATE DATABASE {}").format(sql.Identifier(name)))
+            template = connect(name)
+            template.autocommit = True
+            with open(CREATE_SQL) as f, template.cursor() as template_cur:
+                template_cur.execute(f.read())
+            template.close()
+            cur.execute(sql.SQL("COMMENT ON DATABASE {} IS {}").format(sql.Identifier(name), sql.Literal(digest)))
+    finally:
+        cur.execute("SELECT pg_advisory_unlock(hashtext(%s))", (name,))
+        admin.close()
+    return name
+
+@pytest.fixture
+def server_db(template_database, worker_id, monkeypatch):
+    """Fresh database cloned from the template for one test, visible to the API server.
+    Every `requests` call made during the test carries X-Test-Database, which a server
+    started with NODE_ENV=test uses for that request's queries. The clone is dropped
+    afterwards, so setup can commit freely and needs no cascade deletes."""
+    name = f"{template_database}_{worker_id}_{next(clone_numbers)}"
+    admin = connect(os.getenv("TEST_ADMIN_DB", "postgres"))
+    admin.autocommit = True
+    with admin.cursor() as cur:
+        cur.execute(sql.SQL("CREATE DATABASE {} TEMPLATE {}").format(
+            sql.Identifier(name), sql.Identifier(template_database)))
+    conn = connect(name)
+
+    send = requests.Session.request
+    def request(session, method, url, **kwargs):
+        headers = dict(kwargs.pop("headers", None) or {})
+        headers.setdefault("X-Test-Database", name)
+        return send(session, method, url, headers=headers, **kwargs)
+    monkeypatch.setattr(requests.Session, "request", request)
+
+    yield conn
+
+    conn.close()
+    with admin.cursor() as cur:
+        cur.execute(sql.SQL("DROP DATABASE IF EXISTS {} WITH (FORCE)").format(sql.Identifier(name)))
+    admin.close()
@@ -0,0 +1,266 @@
+# generateSyntheticDataset.py
+# Fill a local database with production-sized synthetic data for scale testing:
+#   python generateSyntheticDataset.py --users 1000000 --truncate
+# Rows are generated in numpy chunks and streamed through COPY FROM STDIN, one transaction
+# per table, instead of one INSERT per row like test_setup_helpers.setup_test_data.
+import argparse
+import io
+import os
+import sys
+import time
+from datetime import date as date_type
+
+import numpy as np
+import pandas as pd
+import psycopg2
+from psycopg2 import sql
+from dotenv import load_dotenv
+
+DATA_PREPARATION_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'dataPreparation')
+sys.path.insert(0, DATA_PREPARATION_DIR)
+from geoCells import geohash_encode  # noqa: E402
+
+ZIPCODE_CSV = os.path.join(DATA_PREPARATION_DIR, 'US_zipcodes_longitude_and_latitude.csv')
+USER_GEO_CELL_PRECISION = 4  # Same as src/geoCell.ts
+SYNTHETIC_TABLES = ('users', 'calendar_day', 'attractions', 'dates', 'transactions', 'notifications')
+
+FIRST_NAMES = np.array(['James', 'Mary', 'John', 'Patricia', 'Robert', 'Jennifer', 'Michael', 'Linda',
+                        'David', 'Elizabeth', 'Maria', 'Daniel', 'Sofia', 'Wei', 'Aisha', 'Carlos'])
+LAST_NAMES = np.array(['Smith', 'Johnson', 'Williams', 'Brown', 'Jones', 'Garcia', 'Miller', 'Davis',
+                       'Rodriguez', 'Martinez', 'Nguyen', 'Khan', 'Patel', 'Kim', 'Lee', 'Wilson'])
+PROCESSING_STATUSES = (np.array(['complete', 'pending', 'failed']), [0.9, 0.08, 0.02])
+DATE_STATUSES = (np.array(['pending', 'approved', 'declined', 'cancelled', 'completed']),
+                 [0.3, 0.25, 0.15, 0.1, 0.2])
+TRANSACTION_TYPES = (np.array(['replenishment', 'purchase', 'deduction', 'bonus']), [0.4, 0.1, 0.45, 0.05])
+NOTIFICATION_TYPES = np.array(['ATTRACTION_PROPOSAL', 'MATCH_PROPOSAL', 'DATE_PROPOSAL', 'DATE_APPROVED',
+                               'DATE_DECLINED', 'DATE_CANCELLED'])
+NEIGHBOR_SPAN = 2000  # Users interact with others at most this many rows away, i.e. nearby (see generate_users)
+
+def db_conn():
+    load_dotenv()
+    return psycopg2.connect(
+        dbname=os.getenv("DB_NAME"),
+        user=os.getenv("DB_USER"),
+        password=os.getenv("DB_PASSWORD"),
+        host=os.getenv("DB_HOST"),
+        port=os.getenv("DB_PORT"),
+    )
+
+def user_ids(prefix, index):
+    return np.char.add(prefix, np.asarray(index).astype(str))
+
+def choose(rng, choices, size):
+    values, weights = choices
+    return rng.choice(values, size=size, p=weights)
+
+# Zipcode rows for every user. Users are spread like zipcodes (dense where people live)
+# and ordered by geohash, so users with nearby row numbers also live near each other.
+def sample_locations(count, rng):
+    zips = pd.read_csv(ZIPCODE_CSV, dtype={'zipcode': str})
+    zips['zipcode'] = zips['zipcode'].str.zfill(5)
+    pick = np.sort(rng.integers(0, len(zips), count))
+    lon = zips['longitude'].to_numpy()[pick]
+    lat = zips['latitude'].to_numpy()[pick]
+    cells = geohash_encode(lon, lat, USER_GEO_CELL_PRECISION)
+    order = np.argsort(cells, kind='stable')
+    return zips['zipcode'].to_numpy()[pick][order], lat[order], lon[order], cells[order]
+
+# Another user a short hop away in geohash order, never the user itself. The hop stays below
+# user_count, so wrapping around can't land back on the source (needs at least 2 users).
+def nearby_users(rng, source, user_count):
+    span = min(NEIGHBOR_SPAN, user_count)
+    offset = rng.integers(1, span, len(source)) * rng.choice([-1, 1], len(source))
+    return (source + offset) % user_count
+
+# 'YYYY-MM-DD' strings within `days` of end_date. Picked from a small lookup table,
+# formatting millions of datetimes one by one is the slowest part otherwise.
+def random_dates(rng, size, end_date, days):
+    window = pd.date_range(end=end_date, periods=days, freq='D').strftime('%Y-%m-%d').to_numpy().astype(str)
+    return window[rng.integers(0, days, size)]
+
+def random_timestamps(rng, size, end_date, days):
+    hours = np.char.add(np.char.add(' ', np.char.zfill(np.arange(24).astype(str), 2)), ':00:00+00')
+    return np.char.add(random_dates(rng, size, end_date, days), hours[rng.integers(0, 24, size)])
+
+def generate_users(rng, start, stop, locations, prefix):
+    zipcode, lat, lon, cells = (a[start:stop] for a in locations)
+    n = stop - start
+    ids = user_ids(prefix, np.arange(start, stop))
+    return pd.DataFrame({
+        'user_id': ids,
+        'email': np.char.add(ids, '@example.com'),
+        'first_name': rng.choice(FIRST_NAMES, n),
+        'last_name': rng.choice(LAST_NAMES, n),
+        'zipcode': zipcode,
+        'latitude': lat,
+        'longitude': lon,
+        'geo_cell': cells,
+        'tokens': rng.integers(0, 500, n),
+        'enable_notifications': rng.random(n) < 0.8,
+        'is_profile_complete': rng.random(n) < 0.9,
+        'has_seen_calendar_tutorial': rng.random(n) < 0.7,
+    })
+
+def generate_calendar_days(rng, start, stop, args, prefix):
+    n = stop - start
+    per_user = rng.binomial(args.days, args.story_rate, n)
+    owner = np.repeat(np.arange(start, stop), per_user)
+    frame = pd.DataFrame({'user_id': user_ids(prefix, owner),
+                          'date': random_dates(rng, len(owner), args.end_date, args.days)})
+    frame = frame.drop_duplicates(['user_id', 'date'])
+    video_ids = rng.integers(100_000_000, 999_999_999, len(frame)).astype(str)
+    frame['user_video_url'] = np.char.add('https://vimeo.com/', video_ids)
+    frame['vimeo_uri'] = np.char.add('/videos/', video_ids)
+    frame['processing_status'] = choose(rng, PROCESSING_STATUSES, len(frame))
+    return frame
+
+# (user_from, user_to, date) rows for a table with that unique key, Poisson per user
+def generate_pairs(rng, start, stop, rate, args, prefix):
+    n = stop - start
+    source = np.repeat(np.arange(start, stop), rng.poisson(rate, n))
+    frame = pd.DataFrame({
+        'user_from': user_ids(prefix, source),
+        'user_to': user_ids(prefix, nearby_users(rng, source, args.users)),
+        'date': random_dates(rng, len(source), args.end_date, args.days),
+    })
+    return frame.drop_duplicates(['user_from', 'user_to', 'date']).reset_index(drop=True)
+
+def generate_attractions(rng, start, stop, args, prefix):
+    frame = generate_pairs(rng, start, stop, args.attractions_per_user, args, prefix)
+    n = len(frame)
+    for rating in ('romantic_rating', 'sexual_rating', 'friendship_rating'):
+        frame[rating] = rng.integers(0, 4, n)
+    for flag in ('long_term_potential', 'intellectual', 'emotional'):
+        frame[flag] = rng.random(n) < 0.5
+    frame['result'] = rng.random(n) < 0.3
+    frame['first_message_rights'] = frame['result'] & (rng.random(n) < 0.5)
+    return frame
+
+def generate_dates(rng, start, stop, args, prefix):
+    frame = generate_pairs(rng, start, stop, args.dates_per_user, args, prefix)
+    n = len(frame)
+    status = choose(rng, DATE_STATUSES, n)
+    frame['time'] = np.char.add(rng.integers(11, 22, n).astype(str), ':00:00+00')
+    frame['location_metadata'] = '{"name": "Synthetic Cafe", "address": "1 Main St"}'
+    frame['status'] = status
+    frame['user_from_approved'] = True
+    frame['user_to_approved'] = np.isin(status, ['approved', 'completed'])
+    return frame
+
+def generate_transactions(rng, start, stop, args, prefix):
+    owner = np.repeat(np.arange(start, stop), rng.poisson(args.transactions_per_user, stop - start))
+    n = len(owner)
+    kind = choose(rng, TRANSACTION_TYPES, n)
+    amount = rng.integers(1, 100, n)
+    return pd.DataFrame({
+        'user_id': user_ids(prefix, owner),
+        'transaction_type': kind,
+        'token_amount': np.where(kind == 'deduction', -amount, amount),
+        'amount_usd': np.where(kind == 'purchase', amount / 10, 0.0).round(2),
+        'description': 'Synthetic ' + kind.astype(object),
+        'transaction_date': random_timestamps(rng, n, args.end_date, args.days),
+    })
+
+def generate_notifications(rng, start, stop, args, prefix):
+    owner = np.repeat(np.arange(start, stop), rng.poisson(args.notifications_per_user, stop - start))
+    n = len(owner)
+    kind = pd.Series(rng.choice(NOTIFICATION_TYPES, n))
+    return pd.DataFrame({
+        'user_id': user_ids(prefix, owner),
+        'message': 'Synthetic ' + kind.str.lower().str.replace('_', ' '),
+        'type': kind,
+        'status': np.where(rng.random(n) < 0.6, 'read', 'unread'),
+        'proposing_user_id': user_ids(prefix, nearby_users(rng, owner, args.users)),
+        'created_at': random_timestamps(rng, n, args.end_date, args.days),
+    })
+
+GENERATORS = {
+    'calendar_day': generate_calendar_days,
+    'attractions': generate_attractions,
+    'dates': generate_dates,
+    'transactions': generate_transactions,
+    'notifications': generate_notifications,
+}
+
+# Stream DataFrame chunks into `table` with COPY, one transaction for the whole table
+def copy_chunks(conn, table, chunks):
+    rows = 0
+    start = time.perf_counter()
+    with conn, conn.cursor() as cur:
+        for frame in chunks:
+            buffer = io.StringIO()
+            frame.to_csv(buffer, index=False, header=False)
+            buffer.seek(0)
+            cur.copy_expert(
+                sql.SQL('COPY {} ({}) FROM STDIN WITH (FORMAT csv)').format(
+                    sql.Identifier(table), sql.SQL(', ').join(map(sql.Identifier, frame.columns))),
+                buffer,
+            )
+            rows += len(frame)
+        cur.execute(sql.SQL('ANALYZE {}').format(sql.Identifier(table)))
+    elapsed = time.perf_counter() - start
+    print(f'{table}: {rows} rows in {elapsed:.1f}s ({rows / max(elapsed, 1e-9):.0f} rows/s)')
+    return rows
+
+def chunk_bounds(total, size):
+    for start in range(0, total, size):
+        yield start, min(start + size, total)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Bulk-load synthetic users, stories, attractions, dates, '
+                                                 'transactions and notifications with COPY.')
+    parser.add_argument('--users', type=int, default=1_000_000)
+    parser.add_argument('--days', type=int, default=30, help='Activity window in days (default: 30)')
+    parser.add_argument('--end-date', default=date_type.today().isoformat(), help='Last day of the window')
+    parser.add_argument('--story-rate', type=float, default=0.05,
+                        help='Chance a user posts a story on a given day (default: 0.05)')
+    parser.add_argument('--attractions-per-user', type=float, default=5)
+    parser.add_argument('--dates-per-user', type=float, default=0.5)
+    parser.add_argument('--transactions-per-user', type=float, default=3)
+    parser.add_argument('--notifications-per-user', type=float, default=4)
+    parser.add_argument('--chunk-users', type=int, default=100_000, help='Users per generated chunk')
+    parser.add_argument('--prefix', default='syn-', help='user_id prefix (default: syn-)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--truncate', action='store_true',
+                        help='TRUNCATE the synthetic tables (and everything referencing users) first')
+    args = parser.parse_args(argv)
+    if args.users < 2:
+        parser.error('--users must be at least 2, attractions and dates need a second user')
+    return args
+
+# Also used by test_queryPlans.py to fill its own database
+def load(conn, args):
+    rng = np.random.default_rng(args.seed)
+    locations = sample_locations(args.users, rng)
+    if args.truncate:
+        with conn, conn.cursor() as cur:
+            cur.execute(sql.SQL('TRUNCATE TABLE {} RESTART IDENTITY CASCADE').format(
+                sql.SQL(', ').join(map(sql.Identifier, SYNTHETIC_TABLES))))
+
+    total = copy_chunks(conn, 'users', (
+        generate_users(rng, lo, hi, locations, args.prefix)
+        for lo, hi in chunk_bounds(args.users, args.chunk_users)))
+    # Every other table references users, so they go in after all users exist
+    for table, generate in GENERATORS.items():
+        total += copy_chunks(conn, table, (
+            generate(rng, lo, hi, args, args.prefix)
+            for lo, hi in chunk_bounds(args.users, args.chunk_users)))
+    # story_feed is filled by the calendar_day insert trigger, so it never went through copy_chunks
+    with conn, conn.cursor() as cur:
+        cur.execute('ANALYZE story_feed')
+    return total
+
+def main():
+    args = parse_args()
+    start = time.perf_counter()
+    conn = db_conn()
+    try:
+        total = load(conn, args)
+    finally:
+        conn.close()
+
+    elapsed = time.perf_counter() - start
+    print(f'Loaded {total} rows in {elapsed:.1f}s ({total / elapsed:.0f} rows/s)')
+
+if __name__ == '__main__':
+    main()
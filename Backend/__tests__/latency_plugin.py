@@ -0,0 +1,145 @@
+# latency_plugin.py
+# Latency regression gate for the API tests, loaded from conftest.py (pytest_plugins).
+# Every HTTP call the tests make through `requests` is timed and grouped by endpoint
+# ("GET /calendar/:param"). At the end of the run each endpoint's p95 is compared with
+# latency_baseline.json and the run fails (or just warns) when it got slower than
+# baseline * --latency-threshold + --latency-slack-ms. With no baseline at all, --latency-mode
+# decides too: the run fails rather than passing without a gate. The committed baseline is for
+# the reference environment; entries with "samples": 0 are hand-set ceilings not yet recorded.
+#
+#   pytest --latency-update            # record a new baseline on the reference env, commit the JSON
+#   pytest                             # compare against it
+#   pytest --latency-mode=warn         # report regressions without failing
+import json
+import os
+import re
+import time
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+import pytest
+import requests
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "latency_baseline.json")
+IGNORED_PATHS = ("/health", "/api/health")  # readiness polling from the server fixture
+
+samples = defaultdict(list)
+
+def pytest_addoption(parser):
+    group = parser.getgroup("latency", "API latency regression gate")
+    group.addoption("--latency-baseline", default=DEFAULT_BASELINE,
+                    help="Baseline p95 per endpoint (default: __tests__/latency_baseline.json)")
+    group.addoption("--latency-update", action="store_true",
+                    help="Write this run's p95s to the baseline instead of comparing")
+    group.addoption("--latency-threshold", type=float, default=1.5,
+                    help="Fail when p95 exceeds baseline times this factor (default: 1.5)")
+    group.addoption("--latency-slack-ms", type=float, default=20,
+                    help="Extra allowance on top of the factor, so 3ms -> 6ms doesn't count (default: 20)")
+    group.addoption("--latency-mode", choices=("fail", "warn", "off"), default="fail",
+                    help="What a regression does (default: fail)")
+
+# Path segments with a digit in them are IDs or dates (/users/gw0-testUser123, /calendar/2024-01-01)
+def endpoint_for(method, url):
+    path = urlsplit(url).path.rstrip("/") or "/"
+    path = "/".join(":param" if re.search(r"\d", segment) else segment for segment in path.split("/"))
+    return f"{method.upper()} {path}"
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+def pytest_configure(config):
+    if config.getoption("latency_mode") == "off":
+        return
+    # Wrap Session.request, which requests.get/post/... all go through. server_db's monkeypatch
+    # wraps this one in turn, so its calls are timed as well.
+    send = requests.Session.request
+
+    def timed_request(session, method, url, *args, **kwargs):
+        start = time.perf_counter()
+        response = send(session, method, url, *args, **kwargs)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if urlsplit(url).path.rstrip("/") not in IGNORED_PATHS:
+            samples[endpoint_for(method, url)].append(elapsed_ms)
+        return response
+
+    requests.Session.request = timed_request
+    config._latency_send = send
+
+def pytest_unconfigure(config):
+    send = getattr(config, "_latency_send", None)
+    if send is not None:
+        requests.Session.request = send
+
+# Under xdist the controller runs no tests: each worker ships its samples back when it finishes
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node, error):
+    for endpoint, values in json.loads(node.workeroutput.get("latency_samples", "{}")).items():
+        samples[endpoint].extend(values)
+
+def load_baseline(path):
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+def find_regressions(baseline, threshold, slack_ms):
+    regressions = []
+    for endpoint, values in sorted(samples.items()):
+        expected = baseline.get(endpoint)
+        if expected is None:
+            continue
+        p95 = percentile(values, 0.95)
+        limit = expected["p95_ms"] * threshold + slack_ms
+        if p95 > limit:
+            regressions.append((endpoint, expected["p95_ms"], p95, limit))
+    return regressions
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_sessionfinish(session):
+    config = session.config
+    if config.getoption("latency_mode") == "off":
+        return
+    if hasattr(config, "workeroutput"):
+        config.workeroutput["latency_samples"] = json.dumps(samples)
+        return
+    if not samples:
+        return
+
+    path = config.getoption("latency_baseline")
+    if config.getoption("latency_update"):
+        with open(path, "w") as f:
+            json.dump({endpoint: {"p95_ms": round(percentile(values, 0.95), 1), "samples": len(values)}
+                       for endpoint, values in samples.items()}, f, indent=2, sort_keys=True)
+            f.write("\n")
+        config._latency_report = [f"Wrote p95 for {len(samples)} endpoints to {path}"]
+        return
+
+    baseline = load_baseline(path)
+    if baseline is None:
+        config._latency_report = [f"No latency baseline at {path}, run with --latency-update to record one"]
+        config._latency_regressed = config.getoption("latency_mode") == "fail"
+        if config._latency_regressed and session.exitstatus == pytest.ExitCode.OK:
+            session.exitstatus = pytest.ExitCode.TESTS_FAILED
+        return
+
+    regressions = find_regressions(baseline, config.getoption("latency_threshold"),
+                                   config.getoption("latency_slack_ms"))
+    new_endpoints = sorted(set(samples) - set(baseline))
+    report = [f"{endpoint}: p95 {p95:.1f}ms, baseline {expected:.1f}ms (limit {limit:.1f}ms)"
+              for endpoint, expected, p95, limit in regressions]
+    if new_endpoints:
+        report.append(f"Not in baseline: {', '.join(new_endpoints)}")
+    config._latency_report = report
+    config._latency_regressed = bool(regressions)
+    if regressions and config.getoption("latency_mode") == "fail" and session.exitstatus == pytest.ExitCode.OK:
+        session.exitstatus = pytest.ExitCode.TESTS_FAILED
+
+def pytest_terminal_summary(terminalreporter, config):
+    report = getattr(config, "_latency_report", None)
+    if not report:
+        return
+    regressed = getattr(config, "_latency_regressed", False)
+    terminalreporter.section("latency regressions" if regressed else "latency", red=regressed, yellow=not regressed)
+    for line in report:
+        terminalreporter.write_line(line)
@@ -0,0 +1,214 @@
+# loadGenerator.py
+# Open-loop load generator for the /api endpoints. Not a pytest module, run it directly:
+#   python loadGenerator.py --users 300 --rate 100 --duration 60
+# Requests arrive as a Poisson process at --rate no matter how slow the server gets, and
+# latency is measured from each request's scheduled arrival, so queueing shows up in p99
+# instead of silently lowering the offered load.
+# The server has to run with NODE_ENV=test ALLOW_TEST_TOKENS=1 to accept the `Bearer test-<user>`
+# tokens it sends.
+import argparse
+import asyncio
+import csv
+import json
+import os
+import random
+import time
+from collections import defaultdict
+from datetime import date as date_type
+
+import httpx
+import psycopg2
+from dotenv import load_dotenv
+
+from test_setup_helpers import default_calendar_days_data, delete_user_cascade, insert_calendar_day, insert_test_user
+
+ZIPCODE_CSV = os.path.join(os.path.dirname(__file__), '..', 'dataPreparation', 'US_zipcodes_longitude_and_latitude.csv')
+USER_PREFIX = 'load-'
+DEFAULT_MIX = 'stories=50,notifications=20,tokens=15,attraction=10,date=5'
+STORY_VIDEO_URIS = ['/videos/' + day['user_video_url'].rsplit('/', 1)[-1] for day in default_calendar_days_data]
+
+def db_connect():
+    load_dotenv()
+    return psycopg2.connect(
+        dbname=os.getenv("DB_NAME"),
+        user=os.getenv("DB_USER"),
+        password=os.getenv("DB_PASSWORD"),
+        host=os.getenv("DB_HOST"),
+        port=os.getenv("DB_PORT"),
+    )
+
+def sample_zipcodes(prefix, count, rng):
+    with open(ZIPCODE_CSV) as f:
+        rows = [(row['zipcode'].zfill(5), float(row['latitude']), float(row['longitude'])) for row in csv.DictReader(f)]
+    rows = [row for row in rows if row[0].startswith(prefix)] or rows
+    return [rng.choice(rows) for _ in range(count)]
+
+# Seed N users around one region (so stories within 200 miles overlap), each with a finished
+# story video on the load test date
+def seed_users(db_conn, count, story_date, zip_prefix, rng):
+    user_ids = [f'{USER_PREFIX}{i}' for i in range(count)]
+    cur = db_conn.cursor()
+    for user_id, (zipcode, latitude, longitude) in zip(user_ids, sample_zipcodes(zip_prefix, count, rng)):
+        delete_user_cascade(cur, user_id)
+        # users.email is UNIQUE NOT NULL in create.sql
+        insert_test_user(cur, user_id=user_id, first_name='Load', last_name=user_id, zipcode=zipcode,
+                         initial_token_amount=1_000_000, email=f'{user_id}@load.example.com')
+        cur.execute("UPDATE users SET latitude = %s, longitude = %s, tokens = 1000000 WHERE user_id = %s",
+                    (latitude, longitude, user_id))
+        insert_calendar_day(cur, user_id=user_id, date=story_date)
+        cur.execute(
+            "UPDATE calendar_day SET vimeo_uri = %s, processing_status = 'complete' WHERE user_id = %s AND date = %s",
+            (rng.choice(STORY_VIDEO_URIS), user_id, story_date),
+        )
+    db_conn.commit()
+    cur.close()
+    return user_ids
+
+def teardown_users(db_conn, user_ids):
+    cur = db_conn.cursor()
+    for user_id in user_ids:
+        delete_user_cascade(cur, user_id)
+    db_conn.commit()
+    cur.close()
+
+def parse_mix(mix):
+    weights = {}
+    for part in mix.split(','):
+        route, weight = part.split('=')
+        if route not in ROUTES:
+            raise SystemExit(f'Unknown route {route!r} in --mix, expected one of {", ".join(ROUTES)}')
+        weights[route] = float(weight)
+    return weights
+
+# Each route builds (method, path, json body) for a random user
+def stories(user_id, others, story_date, rng):
+    return 'GET', f'/stories/{story_date}', None
+
+def notifications(user_id, others, story_date, rng):
+    return 'GET', '/notifications', None
+
+def tokens(user_id, others, story_date, rng):
+    return 'GET', '/users/tokens', None
+
+def attraction(user_id, others, story_date, rng):
+    return 'POST', '/attraction', {
+        'userTo': rng.choice(others), 'date': story_date,
+        'romanticRating': rng.randint(0, 1), 'sexualRating': 0, 'friendshipRating': rng.randint(0, 1),
+    }
+
+def propose_date(user_id, others, story_date, rng):
+    return 'POST', '/date', {
+        'userTo': rng.choice(others), 'date': story_date, 'time': f'{rng.randint(12, 21)}:00',
+        'romanticRating': 1, 'sexualRating': 0, 'friendshipRating': 1,
+    }
+
+ROUTES = {
+    'stories': stories,
+    'notifications': notifications,
+    'tokens': tokens,
+    'attraction': attraction,
+    'date': propose_date,
+}
+
+async def send(client, route, method, path, body, user_id, scheduled, results):
+    headers = {'Authorization': f'Bearer test-{user_id}'}
+    try:
+        response = await client.request(method, path, json=body, headers=headers)
+        status = response.status_code
+    except httpx.HTTPError as e:
+        status = type(e).__name__
+    results[route].append((time.perf_counter() - scheduled, status))
+
+async def generate(args, user_ids):
+    rng = random.Random(args.seed)
+    mix = parse_mix(args.mix)
+    routes, weights = list(mix), list(mix.values())
+    results = defaultdict(list)
+    limits = httpx.Limits(max_connections=args.connections, max_keepalive_connections=args.connections)
+
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=args.timeout) as client:
+        tasks = []
+        start = time.perf_counter()
+        next_arrival = start
+        while next_arrival - start < args.duration:
+            delay = next_arrival - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            user_id = rng.choice(user_ids)
+            others = [u for u in rng.sample(user_ids, min(3, len(user_ids))) if u != user_id] or user_ids
+            route = rng.choices(routes, weights)[0]
+            method, path, body = ROUTES[route](user_id, others, args.date, rng)
+            tasks.append(asyncio.create_task(send(client, route, method, path, body, user_id, next_arrival, results)))
+            next_arrival += rng.expovariate(args.rate)
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - start
+    return results, elapsed
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+def summarize(results, elapsed):
+    summary = {}
+    for route, samples in sorted(results.items()):
+        latencies = sorted(latency * 1000 for latency, _ in samples)
+        statuses = defaultdict(int)
+        for _, status in samples:
+            statuses[str(status)] += 1
+        ok = sum(n for status, n in statuses.items() if status.startswith('2'))
+        summary[route] = {
+            'requests': len(samples),
+            'ok': ok,
+            'throughput_rps': round(ok / elapsed, 2),
+            'p50_ms': round(percentile(latencies, 0.50), 1),
+            'p95_ms': round(percentile(latencies, 0.95), 1),
+            'p99_ms': round(percentile(latencies, 0.99), 1),
+            'statuses': dict(statuses),
+        }
+    return summary
+
+def print_summary(summary, elapsed, rate):
+    print(f'\n{sum(s["requests"] for s in summary.values())} requests in {elapsed:.1f}s (offered {rate:g} req/s)')
+    print(f'{"route":<14}{"requests":>9}{"ok":>8}{"ok/s":>9}{"p50 ms":>9}{"p95 ms":>9}{"p99 ms":>9}  statuses')
+    for route, s in summary.items():
+        print(f'{route:<14}{s["requests"]:>9}{s["ok"]:>8}{s["throughput_rps"]:>9}{s["p50_ms"]:>9}'
+              f'{s["p95_ms"]:>9}{s["p99_ms"]:>9}  {s["statuses"]}')
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Open-loop load test for the /api endpoints.')
+    parser.add_argument('--base-url', default='http://localhost:3000/api')
+    parser.add_argument('--users', type=int, default=200, help='Synthetic users to seed (default: 200)')
+    parser.add_argument('--rate', type=float, default=50, help='Arrivals per second across all routes (default: 50)')
+    parser.add_argument('--duration', type=float, default=60, help='Seconds of arrivals (default: 60)')
+    parser.add_argument('--mix', default=DEFAULT_MIX, help=f'route=weight list (default: {DEFAULT_MIX})')
+    parser.add_argument('--date', default=date_type.today().isoformat(), help='Story and date-proposal day')
+    parser.add_argument('--zip-prefix', default='10', help='Seed users in zipcodes with this prefix (default: 10, NYC)')
+    parser.add_argument('--connections', type=int, default=500, help='HTTP connection pool size (default: 500)')
+    parser.add_argument('--timeout', type=float, default=30, help='Per-request timeout in seconds (default: 30)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--keep-data', action='store_true', help='Leave the seeded users in the database')
+    parser.add_argument('--output', help='Also write the per-route summary to this JSON file')
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    db_conn = db_connect()
+    user_ids = seed_users(db_conn, args.users, args.date, args.zip_prefix, random.Random(args.seed))
+    print(f'Seeded {len(user_ids)} users, offering {args.rate:g} req/s for {args.duration:g}s to {args.base_url}')
+    try:
+        results, elapsed = asyncio.run(generate(args, user_ids))
+    finally:
+        if not args.keep_data:
+            teardown_users(db_conn, user_ids)
+        db_conn.close()
+
+    summary = summarize(results, elapsed)
+    print_summary(summary, elapsed, args.rate)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'rate': args.rate, 'duration': args.duration, 'users': args.users,
+                       'elapsed_seconds': round(elapsed, 2), 'routes': summary}, f, indent=2)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,224 @@
+# queryStatsReport.py
+# Which queries dominate database time during a load scenario, per repository method.
+# Not a pytest module, run it directly:
+#   python queryStatsReport.py --scenario "python loadGenerator.py --rate 50 --duration 60" --output perf/stories
+# Resets pg_stat_statements, runs the scenario command, then reads pg_stat_statements back and
+# writes <output>.md and <output>.json. Each normalized statement is matched to the method in
+# src/ whose SQL template it came from (CalendarDayRepository.findNearbyStoriesByDate, ...).
+# Needs pg_stat_statements in shared_preload_libraries on the database server.
+import argparse
+import difflib
+import json
+import os
+import re
+import shlex
+import subprocess
+import sys
+import time
+
+import psycopg2
+import psycopg2.extras
+from dotenv import load_dotenv
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+SQL_START = re.compile(r'^\s*(SELECT|INSERT|UPDATE|DELETE|WITH|BEGIN|COMMIT|ROLLBACK)\b', re.IGNORECASE)
+CLASS_DEF = re.compile(r'^(?:export\s+)?(?:default\s+)?class\s+(\w+)')
+METHOD_DEF = re.compile(r'^  (?:(?:public|private|protected|static|async)\s+)*(\w+)\s*(?:<[^>]*>)?\(')
+FUNCTION_DEF = re.compile(r'^(?:export\s+)?(?:const\s+(\w+)\s*=|(?:async\s+)?function\s+(\w+))')
+NOT_METHODS = {'if', 'for', 'while', 'switch', 'catch', 'return', 'constructor', 'super'}
+TRANSACTION_CONTROL = {'begin', 'commit', 'rollback'}
+MATCH_THRESHOLD = 0.6
+
+def db_connect():
+    load_dotenv()
+    return psycopg2.connect(
+        dbname=os.getenv("DB_NAME"),
+        user=os.getenv("DB_USER"),
+        password=os.getenv("DB_PASSWORD"),
+        host=os.getenv("DB_HOST"),
+        port=os.getenv("DB_PORT"),
+    )
+
+# Keywords and identifiers only: $1 placeholders, literals, ${...} interpolations and comments
+# differ between the TS template and pg_stat_statements' normalized text, the words don't
+def sql_tokens(text):
+    text = re.sub(r'\$\{[^}]*\}', ' ', text)
+    text = re.sub(r'--[^\n]*', ' ', text)
+    text = re.sub(r"'(?:[^']|'')*'", ' ', text)
+    return re.findall(r'[a-z_][a-z0-9_]*', text.lower())
+
+# Which method each line of a TS file belongs to: Class.method inside a class, else the
+# top-level function or const (handlers are `export const xHandler = asyncHandler(...)`)
+def owners_by_line(lines, module):
+    owners, current_class, current = [], None, module
+    for line in lines:
+        class_match = CLASS_DEF.match(line)
+        if class_match:
+            current_class, current = class_match.group(1), class_match.group(1)
+        elif line.startswith('}'):
+            current_class = None
+        elif current_class:
+            method_match = METHOD_DEF.match(line)
+            if method_match and method_match.group(1) not in NOT_METHODS:
+                current = f'{current_class}.{method_match.group(1)}'
+        else:
+            function_match = FUNCTION_DEF.match(line)
+            if function_match:
+                current = f'{module}.{function_match.group(1) or function_match.group(2)}'
+        owners.append(current)
+    return owners
+
+# Every SQL string literal in src/, with the method it sits in
+def find_sql_templates(src_dir=SRC_DIR):
+    templates = []
+    for root, _, names in os.walk(src_dir):
+        for name in sorted(names):
+            if not name.endswith('.ts') or name.endswith('.d.ts'):
+                continue
+            path = os.path.join(root, name)
+            with open(path) as f:
+                source = f.read()
+            owners = owners_by_line(source.splitlines(), name[:-3])
+            for match in re.finditer(r"`([^`]*)`|'((?:[^'\\\n]|\\.)*)'", source):
+                text = match.group(1) if match.group(1) is not None else match.group(2)
+                if not SQL_START.match(text):
+                    continue
+                line = source.count('\n', 0, match.start())
+                templates.append({
+                    'method': owners[line],
+                    'file': os.path.relpath(path, os.path.join(src_dir, '..')),
+                    'line': line + 1,
+                    'tokens': sql_tokens(text),
+                    'text': text,
+                })
+    return templates
+
+def match_method(query, templates):
+    tokens = sql_tokens(query)
+    if len(tokens) == 1 and tokens[0] in TRANSACTION_CONTROL:
+        return 'transaction control', None
+    best, best_score = None, 0.0
+    for template in templates:
+        if template['tokens'][:1] != tokens[:1]:
+            continue
+        score = difflib.SequenceMatcher(None, tokens, template['tokens'], autojunk=False).ratio()
+        if score > best_score:
+            best, best_score = template, score
+    if best is None or best_score < MATCH_THRESHOLD:
+        return None, None
+    return best['method'], f"{best['file']}:{best['line']}"
+
+def reset_stats(cur):
+    cur.execute("CREATE EXTENSION IF NOT EXISTS pg_stat_statements")
+    cur.execute("SELECT pg_stat_statements_reset()")
+
+# total_exec_time/mean_exec_time since PG 13, total_time/mean_time before
+def read_stats(cur):
+    cur.execute("SELECT attname FROM pg_attribute WHERE attrelid = 'pg_stat_statements'::regclass")
+    columns = {row['attname'] for row in cur.fetchall()}
+    total, mean = ('total_exec_time', 'mean_exec_time') if 'total_exec_time' in columns else ('total_time', 'mean_time')
+    cur.execute(f"""
+        SELECT query, calls, {total} AS total_ms, {mean} AS mean_ms, rows,
+               shared_blks_hit, shared_blks_read
+        FROM pg_stat_statements
+        WHERE dbid = (SELECT oid FROM pg_database WHERE datname = current_database())
+          AND query NOT ILIKE '%%pg_stat_statements%%'
+        ORDER BY {total} DESC
+    """)
+    return cur.fetchall()
+
+def build_report(stats, templates, top):
+    total_ms = sum(row['total_ms'] for row in stats) or 1
+    queries, by_method = [], {}
+    for row in stats:
+        method, location = match_method(row['query'], templates)
+        method = method or 'unmapped'
+        entry = {
+            'method': method,
+            'location': location,
+            'calls': row['calls'],
+            'total_ms': round(row['total_ms'], 2),
+            'mean_ms': round(row['mean_ms'], 3),
+            'share_pct': round(100 * row['total_ms'] / total_ms, 1),
+            'rows': row['rows'],
+            'shared_blks_hit': row['shared_blks_hit'],
+            'shared_blks_read': row['shared_blks_read'],
+            'query': ' '.join(row['query'].split()),
+        }
+        queries.append(entry)
+        summary = by_method.setdefault(method, {'method': method, 'calls': 0, 'total_ms': 0.0, 'rows': 0,
+                                                'shared_blks_hit': 0, 'shared_blks_read': 0})
+        for key in ('calls', 'total_ms', 'rows', 'shared_blks_hit', 'shared_blks_read'):
+            summary[key] += entry[key]
+    methods = sorted(by_method.values(), key=lambda m: m['total_ms'], reverse=True)
+    for summary in methods:
+        summary['total_ms'] = round(summary['total_ms'], 2)
+        summary['mean_ms'] = round(summary['total_ms'] / summary['calls'], 3) if summary['calls'] else 0
+        summary['share_pct'] = round(100 * summary['total_ms'] / total_ms, 1)
+    return {'total_ms': round(total_ms, 2), 'methods': methods, 'queries': queries[:top]}
+
+def hit_ratio(entry):
+    blocks = entry['shared_blks_hit'] + entry['shared_blks_read']
+    return f"{100 * entry['shared_blks_hit'] / blocks:.1f}%" if blocks else '-'
+
+def to_markdown(report, title):
+    lines = [f'# {title}', '', f"Total database time: {report['total_ms']:.0f} ms", '',
+             '## By method', '',
+             '| Method | Calls | Total ms | Share | Mean ms | Rows | Buffer hits | Reads | Hit ratio |',
+             '|---|---:|---:|---:|---:|---:|---:|---:|---:|']
+    for m in report['methods']:
+        lines.append(f"| `{m['method']}` | {m['calls']} | {m['total_ms']:.1f} | {m['share_pct']}% | {m['mean_ms']:.2f} "
+                     f"| {m['rows']} | {m['shared_blks_hit']} | {m['shared_blks_read']} | {hit_ratio(m)} |")
+    lines += ['', f"## Top {len(report['queries'])} statements", '',
+              '| Method | Calls | Total ms | Share | Mean ms | Rows | Hit ratio | Query |',
+              '|---|---:|---:|---:|---:|---:|---:|---|']
+    for q in report['queries']:
+        query = q['query'] if len(q['query']) <= 160 else q['query'][:157] + '...'
+        query = query.replace('|', r'\|')
+        lines.append(f"| `{q['method']}` | {q['calls']} | {q['total_ms']:.1f} | {q['share_pct']}% | {q['mean_ms']:.2f} "
+                     f"| {q['rows']} | {hit_ratio(q)} | `{query}` |")
+    return '\n'.join(lines) + '\n'
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='pg_stat_statements report per repository method for a load scenario.')
+    parser.add_argument('--scenario', help='Command to run between reset and snapshot, e.g. "python loadGenerator.py --duration 60". '
+                                           'Without it, reports whatever ran since the last reset')
+    parser.add_argument('--no-reset', action='store_true', help='Keep the existing pg_stat_statements counters')
+    parser.add_argument('--top', type=int, default=25, help='Statements listed individually (default: 25)')
+    parser.add_argument('--title', default='Query time by repository method')
+    parser.add_argument('--output', default='query_stats', help='Writes <output>.md and <output>.json (default: query_stats)')
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    conn = db_connect()
+    conn.autocommit = True
+    cur = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+
+    if not args.no_reset:
+        try:
+            reset_stats(cur)
+        except psycopg2.Error as e:
+            sys.exit(f'Could not reset pg_stat_statements ({e.pgerror or e}). '
+                     "Is it in shared_preload_libraries and does this user have access?")
+    if args.scenario:
+        print(f'Running scenario: {args.scenario}')
+        start = time.perf_counter()
+        result = subprocess.run(shlex.split(args.scenario), cwd=os.path.dirname(os.path.abspath(__file__)))
+        print(f'Scenario exited with {result.returncode} after {time.perf_counter() - start:.1f}s')
+
+    report = build_report(read_stats(cur), find_sql_templates(), args.top)
+    report['scenario'] = args.scenario
+    conn.close()
+
+    with open(f'{args.output}.json', 'w') as f:
+        json.dump(report, f, indent=2)
+        f.write('\n')
+    with open(f'{args.output}.md', 'w') as f:
+        f.write(to_markdown(report, args.title))
+    print(f"{len(report['methods'])} methods, {report['total_ms']:.0f} ms total. Wrote {args.output}.md and {args.output}.json")
+    for m in report['methods'][:5]:
+        print(f"  {m['share_pct']:>5}%  {m['total_ms']:>10.1f} ms  {m['calls']:>7} calls  {m['method']}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+# query_count_plugin.py
+# Query budget per endpoint for the API tests, loaded from conftest.py (pytest_plugins).
+# A server started with NODE_ENV=test sends X-Query-Count on every response (see src/db.ts).
+# Every call the tests make is checked against query_budgets.json, and a response that ran
+# more statements than its endpoint's budget fails the test that made it, so a new N+1 loop
+# shows up as a failure. For a single call, test_setup_helpers.assert_max_queries does the same.
+#
+#   pytest --query-budget-update       # record the most queries seen per endpoint, commit the JSON
+#   pytest                             # enforce it
+import json
+import os
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+import pytest
+import requests
+
+from latency_plugin import IGNORED_PATHS, endpoint_for
+from test_setup_helpers import query_count
+
+DEFAULT_BUDGETS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "query_budgets.json")
+
+observed = defaultdict(int)
+
+def pytest_addoption(parser):
+    group = parser.getgroup("querycount", "Per-endpoint query budgets")
+    group.addoption("--query-budgets", default=DEFAULT_BUDGETS,
+                    help="Max queries per endpoint (default: __tests__/query_budgets.json)")
+    group.addoption("--query-budget-update", action="store_true",
+                    help="Write the most queries seen per endpoint to the budgets file instead of enforcing it")
+
+def pytest_configure(config):
+    path = config.getoption("query_budgets")
+    update = config.getoption("query_budget_update")
+    budgets = {}
+    if not update and os.path.exists(path):
+        with open(path) as f:
+            budgets = json.load(f)
+
+    send = requests.Session.request
+
+    def counted_request(session, method, url, *args, **kwargs):
+        response = send(session, method, url, *args, **kwargs)
+        count = query_count(response)
+        if count is None or urlsplit(url).path.rstrip("/") in IGNORED_PATHS:
+            return response
+        endpoint = endpoint_for(method, url)
+        observed[endpoint] = max(observed[endpoint], count)
+        budget = budgets.get(endpoint)
+        if budget is not None and count > budget:
+            pytest.fail(f"{endpoint} ran {count} queries, its budget in {os.path.basename(path)} is {budget}")
+        return response
+
+    requests.Session.request = counted_request
+    config._query_count_send = send
+
+def pytest_unconfigure(config):
+    send = getattr(config, "_query_count_send", None)
+    if send is not None:
+        requests.Session.request = send
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node, error):
+    for endpoint, count in json.loads(node.workeroutput.get("query_counts", "{}")).items():
+        observed[endpoint] = max(observed[endpoint], count)
+
+def pytest_sessionfinish(session):
+    config = session.config
+    if hasattr(config, "workeroutput"):
+        config.workeroutput["query_counts"] = json.dumps(observed)
+        return
+    if not config.getoption("query_budget_update") or not observed:
+        return
+    path = config.getoption("query_budgets")
+    with open(path, "w") as f:
+        json.dump(observed, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+def pytest_terminal_summary(terminalreporter, config):
+    if config.getoption("query_budget_update") and observed:
+        terminalreporter.section("query budgets")
+        terminalreporter.write_line(f"Wrote budgets for {len(observed)} endpoints to {config.getoption('query_budgets')}")
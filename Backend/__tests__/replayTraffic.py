@@ -0,0 +1,155 @@
+# replayTraffic.py
+# Replay recorded /api traffic against a local server, and compare two replays.
+# Not a pytest module, run it directly:
+#   python replayTraffic.py replay capture.jsonl --speed 10 --output before.json   # build A
+#   python replayTraffic.py replay capture.jsonl --speed 10 --output after.json    # build B
+#   python replayTraffic.py compare before.json after.json
+# The capture is the JSONL written by a server started with TRAFFIC_CAPTURE_FILE (see
+# src/trafficCapture.ts): one {"ts", "method", "path", "body", "user", ...} object per line.
+# Requests go out in capture order on the captured schedule (divided by --speed, or as fast
+# as --concurrency allows with --speed max) and authenticate as the captured user with
+# `Bearer test-<user>`, which a server started with NODE_ENV=test ALLOW_TEST_TOKENS=1 accepts.
+import argparse
+import asyncio
+import json
+import time
+from collections import defaultdict
+
+import httpx
+
+from latency_plugin import endpoint_for
+from loadGenerator import percentile
+
+def read_capture(path, limit=None):
+    with open(path) as f:
+        entries = [json.loads(line) for line in f if line.strip()]
+    entries.sort(key=lambda e: e['ts'])
+    return entries[:limit] if limit else entries
+
+async def send(client, index, entry, scheduled, results, semaphore):
+    headers = {'Authorization': f"Bearer test-{entry['user']}"} if entry.get('user') else {}
+    async with semaphore:
+        start = time.perf_counter()
+        try:
+            response = await client.request(entry['method'], entry['path'], json=entry.get('body'), headers=headers)
+            status = response.status_code
+        except httpx.HTTPError as e:
+            status = type(e).__name__
+        done = time.perf_counter()
+    results[index] = {
+        'endpoint': endpoint_for(entry['method'], entry['path']),
+        'status': status,
+        'captured_status': entry.get('status'),
+        'latency_ms': round((done - start) * 1000, 2),
+        'lag_ms': round((start - scheduled) * 1000, 2),  # time spent waiting past the captured schedule
+    }
+
+async def replay(entries, base_url, speed, concurrency, timeout):
+    results = [None] * len(entries)
+    semaphore = asyncio.Semaphore(concurrency)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=timeout) as client:
+        tasks = []
+        start = time.perf_counter()
+        first_ts = entries[0]['ts'] if entries else 0
+        for index, entry in enumerate(entries):
+            scheduled = start if speed is None else start + (entry['ts'] - first_ts) / 1000 / speed
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(send(client, index, entry, scheduled, results, semaphore)))
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - start
+    return results, elapsed
+
+def summarize(results):
+    by_endpoint = defaultdict(list)
+    for result in results:
+        by_endpoint[result['endpoint']].append(result)
+    summary = {}
+    for endpoint, samples in sorted(by_endpoint.items()):
+        latencies = sorted(s['latency_ms'] for s in samples)
+        summary[endpoint] = {
+            'requests': len(samples),
+            'errors': sum(1 for s in samples if not str(s['status']).startswith(('2', '3'))),
+            'status_changed': sum(1 for s in samples if s['captured_status'] not in (None, s['status'])),
+            'p50_ms': percentile(latencies, 0.50),
+            'p95_ms': percentile(latencies, 0.95),
+            'p99_ms': percentile(latencies, 0.99),
+        }
+    return summary
+
+def run_replay(args):
+    entries = read_capture(args.capture, args.limit)
+    speed = None if args.speed == 'max' else float(args.speed)
+    print(f"Replaying {len(entries)} requests from {args.capture} at {args.speed}{'' if speed is None else 'x'} "
+          f"to {args.base_url}")
+    results, elapsed = asyncio.run(replay(entries, args.base_url, speed, args.concurrency, args.timeout))
+    summary = summarize(results)
+    print(f'Done in {elapsed:.1f}s')
+    print(f'{"endpoint":<48}{"requests":>9}{"errors":>8}{"p50 ms":>9}{"p95 ms":>9}{"p99 ms":>9}')
+    for endpoint, s in summary.items():
+        print(f'{endpoint:<48}{s["requests"]:>9}{s["errors"]:>8}{s["p50_ms"]:>9}{s["p95_ms"]:>9}{s["p99_ms"]:>9}')
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'capture': args.capture, 'speed': args.speed, 'base_url': args.base_url,
+                       'elapsed_seconds': round(elapsed, 2), 'endpoints': summary, 'requests': results}, f, indent=2)
+        print(f'Wrote {args.output}')
+
+def change(before, after):
+    if not before:
+        return '-'
+    return f'{100 * (after - before) / before:+.0f}%'
+
+def run_compare(args):
+    with open(args.before) as f:
+        before = json.load(f)['endpoints']
+    with open(args.after) as f:
+        after = json.load(f)['endpoints']
+    print(f'{"endpoint":<48}{"n":>6}{"p50 before":>12}{"after":>9}{"":>7}{"p95 before":>12}{"after":>9}{"":>7}'
+          f'{"p99 before":>12}{"after":>9}{"":>7}')
+    regressions = []
+    for endpoint in sorted(set(before) | set(after)):
+        b, a = before.get(endpoint), after.get(endpoint)
+        if not b or not a:
+            print(f'{endpoint:<48}  only in {"after" if a else "before"}')
+            continue
+        line = f'{endpoint:<48}{a["requests"]:>6}'
+        for key in ('p50_ms', 'p95_ms', 'p99_ms'):
+            line += f'{b[key]:>12}{a[key]:>9}{change(b[key], a[key]):>7}'
+        print(line)
+        if b['p95_ms'] and a['p95_ms'] > b['p95_ms'] * args.threshold:
+            regressions.append(endpoint)
+    if regressions:
+        print(f'\np95 regressed by more than {args.threshold:g}x on: {", ".join(regressions)}')
+        raise SystemExit(1)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Replay captured /api traffic and compare replays of two builds.')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    replay_parser = commands.add_parser('replay', help='Play a capture back against a server')
+    replay_parser.add_argument('capture', help='JSONL written via TRAFFIC_CAPTURE_FILE')
+    replay_parser.add_argument('--base-url', default='http://localhost:3000')
+    replay_parser.add_argument('--speed', default='1', help='1, 10, ... times the captured rate, or max (default: 1)')
+    replay_parser.add_argument('--concurrency', type=int, default=50, help='Max requests in flight (default: 50)')
+    replay_parser.add_argument('--timeout', type=float, default=30, help='Per-request timeout in seconds (default: 30)')
+    replay_parser.add_argument('--limit', type=int, help='Only replay the first N requests')
+    replay_parser.add_argument('--output', help='Per-endpoint summary and per-request results as JSON')
+
+    compare_parser = commands.add_parser('compare', help='Latency diff between two replay outputs')
+    compare_parser.add_argument('before')
+    compare_parser.add_argument('after')
+    compare_parser.add_argument('--threshold', type=float, default=1.2,
+                                help='Exit 1 when an endpoint p95 grows by more than this factor (default: 1.2)')
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    if args.command == 'replay':
+        run_replay(args)
+    else:
+        run_compare(args)
+
+if __name__ == '__main__':
+    main()
@@ -4,7 +4,7 @@ import requests
 import os
 from dotenv import load_dotenv
 import sys
-from test_setup_helpers import setup_test_data, teardown_test_data, default_users_data, default_calendar_days_data
+from test_setup_helpers import setup_test_data, teardown_test_data, default_users_data, default_calendar_days_data, WORKER_PREFIX
 
 @pytest.fixture()
 def setup_and_teardown(db_conn):
@@ -64,17 +64,17 @@ def test_full_matching(db_conn):
     url = "http://localhost:3000/attraction"
     headers_user_123 = {
         "Content-Type": "application/json",
-        "Authorization": "Bearer test-123"  # Test token for user 123
+        "Authorization": f"Bearer test-{WORKER_PREFIX}123"  # Test token for user 123
     }
     headers_user_124 = {
         "Content-Type": "application/json",
-        "Authorization": "Bearer test-124"  # Test token for user 124
+        "Authorization": f"Bearer test-{WORKER_PREFIX}124"  # Test token for user 124
     }
 
     # User 123 sends an attraction to User 124
     attraction1 = {
-        "userFrom": "123",
-        "userTo": "124",
+        "userFrom": f"{WORKER_PREFIX}123",
+        "userTo": f"{WORKER_PREFIX}124",
         "date": "2024-05-01",
         "romanticRating": 3,
         "sexualRating": 3,
@@ -84,8 +84,8 @@ def test_full_matching(db_conn):
 
     # User 124 sends an attraction to User 123
     attraction2 = {
-        "userFrom": "124",
-        "userTo": "123",
+        "userFrom": f"{WORKER_PREFIX}124",
+        "userTo": f"{WORKER_PREFIX}123",
         "date": "2024-05-01",
         "romanticRating": 3,
         "sexualRating": 3,
@@ -96,7 +96,7 @@ def test_full_matching(db_conn):
     # Verify that the attractions are matched correctly
     cur = db_conn.cursor()
     # the attraction from the original user should update once the other user sends an attraction
-    cur.execute("SELECT result FROM attraction WHERE user_from = '123' AND user_to = '124'")
+    cur.execute(f"SELECT result FROM attraction WHERE user_from = '{WORKER_PREFIX}123' AND user_to = '{WORKER_PREFIX}124'")
     result1 = cur.fetchone()[0]
     result2 = response2['result']
 
@@ -2,6 +2,7 @@ import pytest
 import requests
 import json
 from datetime import datetime
+from test_setup_helpers import WORKER_PREFIX
 
 @pytest.fixture(scope="function")
 def setup_test_data(db_conn):
@@ -9,17 +10,17 @@ def setup_test_data(db_conn):
     cur = db_conn.cursor()
 
     # Clear previous user and date data
-    cur.execute("SELECT delete_user_cascade('user123');")
-    cur.execute("SELECT delete_user_cascade('user456');")
+    cur.execute(f"SELECT delete_user_cascade('{WORKER_PREFIX}user123');")
+    cur.execute(f"SELECT delete_user_cascade('{WORKER_PREFIX}user456');")
 
     # Insert test users
     users_to_insert = [
         (
-            'user123', 'John', 'Doe', 'http://example.com/profile.jpg', 'http://example.com/video.mp4',
+            f'{WORKER_PREFIX}user123', 'John', 'Doe', 'http://example.com/profile.jpg', 'http://example.com/video.mp4',
             '12345', '{"sticker1": "value1"}', True  # Set initial tokens to 8 for testing
         ),
         (
-            'user456', 'Jane', 'Doe', 'http://example.com/profile2.jpg', 'http://example.com/video2.mp4',
+            f'{WORKER_PREFIX}user456', 'Jane', 'Doe', 'http://example.com/profile2.jpg', 'http://example.com/video2.mp4',
             '54321', '{"sticker2": "value2"}', True
         )
     ]
@@ -35,33 +36,33 @@ def setup_test_data(db_conn):
 
     # Add tokens to user123 and user456
     cur.execute(
-        """
+        f"""
         INSERT INTO transactions (user_id, transaction_type, token_amount, description)
-        VALUES ('user123', 'replenishment', 8, 'Initial tokens for testing')
+        VALUES ('{WORKER_PREFIX}user123', 'replenishment', 8, 'Initial tokens for testing')
         """
     )
 
     cur.execute(
-        """
+        f"""
         INSERT INTO transactions (user_id, transaction_type, token_amount, description)
-        VALUES ('user456', 'replenishment', 30, 'Initial tokens for testing')
+        VALUES ('{WORKER_PREFIX}user456', 'replenishment', 30, 'Initial tokens for testing')
         """
     )
 
     # Insert calendar day for user456
     cur.execute(
-        """
+        f"""
         INSERT INTO calendar_day (user_id, date, user_video_url)
-        VALUES ('user456', '2024-01-01', 'http://example.com/video2.mp4')
+        VALUES ('{WORKER_PREFIX}user456', '2024-01-01', 'http://example.com/video2.mp4')
         ON CONFLICT (user_id, date) DO NOTHING
         """
     )
 
     # Insert calendar day for user123
     cur.execute(
-        """
+        f"""
         INSERT INTO calendar_day (user_id, date, user_video_url)
-        VALUES ('user123', '2024-01-01', 'http://example.com/video2.mp4')
+        VALUES ('{WORKER_PREFIX}user123', '2024-01-01', 'http://example.com/video2.mp4')
         ON CONFLICT (user_id, date) DO NOTHING
         """
     )
@@ -71,20 +72,20 @@ def setup_test_data(db_conn):
     yield
 
     # Clear test data after test
-    cur.execute("SELECT delete_user_cascade('user123');")
-    cur.execute("SELECT delete_user_cascade('user456');")
+    cur.execute(f"SELECT delete_user_cascade('{WORKER_PREFIX}user123');")
+    cur.execute(f"SELECT delete_user_cascade('{WORKER_PREFIX}user456');")
     db_conn.commit()
     cur.close()
 
 def alter_setup_to_add_match():
     base_url = "http://localhost:3000/attraction"
     setup_headers = {
-        "Authorization":"Bearer test-user456"  # Test token for user 123
+        "Authorization":f"Bearer test-{WORKER_PREFIX}user456"  # Test token for user 123
     }
 
     setup_attraction_data = {
-        "userFrom": "user456",
-        "userTo": "user123",
+        "userFrom": f"{WORKER_PREFIX}user456",
+        "userTo": f"{WORKER_PREFIX}user123",
         "date": "2024-01-01",
         "romanticRating": 3,
         "sexualRating": 3,
@@ -101,11 +102,11 @@ def get_user_tokens(db_conn, user_id):
 @pytest.mark.usefixtures("setup_test_data")
 def test_attraction_submission_deducts_tokens(db_conn):
     base_url = "http://localhost:3000/attraction"
-    user_from = "user123"
-    user_to = "user456"
+    user_from = f"{WORKER_PREFIX}user123"
+    user_to = f"{WORKER_PREFIX}user456"
     date = "2024-01-01"
     headers = {
-        "Authorization": "Bearer test-user123"  # Test token for user 123
+        "Authorization": f"Bearer test-{WORKER_PREFIX}user123"  # Test token for user 123
     }
     
     attraction_data = {
@@ -142,11 +143,11 @@ def test_attraction_submission_deducts_tokens(db_conn):
 @pytest.mark.usefixtures("setup_test_data")
 def test_attraction_submission_insufficient_tokens_without_match_single_transaction(db_conn):
     base_url = "http://localhost:3000/attraction"
-    user_from = "user123"
-    user_to = "user456"
+    user_from = f"{WORKER_PREFIX}user123"
+    user_to = f"{WORKER_PREFIX}user456"
     date = "2024-01-01"
     headers = {
-        "Authorization": "Bearer test-user123"  # Test token for user 123
+        "Authorization": f"Bearer test-{WORKER_PREFIX}user123"  # Test token for user 123
     }
     
     attraction_data = {
@@ -184,11 +185,11 @@ def test_attraction_submission_insufficient_tokens_without_match_single_transact
 @pytest.mark.usefixtures("setup_test_data")
 def test_attraction_submission_insufficient_tokens_without_match_multiple_transactions(db_conn):
     base_url = "http://localhost:3000/attraction"
-    user_from = "user123"
-    user_to = "user456"
+    user_from = f"{WORKER_PREFIX}user123"
+    user_to = f"{WORKER_PREFIX}user456"
     date = "2024-01-01"
     headers = {
-        "Authorization": "Bearer test-user123"  # Test token for user 123
+        "Authorization": f"Bearer test-{WORKER_PREFIX}user123"  # Test token for user 123
     }
     
     attraction_data = {
@@ -203,9 +204,9 @@ def test_attraction_submission_insufficient_tokens_without_match_multiple_transa
     # Add transaction to remove 7 tokens from user123
     cur = db_conn.cursor()
     cur.execute(
-        """
+        f"""
         INSERT INTO transactions (user_id, transaction_type, token_amount, description)
-        VALUES ('user123', 'purchase', -7, 'Attraction deduction')
+        VALUES ('{WORKER_PREFIX}user123', 'purchase', -7, 'Attraction deduction')
         """
     )
     db_conn.commit()
@@ -239,13 +240,13 @@ def test_attraction_submission_insufficient_tokens_without_match_multiple_transa
 def test_attraction_submission_insufficient_tokens_with_match(db_conn):
     corresponding_attraction = alter_setup_to_add_match()
     assert corresponding_attraction.status_code == 201, "Attraction should be created successfully, but got message: " + corresponding_attraction.json()['message']
-    initial_user_to_tokens = get_user_tokens(db_conn, "user456")
+    initial_user_to_tokens = get_user_tokens(db_conn, f"{WORKER_PREFIX}user456")
     base_url = "http://localhost:3000/attraction"
-    user_from = "user123"
-    user_to = "user456"
+    user_from = f"{WORKER_PREFIX}user123"
+    user_to = f"{WORKER_PREFIX}user456"
     date = "2024-01-01"
     headers = {
-        "Authorization": "Bearer test-user123"  # Test token for user 123
+        "Authorization": f"Bearer test-{WORKER_PREFIX}user123"  # Test token for user 123
     }
 
     initial_user_from_tokens = get_user_tokens(db_conn, user_from)
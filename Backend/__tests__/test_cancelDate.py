@@ -1,6 +1,7 @@
 import pytest
 import requests
 import sys
+from test_setup_helpers import WORKER_PREFIX
 
 @pytest.fixture(scope="function")
 def setup_test_data(db_conn):
@@ -9,21 +10,21 @@ def setup_test_data(db_conn):
 
     # Clear previous date data
     cur.execute(
-        "DELETE FROM dates WHERE (user_from = 'user123' AND user_to = 'user456') "
-        "OR (user_from = 'user456' AND user_to = 'user123') AND date = '2024-01-01';"
+        f"DELETE FROM dates WHERE (user_from = '{WORKER_PREFIX}user123' AND user_to = '{WORKER_PREFIX}user456') "
+        f"OR (user_from = '{WORKER_PREFIX}user456' AND user_to = '{WORKER_PREFIX}user123') AND date = '2024-01-01';"
     )
 
     # Clear previous user data
-    cur.execute("DELETE FROM users WHERE user_id IN ('user123', 'user456');")
+    cur.execute(f"DELETE FROM users WHERE user_id IN ('{WORKER_PREFIX}user123', '{WORKER_PREFIX}user456');")
 
     # Insert test users if they do not exist
     users_to_insert = [
         (
-            'user123', 'John', 'Doe', 'http://example.com/profile.jpg', 'http://example.com/video.mp4',
+            f'{WORKER_PREFIX}user123', 'John', 'Doe', 'http://example.com/profile.jpg', 'http://example.com/video.mp4',
             '12345', '{"sticker1": "value1"}', True
         ),
         (
-            'user456', 'Jane', 'Doe', 'http://example.com/profile2.jpg', 'http://example.com/video2.mp4',
+            f'{WORKER_PREFIX}user456', 'Jane', 'Doe', 'http://example.com/profile2.jpg', 'http://example.com/video2.mp4',
             '54321', '{"sticker2": "value2"}', True
         )
     ]
@@ -38,9 +39,9 @@ def setup_test_data(db_conn):
         )
 
     cur.execute(
-        """
+        f"""
         INSERT INTO dates (user_from, user_to, date, location_metadata, status)
-        VALUES ('user123', 'user456', '2024-01-01', '{"address": "1234 Test St", "city": "Testville", "state": "TS"}', 'unscheduled')
+        VALUES ('{WORKER_PREFIX}user123', '{WORKER_PREFIX}user456', '2024-01-01', '{{"address": "1234 Test St", "city": "Testville", "state": "TS"}}', 'unscheduled')
         ON CONFLICT (user_from, user_to, date) DO NOTHING
         """
     )
@@ -51,11 +52,11 @@ def setup_test_data(db_conn):
 
     # Clear test date data after test
     cur.execute(
-        "DELETE FROM dates WHERE (user_from = 'user123' AND user_to = 'user456') "
-        "OR (user_from = 'user456' AND user_to = 'user123') AND date = '2024-01-01';"
+        f"DELETE FROM dates WHERE (user_from = '{WORKER_PREFIX}user123' AND user_to = '{WORKER_PREFIX}user456') "
+        f"OR (user_from = '{WORKER_PREFIX}user456' AND user_to = '{WORKER_PREFIX}user123') AND date = '2024-01-01';"
     )
     # Remove test users
-    cur.execute("DELETE FROM users WHERE user_id IN ('user123', 'user456');")
+    cur.execute(f"DELETE FROM users WHERE user_id IN ('{WORKER_PREFIX}user123', '{WORKER_PREFIX}user456');")
     db_conn.commit()
     cur.close()
 
@@ -68,12 +69,12 @@ def patch_cancel_date(url, headers, expected_status_code):
 # Test function for cancelling a date
 @pytest.mark.usefixtures("setup_test_data")
 def test_cancel_date():
-    user_to = "user456"
+    user_to = f"{WORKER_PREFIX}user456"
     date = "2024-01-01"
     url = f"http://localhost:3000/date/cancel/{user_to}/{date}"
     
     headers = {
-        "Authorization": "Bearer test-user123"  # Test token for user 123
+        "Authorization": f"Bearer test-{WORKER_PREFIX}user123"  # Test token for user 123
     }
 
     # Test cancelling the date
@@ -1,6 +1,7 @@
 import pytest
 import requests
 import sys
+from test_setup_helpers import insert_test_user, assert_max_queries, WORKER_PREFIX
 
 @pytest.fixture(scope="function")
 def setup_test_data(db_conn):
@@ -9,21 +10,21 @@ def setup_test_data(db_conn):
 
     # Clear previous date data
     cur.execute(
-        "DELETE FROM dates WHERE (user_from = 'user123' AND user_to = 'user456') "
-        "OR (user_from = 'user456' AND user_to = 'user123') AND date = '2024-01-01';"
+        f"DELETE FROM dates WHERE (user_from = '{WORKER_PREFIX}user123' AND user_to = '{WORKER_PREFIX}user456') "
+        f"OR (user_from = '{WORKER_PREFIX}user456' AND user_to = '{WORKER_PREFIX}user123') AND date = '2024-01-01';"
     )
 
     # Clear previous user data
-    cur.execute("DELETE FROM users WHERE user_id IN ('user123', 'user456');")
+    cur.execute(f"DELETE FROM users WHERE user_id IN ('{WORKER_PREFIX}user123', '{WORKER_PREFIX}user456');")
 
     # Insert test users if they do not exist
     users_to_insert = [
         (
-            'user123', 'John', 'Doe', 'http://example.com/profile.jpg', 'http://example.com/video.mp4',
+            f'{WORKER_PREFIX}user123', 'John', 'Doe', 'http://example.com/profile.jpg', 'http://example.com/video.mp4',
             '12345', '{"sticker1": "value1"}', True
         ),
         (
-            'user456', 'Jane', 'Doe', 'http://example.com/profile2.jpg', 'http://example.com/video2.mp4',
+            f'{WORKER_PREFIX}user456', 'Jane', 'Doe', 'http://example.com/profile2.jpg', 'http://example.com/video2.mp4',
             '54321', '{"sticker2": "value2"}', True
         )
     ]
@@ -43,11 +44,11 @@ def setup_test_data(db_conn):
 
     # Clear test date data after test
     cur.execute(
-        "DELETE FROM dates WHERE (user_from = 'user123' AND user_to = 'user456') "
-        "OR (user_from = 'user456' AND user_to = 'user123') AND date = '2024-01-01';"
+        f"DELETE FROM dates WHERE (user_from = '{WORKER_PREFIX}user123' AND user_to = '{WORKER_PREFIX}user456') "
+        f"OR (user_from = '{WORKER_PREFIX}user456' AND user_to = '{WORKER_PREFIX}user123') AND date = '2024-01-01';"
     )
     # Remove test users
-    cur.execute("DELETE FROM users WHERE user_id IN ('user123', 'user456');")
+    cur.execute(f"DELETE FROM users WHERE user_id IN ('{WORKER_PREFIX}user123', '{WORKER_PREFIX}user456');")
     db_conn.commit()
     cur.close()
 
@@ -55,7 +56,7 @@ def setup_test_data(db_conn):
 def post_create_date(url, date_data, expected_status_code):
     headers = {
         'Content-Type': 'application/json',
-        "Authorization": "Bearer test-user123"  # Test token for user 123
+        "Authorization": f"Bearer test-{WORKER_PREFIX}user123"  # Test token for user 123
     }
     response = requests.post(url, json=date_data, headers=headers)
     assert response.status_code == expected_status_code
@@ -69,8 +70,8 @@ def test_create_date():
     new_date = {
         "date": "2024-01-01",
         "time": "18:00",
-        "userFrom": "user123",
-        "userTo": "user456",
+        "userFrom": f"{WORKER_PREFIX}user123",
+        "userTo": f"{WORKER_PREFIX}user456",
         "locationMetadata": {
             "address": "1234 Test St",
             "city": "Testville",
@@ -97,5 +98,25 @@ def test_create_date():
     assert response_update['message'] == 'Date already exists', "Attempt to create an already existing date should have been stopped"
 
 # Ensures that if pytest is run directly, it processes the tests in this file
+@pytest.fixture
+def proposal_users(server_db):
+    cur = server_db.cursor()
+    for user_id in (f"{WORKER_PREFIX}user123", f"{WORKER_PREFIX}user456"):
+        insert_test_user(cur, user_id=user_id)
+    server_db.commit()
+    cur.close()
+
+@pytest.mark.usefixtures("proposal_users")
+def test_create_date_proposal_query_count():
+    # The router is mounted under /api: createDateHandler as it is served today
+    date_data = {"userTo": f"{WORKER_PREFIX}user456", "date": "2024-01-01", "time": "19:00",
+                 "romanticRating": 1, "sexualRating": 1, "friendshipRating": 1}
+    headers = {"Authorization": f"Bearer test-{WORKER_PREFIX}user123"}
+    response = requests.post("http://localhost:3000/api/date", json=date_data, headers=headers)
+    assert response.status_code == 201
+    # Existing date and recipient conflict lookups, then BEGIN, conflict check, insert, the
+    # proposal notification (profile, insert, FCM token) and COMMIT
+    assert_max_queries(response, 9)
+
 if __name__ == "__main__":
     pytest.main([sys.argv[0]])
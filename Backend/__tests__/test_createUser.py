@@ -1,6 +1,7 @@
 import pytest
 import requests
 import sys
+from test_setup_helpers import WORKER_PREFIX
 
 @pytest.fixture(scope="function")
 def setup_test_user_data(db_conn):
@@ -8,14 +9,14 @@ def setup_test_user_data(db_conn):
     cur = db_conn.cursor()
 
     # Clear previous user data
-    cur.execute("SELECT delete_user_cascade('123');")
+    cur.execute(f"SELECT delete_user_cascade('{WORKER_PREFIX}123');")
 
     db_conn.commit()
 
     yield
 
     # Clear test user data after test
-    cur.execute("SELECT delete_user_cascade('123');")
+    cur.execute(f"SELECT delete_user_cascade('{WORKER_PREFIX}123');")
     db_conn.commit()
     cur.close()
 
@@ -23,7 +24,7 @@ def setup_test_user_data(db_conn):
 def post_create_user(url, user_data, expected_status_code):
     headers = {
         'Content-Type': 'application/json',
-        "Authorization": "Bearer test-123"  # Test token for user
+        "Authorization": f"Bearer test-{WORKER_PREFIX}123"  # Test token for user
     }
     response = requests.post(url, json=user_data, headers=headers)
     assert response.status_code == expected_status_code
@@ -0,0 +1,20 @@
+import numpy as np
+import pytest
+
+from generateSyntheticDataset import nearby_users, parse_args
+
+# Pure generator checks, no database or API server involved
+pytestmark = pytest.mark.db_only
+
+@pytest.mark.parametrize("user_count", [2, 3, 10, 2000, 2001])
+def test_nearby_users_never_pick_the_user_itself(user_count):
+    rng = np.random.default_rng(0)
+    source = np.repeat(np.arange(user_count), 50)
+    target = nearby_users(rng, source, user_count)
+    assert not np.any(target == source), f"Self pairs with --users {user_count}"
+    assert target.min() >= 0 and target.max() < user_count
+
+def test_parse_args_rejects_a_single_user():
+    with pytest.raises(SystemExit):
+        parse_args(["--users", "1"])
+    assert parse_args(["--users", "2"]).users == 2
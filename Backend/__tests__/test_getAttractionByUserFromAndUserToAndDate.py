@@ -1,5 +1,6 @@
 import pytest
 import requests
+from test_setup_helpers import WORKER_PREFIX
 
 @pytest.fixture(scope="function")
 def setup_test_data(db_conn):
@@ -8,21 +9,21 @@ def setup_test_data(db_conn):
 
     # Clear previous attraction data
     cur.execute(
-        "DELETE FROM attraction WHERE (user_from = '123' AND user_to = '124') "
-        "OR (user_from = '124' AND user_to = '123');"
+        f"DELETE FROM attraction WHERE (user_from = '{WORKER_PREFIX}123' AND user_to = '{WORKER_PREFIX}124') "
+        f"OR (user_from = '{WORKER_PREFIX}124' AND user_to = '{WORKER_PREFIX}123');"
     )
 
     # Clear previous user data
-    cur.execute("DELETE FROM users WHERE user_id IN ('123', '124');")
+    cur.execute(f"DELETE FROM users WHERE user_id IN ('{WORKER_PREFIX}123', '{WORKER_PREFIX}124');")
 
     # Insert test users if they do not exist
     users_to_insert = [
         (
-            '123', 'John', 'Doe', 'http://example.com/profile.jpg', 'http://example.com/video.mp4',
+            f'{WORKER_PREFIX}123', 'John', 'Doe', 'http://example.com/profile.jpg', 'http://example.com/video.mp4',
             '12345', '{"sticker1": "value1"}', True
         ),
         (
-            '124', 'Jane', 'Doe', 'http://example.com/profile2.jpg', 'http://example.com/video2.mp4',
+            f'{WORKER_PREFIX}124', 'Jane', 'Doe', 'http://example.com/profile2.jpg', 'http://example.com/video2.mp4',
             '54321', '{"sticker2": "value2"}', True
         )
     ]
@@ -38,7 +39,7 @@ def setup_test_data(db_conn):
 
     # Insert test attraction
     attraction_data = (
-        '123', '124', '2024-01-01', 0, 3, 2, True, True, True, True, True
+        f'{WORKER_PREFIX}123', f'{WORKER_PREFIX}124', '2024-01-01', 0, 3, 2, True, True, True, True, True
     )
     cur.execute(
         """
@@ -54,10 +55,10 @@ def setup_test_data(db_conn):
 
     # Clear test data after test
     cur.execute(
-        "DELETE FROM attraction WHERE (user_from = '123' AND user_to = '124') "
-        "OR (user_from = '124' AND user_to = '123');"
+        f"DELETE FROM attraction WHERE (user_from = '{WORKER_PREFIX}123' AND user_to = '{WORKER_PREFIX}124') "
+        f"OR (user_from = '{WORKER_PREFIX}124' AND user_to = '{WORKER_PREFIX}123');"
     )
-    cur.execute("DELETE FROM users WHERE user_id IN ('123', '124');")
+    cur.execute(f"DELETE FROM users WHERE user_id IN ('{WORKER_PREFIX}123', '{WORKER_PREFIX}124');")
     db_conn.commit()
     cur.close()
 
@@ -70,17 +71,17 @@ def get_attraction_by_user_and_date(url, headers, expected_status_code):
 # Test function for getting an attraction by userFrom, userTo, and date
 @pytest.mark.usefixtures("setup_test_data")
 def test_get_attraction_by_user_and_date():
-    url = "http://localhost:3000/attraction/123/124/2024-01-01"
+    url = f"http://localhost:3000/attraction/{WORKER_PREFIX}123/{WORKER_PREFIX}124/2024-01-01"
     headers = {
-        "Authorization": "Bearer test-123"  # Test token for user 123
+        "Authorization": f"Bearer test-{WORKER_PREFIX}123"  # Test token for user 123
     }
 
     # Test getting the attraction
     response_data = get_attraction_by_user_and_date(url, headers, 200)
     print("Response Data (Get Attraction):", response_data)  # Debugging print statement
 
-    assert response_data['userFrom'] == '123', "Failed to retrieve attraction entry with correct userFrom"
-    assert response_data['userTo'] == '124', "Failed to retrieve attraction entry with correct userTo"
+    assert response_data['userFrom'] == f'{WORKER_PREFIX}123', "Failed to retrieve attraction entry with correct userFrom"
+    assert response_data['userTo'] == f'{WORKER_PREFIX}124', "Failed to retrieve attraction entry with correct userTo"
     assert response_data['date'] == '2024-01-01T08:00:00.000Z', "Failed to retrieve attraction entry with correct date"
     assert response_data['romanticRating'] == 0, "Failed to retrieve attraction entry with correct romanticRating"
     assert response_data['sexualRating'] == 3, "Failed to retrieve attraction entry with correct sexualRating"
@@ -92,12 +93,12 @@ def test_get_attraction_by_user_and_date():
     assert response_data['firstMessageRights'] is True, "Failed to retrieve attraction entry with correct firstMessageRights"
 
     # Test getting a non-existent attraction
-    non_existent_url = "http://localhost:3000/attraction/123/125/2024-01-01"  # Different userTo to ensure it doesn't exist
+    non_existent_url = f"http://localhost:3000/attraction/{WORKER_PREFIX}123/{WORKER_PREFIX}125/2024-01-01"  # Different userTo to ensure it doesn't exist
     response_non_existent = get_attraction_by_user_and_date(non_existent_url, headers, 404)
     assert response_non_existent['message'] == 'Attraction not found', "Attempt to get a non-existent attraction should return an error"
 
     # Test unauthorized access
-    unauthorized_url = "http://localhost:3000/attraction/125/126/2024-01-01"
+    unauthorized_url = f"http://localhost:3000/attraction/{WORKER_PREFIX}125/{WORKER_PREFIX}126/2024-01-01"
     response_unauthorized = get_attraction_by_user_and_date(unauthorized_url, headers, 403)
     assert response_unauthorized['message'] == "Unauthorized to get another user's attraction", "Unauthorized access should return an error"
 
@@ -1,6 +1,7 @@
 import pytest
 import requests
 from datetime import datetime
+from test_setup_helpers import WORKER_PREFIX
 
 @pytest.fixture(scope="function")
 def setup_test_data(db_conn):
@@ -9,20 +10,20 @@ def setup_test_data(db_conn):
 
     # Clear previous calendar day data
     cur.execute(
-        "DELETE FROM calendar_day WHERE user_id = '123' AND date = '2024-01-01';"
+        f"DELETE FROM calendar_day WHERE user_id = '{WORKER_PREFIX}123' AND date = '2024-01-01';"
     )
 
     # Clear previous user data
-    cur.execute("DELETE FROM users WHERE user_id IN ('123', '124');")
+    cur.execute(f"DELETE FROM users WHERE user_id IN ('{WORKER_PREFIX}123', '{WORKER_PREFIX}124');")
 
     # Insert test users if they do not exist
     users_to_insert = [
         (
-            '123', 'John', 'Doe', 'http://example.com/profile.jpg', 'http://example.com/video.mp4',
+            f'{WORKER_PREFIX}123', 'John', 'Doe', 'http://example.com/profile.jpg', 'http://example.com/video.mp4',
             '12345', '{"sticker1": "value1"}', True
         ),
         (
-            '124', 'Jane', 'Doe', 'http://example.com/profile2.jpg', 'http://example.com/video2.mp4',
+            f'{WORKER_PREFIX}124', 'Jane', 'Doe', 'http://example.com/profile2.jpg', 'http://example.com/video2.mp4',
             '54321', '{"sticker2": "value2"}', True
         )
     ]
@@ -38,7 +39,7 @@ def setup_test_data(db_conn):
 
     # Insert test calendar day
     calendar_day_data = (
-        '123', '2024-01-01', 'http://example.com/calendar_video.mp4'
+        f'{WORKER_PREFIX}123', '2024-01-01', 'http://example.com/calendar_video.mp4'
     )
     cur.execute(
         """
@@ -54,9 +55,9 @@ def setup_test_data(db_conn):
 
     # Clear test data after test
     cur.execute(
-        "DELETE FROM calendar_day WHERE user_id = '123' AND date = '2024-01-01';"
+        f"DELETE FROM calendar_day WHERE user_id = '{WORKER_PREFIX}123' AND date = '2024-01-01';"
     )
-    cur.execute("DELETE FROM users WHERE user_id IN ('123', '124');")
+    cur.execute(f"DELETE FROM users WHERE user_id IN ('{WORKER_PREFIX}123', '{WORKER_PREFIX}124');")
     db_conn.commit()
     cur.close()
 
@@ -69,22 +70,22 @@ def get_calendar_day_by_user_id_and_date(url, headers, expected_status_code):
 # Test function for getting a calendar day by userId and date
 @pytest.mark.usefixtures("setup_test_data")
 def test_get_calendar_day_by_user_id_and_date():
-    url = "http://localhost:3000/calendarDays/123/2024-01-01"
+    url = f"http://localhost:3000/calendarDays/{WORKER_PREFIX}123/2024-01-01"
     headers = {
-        "Authorization": "Bearer test-123"  # Test token for user 123
+        "Authorization": f"Bearer test-{WORKER_PREFIX}123"  # Test token for user 123
     }
 
     # Test getting the calendar day
     response_data = get_calendar_day_by_user_id_and_date(url, headers, 200)
     print("Response Data (Get Calendar Day):", response_data)  # Debugging print statement
 
-    assert response_data['calendarDay']['userId'] == '123', "Failed to retrieve calendar day entry with correct userId"
+    assert response_data['calendarDay']['userId'] == f'{WORKER_PREFIX}123', "Failed to retrieve calendar day entry with correct userId"
     response_date = datetime.fromisoformat(response_data['calendarDay']['date']).date().isoformat()
     assert response_date == '2024-01-01', "Failed to retrieve calendar day entry with correct date"
     assert response_data['calendarDay']['userVideoUrl'] == 'http://example.com/calendar_video.mp4', "Failed to retrieve calendar day entry with correct userVideoUrl"
 
     # Test getting a non-existent calendar day
-    non_existent_url = "http://localhost:3000/calendarDays/123/2024-01-02"  # Different date to ensure it doesn't exist
+    non_existent_url = f"http://localhost:3000/calendarDays/{WORKER_PREFIX}123/2024-01-02"  # Different date to ensure it doesn't exist
     response_non_existent = get_calendar_day_by_user_id_and_date(non_existent_url, headers, 404)
     assert response_non_existent['message'] == 'Calendar day not found', "Attempt to get a non-existent calendar day should return an error"
 
@@ -1,5 +1,6 @@
 import pytest
 import requests
+from test_setup_helpers import WORKER_PREFIX
 
 @pytest.fixture(scope="function")
 def setup_test_data(db_conn):
@@ -8,28 +9,28 @@ def setup_test_data(db_conn):
 
     # Clear previous calendar day data
     cur.execute(
-        "DELETE FROM calendar_day WHERE user_id IN ('123', '124', '125', '126') AND date IN ('2024-01-01', '2024-01-02');"
+        f"DELETE FROM calendar_day WHERE user_id IN ('{WORKER_PREFIX}123', '{WORKER_PREFIX}124', '{WORKER_PREFIX}125', '{WORKER_PREFIX}126') AND date IN ('2024-01-01', '2024-01-02');"
     )
 
     # Clear previous user data
-    cur.execute("DELETE FROM users WHERE user_id IN ('123', '124', '125', '126');")
+    cur.execute(f"DELETE FROM users WHERE user_id IN ('{WORKER_PREFIX}123', '{WORKER_PREFIX}124', '{WORKER_PREFIX}125', '{WORKER_PREFIX}126');")
 
     # Insert test users if they do not exist
     users_to_insert = [
         (
-            '123', 'John', 'Doe', 'http://example.com/profile.jpg', 'http://example.com/video.mp4',
+            f'{WORKER_PREFIX}123', 'John', 'Doe', 'http://example.com/profile.jpg', 'http://example.com/video.mp4',
             '96701', '{"sticker1": "value1"}', True
         ),
         (
-            '124', 'Jane', 'Doe', 'http://example.com/profile2.jpg', 'http://example.com/video2.mp4',
+            f'{WORKER_PREFIX}124', 'Jane', 'Doe', 'http://example.com/profile2.jpg', 'http://example.com/video2.mp4',
             '96701', '{"sticker2": "value2"}', True
         ),
         (
-            '125', 'Alice', 'Smith', 'http://example.com/profile3.jpg', 'http://example.com/video3.mp4',
+            f'{WORKER_PREFIX}125', 'Alice', 'Smith', 'http://example.com/profile3.jpg', 'http://example.com/video3.mp4',
             '96782', '{"sticker3": "value3"}', True
         ),
         (
-            '126', 'Bob', 'Brown', 'http://example.com/profile4.jpg', 'http://example.com/video4.mp4',
+            f'{WORKER_PREFIX}126', 'Bob', 'Brown', 'http://example.com/profile4.jpg', 'http://example.com/video4.mp4',
             '95950', '{"sticker4": "value4"}', True
         )
     ]
@@ -45,11 +46,11 @@ def setup_test_data(db_conn):
 
     # Insert test calendar day videos
     calendar_day_videos = [
-        ('123', '2024-01-01', 'http://example.com/calendar_video_123.mp4'),
-        ('124', '2024-01-01', 'http://example.com/calendar_video_124.mp4'),
-        ('125', '2024-01-01', 'http://example.com/calendar_video_125.mp4'),
-        ('126', '2024-01-01', 'http://example.com/calendar_video_126.mp4'),  # Different zip code
-        ('124', '2024-01-02', 'http://example.com/calendar_video_124_2024-01-02.mp4')  # Different date
+        (f'{WORKER_PREFIX}123', '2024-01-01', 'http://example.com/calendar_video_123.mp4'),
+        (f'{WORKER_PREFIX}124', '2024-01-01', 'http://example.com/calendar_video_124.mp4'),
+        (f'{WORKER_PREFIX}125', '2024-01-01', 'http://example.com/calendar_video_125.mp4'),
+        (f'{WORKER_PREFIX}126', '2024-01-01', 'http://example.com/calendar_video_126.mp4'),  # Different zip code
+        (f'{WORKER_PREFIX}124', '2024-01-02', 'http://example.com/calendar_video_124_2024-01-02.mp4')  # Different date
     ]
     for user_id, date, user_video_url in calendar_day_videos:
         cur.execute(
@@ -66,9 +67,9 @@ def setup_test_data(db_conn):
 
     # Clear test data after test
     cur.execute(
-        "DELETE FROM calendar_day WHERE user_id IN ('123', '124', '125', '126') AND date IN ('2024-01-01', '2024-01-02');"
+        f"DELETE FROM calendar_day WHERE user_id IN ('{WORKER_PREFIX}123', '{WORKER_PREFIX}124', '{WORKER_PREFIX}125', '{WORKER_PREFIX}126') AND date IN ('2024-01-01', '2024-01-02');"
     )
-    cur.execute("DELETE FROM users WHERE user_id IN ('123', '124', '125', '126');")
+    cur.execute(f"DELETE FROM users WHERE user_id IN ('{WORKER_PREFIX}123', '{WORKER_PREFIX}124', '{WORKER_PREFIX}125', '{WORKER_PREFIX}126');")
     db_conn.commit()
     cur.close()
 
@@ -81,9 +82,9 @@ def get_calendar_day_videos_by_user_id_and_date(url, headers, expected_status_co
 # Test function for getting calendar day videos by userId and date
 @pytest.mark.usefixtures("setup_test_data")
 def test_get_calendar_day_videos_by_user_id_and_date():
-    url = "http://localhost:3000/calendarDays/videos/123/2024-01-01"
+    url = f"http://localhost:3000/calendarDays/videos/{WORKER_PREFIX}123/2024-01-01"
     headers = {
-        "Authorization": "Bearer test-123"  # Test token for user 123
+        "Authorization": f"Bearer test-{WORKER_PREFIX}123"  # Test token for user 123
     }
 
     # Test getting the calendar day videos
@@ -99,21 +100,21 @@ def test_get_calendar_day_videos_by_user_id_and_date():
     assert 'http://example.com/calendar_video_123.mp4' not in filtered_user_videos, "User's own video should not be in the response"
     
     # Check that videos for the correct date and within the same zipcode range are returned
-    assert 'http://example.com/calendar_video_124.mp4' in filtered_user_videos, "User 124's video should be in the response"
-    assert 'http://example.com/calendar_video_125.mp4' in filtered_user_videos, "User 125's video should be in the response"
+    assert 'http://example.com/calendar_video_124.mp4' in filtered_user_videos, f"User {WORKER_PREFIX}124's video should be in the response"
+    assert 'http://example.com/calendar_video_125.mp4' in filtered_user_videos, f"User {WORKER_PREFIX}125's video should be in the response"
     
     # Check that videos for the wrong zipcode are not returned
-    assert 'http://example.com/calendar_video_126.mp4' not in filtered_user_videos, "User 126's video should not be in the response"
+    assert 'http://example.com/calendar_video_126.mp4' not in filtered_user_videos, f"User {WORKER_PREFIX}126's video should not be in the response"
     
     # Check that videos for the wrong date are not returned
-    assert 'http://example.com/calendar_video_124_2024-01-02.mp4' not in filtered_user_videos, "User 124's video for a different date should not be in the response"
+    assert 'http://example.com/calendar_video_124_2024-01-02.mp4' not in filtered_user_videos, f"User {WORKER_PREFIX}124's video for a different date should not be in the response"
 
     # Test getting videos for a non-existent user
     non_existent_user_url = "http://localhost:3000/calendarDays/videos/999/2024-01-01"
     get_calendar_day_videos_by_user_id_and_date(non_existent_user_url, headers, 404)
 
     # Test getting videos for a non-existent date
-    non_existent_date_url = "http://localhost:3000/calendarDays/videos/123/2024-01-03"  # Different date to ensure it doesn't exist
+    non_existent_date_url = f"http://localhost:3000/calendarDays/videos/{WORKER_PREFIX}123/2024-01-03"  # Different date to ensure it doesn't exist
     get_calendar_day_videos_by_user_id_and_date(non_existent_date_url, headers, 404)
 
 # Ensures that if pytest is run directly, it processes the tests in this file
@@ -2,6 +2,7 @@ import pytest
 import requests
 import json
 from datetime import datetime
+from test_setup_helpers import WORKER_PREFIX
 
 @pytest.fixture(scope="function")
 def setup_test_data(db_conn):
@@ -9,17 +10,17 @@ def setup_test_data(db_conn):
     cur = db_conn.cursor()
 
     # Clear previous user and date data
-    cur.execute("SELECT delete_user_cascade('user123');")
-    cur.execute("SELECT delete_user_cascade('user456');")
+    cur.execute(f"SELECT delete_user_cascade('{WORKER_PREFIX}user123');")
+    cur.execute(f"SELECT delete_user_cascade('{WORKER_PREFIX}user456');")
 
     # Insert test users
     users_to_insert = [
         (
-            'user123', 'John', 'Doe', 'http://example.com/profile.jpg', 'http://example.com/video.mp4',
+            f'{WORKER_PREFIX}user123', 'John', 'Doe', 'http://example.com/profile.jpg', 'http://example.com/video.mp4',
             '12345', '{"sticker1": "value1"}', True
         ),
         (
-            'user456', 'Jane', 'Doe', 'http://example.com/profile2.jpg', 'http://example.com/video2.mp4',
+            f'{WORKER_PREFIX}user456', 'Jane', 'Doe', 'http://example.com/profile2.jpg', 'http://example.com/video2.mp4',
             '54321', '{"sticker2": "value2"}', True
         )
     ]
@@ -35,9 +36,9 @@ def setup_test_data(db_conn):
 
     # Insert test date
     cur.execute(
-        """
+        f"""
         INSERT INTO dates (user_from, user_to, date, location_metadata, status, user_from_approved, user_to_approved)
-        VALUES ('user123', 'user456', '2024-01-01', '{"address": "456 first ave", "city": "Originaville", "state": "CA"}', 'pending', true, false)
+        VALUES ('{WORKER_PREFIX}user123', '{WORKER_PREFIX}user456', '2024-01-01', '{{"address": "456 first ave", "city": "Originaville", "state": "CA"}}', 'pending', true, false)
         ON CONFLICT (user_from, user_to, date) DO NOTHING
         """
     )
@@ -47,8 +48,8 @@ def setup_test_data(db_conn):
     yield
 
     # Clear test data after test
-    cur.execute("SELECT delete_user_cascade('user123');")
-    cur.execute("SELECT delete_user_cascade('user456');")
+    cur.execute(f"SELECT delete_user_cascade('{WORKER_PREFIX}user123');")
+    cur.execute(f"SELECT delete_user_cascade('{WORKER_PREFIX}user456');")
     db_conn.commit()
     cur.close()
 
@@ -60,13 +61,13 @@ def get_date(url, headers, expected_status_code):
 @pytest.mark.usefixtures("setup_test_data")
 def test_get_date():
     base_url = "http://localhost:3000/date"
-    user_from = "user123"
-    user_to = "user456"
+    user_from = f"{WORKER_PREFIX}user123"
+    user_to = f"{WORKER_PREFIX}user456"
     date = "2024-01-01"
     url = f"{base_url}/{user_from}/{user_to}/{date}"
     headers = {
         "Content-Type": "application/json",
-        "Authorization": "Bearer test-user123"  # Test token for user 123
+        "Authorization": f"Bearer test-{WORKER_PREFIX}user123"  # Test token for user 123
     }
 
     # Test getting the date
@@ -91,7 +92,7 @@ def test_get_date():
     url_non_existent = f"{base_url}/{user_from}/{user_to}/2024-01-02"
     headers = {
         "Content-Type": "application/json",
-        "Authorization": "Bearer test-user123"  # Test token for user 123
+        "Authorization": f"Bearer test-{WORKER_PREFIX}user123"  # Test token for user 123
     }
     non_existent_response_data = get_date(url_non_existent, headers, 404)
     assert non_existent_response_data['message'] == "Date not found", "Non-existent date not handled correctly"
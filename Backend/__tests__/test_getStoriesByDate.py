@@ -0,0 +1,185 @@
+import pytest
+import requests
+from test_setup_helpers import insert_test_user, insert_calendar_day, delete_user_cascade, WORKER_PREFIX
+
+API_URL = "http://localhost:3000/api/stories/2024-05-01"
+VIEWER = f"{WORKER_PREFIX}123"
+headers_viewer = {"Authorization": f"Bearer test-{VIEWER}"}
+
+# Viewer plus five nearby story authors. Two of them share a location, so their stories are
+# at the same distance and only calendar_id orders them.
+USER_LOCATIONS = {
+    VIEWER: (40.00, -75.00),
+    f"{WORKER_PREFIX}201": (40.10, -75.00),
+    f"{WORKER_PREFIX}202": (40.30, -75.00),
+    f"{WORKER_PREFIX}203": (40.30, -75.00),
+    f"{WORKER_PREFIX}204": (40.60, -75.00),
+    f"{WORKER_PREFIX}205": (41.00, -75.00),
+}
+
+@pytest.fixture
+def stories_data(server_db):
+    cur = server_db.cursor()
+    for index, (user_id, (latitude, longitude)) in enumerate(USER_LOCATIONS.items()):
+        insert_test_user(cur, user_id=user_id, first_name="Story", last_name=user_id)
+        cur.execute("UPDATE users SET latitude = %s, longitude = %s WHERE user_id = %s",
+                    (latitude, longitude, user_id))
+        if user_id != VIEWER:
+            insert_calendar_day(cur, user_id=user_id, date="2024-05-01",
+                                user_video_url=f"https://vimeo.com/{index}")
+            cur.execute("""
+                UPDATE calendar_day SET vimeo_uri = %s, processing_status = 'complete'
+                WHERE user_id = %s AND date = '2024-05-01'
+            """, (f"/videos/{index}", user_id))
+    server_db.commit()
+    cur.close()
+
+def fetch_pages(limit):
+    ids, cursor = [], None
+    while True:
+        params = {"limit": limit, **({"cursor": cursor} if cursor else {})}
+        response = requests.get(API_URL, headers=headers_viewer, params=params)
+        assert response.status_code == 200
+        page = response.json()
+        assert len(page) <= limit
+        ids.extend(story["calendarId"] for story in page)
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            return ids
+
+@pytest.mark.usefixtures("stories_data")
+def test_stories_pages_match_unpaged_feed():
+    response = requests.get(API_URL, headers=headers_viewer)
+    assert response.status_code == 200
+    assert "X-Next-Cursor" not in response.headers, "Unpaged feed should come back in one response"
+    feed = response.json()
+    assert len(feed) == len(USER_LOCATIONS) - 1
+    distances = [float(story["distance"]) for story in feed]
+    assert distances == sorted(distances), "Feed should be ordered nearest first"
+
+    all_ids = [story["calendarId"] for story in feed]
+    for limit in (1, 2, 5):
+        assert fetch_pages(limit) == all_ids, f"Paging with limit={limit} skipped or repeated stories"
+
+@pytest.mark.usefixtures("stories_data")
+def test_stories_cursor_on_distance_tie():
+    tied = [f"{WORKER_PREFIX}202", f"{WORKER_PREFIX}203"]
+    # Nearest story first, then the first of the tied pair: the cursor lands on the tie
+    response = requests.get(API_URL, headers=headers_viewer, params={"limit": 2})
+    assert response.status_code == 200
+    first_page = response.json()
+    assert first_page[1]["userId"] in tied
+    cursor = response.headers["X-Next-Cursor"]
+
+    response = requests.get(API_URL, headers=headers_viewer, params={"limit": 2, "cursor": cursor})
+    assert response.status_code == 200
+    second_page = response.json()
+    assert second_page[0]["userId"] in tied
+    assert second_page[0]["distance"] == first_page[1]["distance"]
+    assert {first_page[1]["userId"], second_page[0]["userId"]} == set(tied), \
+        "Both tied stories should show up once, one on each side of the cursor"
+    assert first_page[1]["calendarId"] < second_page[0]["calendarId"], "Ties are ordered by calendar_id"
+
+def test_stories_serve_stored_playable_urls(server_db, stories_data):
+    cur = server_db.cursor()
+    cur.execute("""
+        UPDATE calendar_day SET playable_url = 'https://player.example.com/fresh.mp4',
+               playable_url_expires_at = NOW() + INTERVAL '1 hour'
+        WHERE user_id = %s
+    """, (f"{WORKER_PREFIX}201",))
+    cur.execute("""
+        UPDATE calendar_day SET playable_url = 'https://player.example.com/stale.mp4',
+               playable_url_expires_at = NOW() - INTERVAL '1 minute'
+        WHERE user_id = %s
+    """, (f"{WORKER_PREFIX}202",))
+    server_db.commit()
+    cur.close()
+
+    response = requests.get(API_URL, headers=headers_viewer)
+    assert response.status_code == 200
+    urls = {story["userId"]: story["playableUrl"] for story in response.json()}
+    assert urls[f"{WORKER_PREFIX}201"] == "https://player.example.com/fresh.mp4"
+    assert urls[f"{WORKER_PREFIX}202"] != "https://player.example.com/stale.mp4", "Expired links must not be served"
+
+def test_calendar_days_leave_out_stored_playable_urls(server_db, stories_data):
+    author = f"{WORKER_PREFIX}201"
+    cur = server_db.cursor()
+    cur.execute("""
+        UPDATE calendar_day SET playable_url = 'https://player.example.com/fresh.mp4',
+               playable_url_expires_at = NOW() + INTERVAL '1 hour',
+               playable_url_refreshing_until = NOW() + INTERVAL '1 minute'
+        WHERE user_id = %s
+    """, (author,))
+    server_db.commit()
+    cur.close()
+
+    response = requests.get("http://localhost:3000/api/calendarDays/user",
+                            headers={"Authorization": f"Bearer test-{author}"})
+    assert response.status_code == 200
+    days = response.json()
+    assert len(days) == 1
+    leaked = {"playableUrl", "playableUrlExpiresAt", "playableUrlRefreshingUntil"} & set(days[0])
+    assert not leaked, f"Only the stories feed should hand out stored links, got {leaked}"
+
+def feed_user_ids():
+    response = requests.get(API_URL, headers=headers_viewer)
+    assert response.status_code == 200
+    return [story["userId"] for story in response.json()]
+
+def test_stories_feed_follows_story_and_author_changes(server_db, stories_data):
+    nearest, second = f"{WORKER_PREFIX}201", f"{WORKER_PREFIX}202"
+    assert feed_user_ids()[0] == nearest
+    cur = server_db.cursor()
+
+    # Re-processing takes a story out of the feed until it is complete again
+    cur.execute("UPDATE calendar_day SET processing_status = 'processing' WHERE user_id = %s", (nearest,))
+    server_db.commit()
+    assert nearest not in feed_user_ids()
+    cur.execute("UPDATE calendar_day SET processing_status = 'complete' WHERE user_id = %s", (nearest,))
+    server_db.commit()
+    assert feed_user_ids()[0] == nearest
+
+    # Moving the author far away moves their story out of range
+    cur.execute("UPDATE users SET latitude = 34.05, longitude = -118.24, geo_cell = NULL WHERE user_id = %s",
+                (nearest,))
+    server_db.commit()
+    assert nearest not in feed_user_ids()
+
+    # Deleted stories are gone
+    cur.execute("DELETE FROM calendar_day WHERE user_id = %s", (second,))
+    server_db.commit()
+    assert second not in feed_user_ids()
+    cur.close()
+
+def story_feed_count(cur, user_id):
+    cur.execute("SELECT count(*) FROM story_feed WHERE user_id = %s", (user_id,))
+    return cur.fetchone()[0]
+
+def test_story_feed_rows_removed_with_story_or_author(server_db, stories_data):
+    deleted_story, deleted_author = f"{WORKER_PREFIX}204", f"{WORKER_PREFIX}205"
+    cur = server_db.cursor()
+    assert story_feed_count(cur, deleted_story) == 1
+    assert story_feed_count(cur, deleted_author) == 1
+
+    cur.execute("SELECT calendar_id FROM calendar_day WHERE user_id = %s", (deleted_story,))
+    calendar_id = cur.fetchone()[0]
+    cur.execute("DELETE FROM calendar_day WHERE calendar_id = %s", (calendar_id,))
+    server_db.commit()
+    cur.execute("SELECT count(*) FROM story_feed WHERE calendar_id = %s", (calendar_id,))
+    assert cur.fetchone()[0] == 0, "Deleting a story should drop its story_feed row"
+
+    # Deleting the user cascades through calendar_day into story_feed
+    delete_user_cascade(cur, deleted_author)
+    server_db.commit()
+    assert story_feed_count(cur, deleted_author) == 0, "Deleting an author should drop their story_feed rows"
+    assert deleted_author not in feed_user_ids()
+    cur.close()
+
+@pytest.mark.usefixtures("stories_data")
+def test_stories_rejects_bad_page_parameters():
+    for params in ({"limit": 0}, {"limit": 101}, {"limit": "ten"}, {"cursor": "not-a-cursor"}):
+        response = requests.get(API_URL, headers=headers_viewer, params=params)
+        assert response.status_code == 400, f"{params} should be rejected"
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -2,6 +2,7 @@ import pytest
 import requests
 import json
 import sys
+from test_setup_helpers import assert_max_queries, WORKER_PREFIX
 
 @pytest.fixture(scope="function")
 def setup_test_user_data(db_conn):
@@ -9,12 +10,12 @@ def setup_test_user_data(db_conn):
     cur = db_conn.cursor()
 
     # Clear previous user data
-    cur.execute("DELETE FROM users WHERE (user_id = 'testUser123' OR user_id = 'nonExistantUser');")
+    cur.execute(f"DELETE FROM users WHERE (user_id = '{WORKER_PREFIX}testUser123' OR user_id = '{WORKER_PREFIX}nonExistantUser');")
 
     # Insert a test user
-    cur.execute("""
+    cur.execute(f"""
         INSERT INTO users (user_id, first_name, last_name, profile_picture_url, video_url, zipcode, stickers, enable_notifications)
-        VALUES ('testUser123', 'Initial', 'User', 'http://example.com/initial.jpg', 'http://example.com/initial.mp4', '54321', '{"sticker1": "initialValue"}', True)
+        VALUES ('{WORKER_PREFIX}testUser123', 'Initial', 'User', 'http://example.com/initial.jpg', 'http://example.com/initial.mp4', '54321', '{{"sticker1": "initialValue"}}', True)
     """)
 
     db_conn.commit()
@@ -22,7 +23,7 @@ def setup_test_user_data(db_conn):
     yield
 
     # Clear test user data after test
-    cur.execute("DELETE FROM users WHERE (user_id = 'testUser123' OR user_id = 'nonExistantUser');")
+    cur.execute(f"DELETE FROM users WHERE (user_id = '{WORKER_PREFIX}testUser123' OR user_id = '{WORKER_PREFIX}nonExistantUser');")
     db_conn.commit()
     cur.close()
 
@@ -30,7 +31,7 @@ def setup_test_user_data(db_conn):
 def get_user_by_id(url, user_id):
     headers = {
         'Content-Type': 'application/json',
-        "Authorization": "Bearer test-123"  # Test token for generic user
+        "Authorization": f"Bearer test-{WORKER_PREFIX}123"  # Test token for generic user
     }
     response = requests.get(f"{url}/{user_id}", headers=headers)
     return response
@@ -39,14 +40,15 @@ def get_user_by_id(url, user_id):
 @pytest.mark.usefixtures("setup_test_user_data")
 def test_get_user_by_id():
     base_url = "http://localhost:3000/users"
-    valid_user_id = "testUser123"
-    invalid_user_id = "nonExistentUser"
+    valid_user_id = f"{WORKER_PREFIX}testUser123"
+    invalid_user_id = f"{WORKER_PREFIX}nonExistentUser"
 
     # Test getting an existing user
     response = get_user_by_id(base_url, valid_user_id)
     assert response.status_code == 200, "Should return 200 for existing user"
     user_data = response.json()
     assert user_data['userId'] == valid_user_id, "The user ID should match the request"
+    assert_max_queries(response, 1)
     print("User data:", json.dumps(user_data, indent=4))
 
     # Test getting a non-existent user
@@ -0,0 +1,223 @@
+# test_queryPlans.py
+# Plan regression suite for the hot repository queries. The first run builds a scaled database
+# (about a minute for the default 100k users), later runs reuse it:
+#   pytest test_queryPlans.py
+#   PLAN_TEST_USERS=0 pytest ...                 # skip the suite
+#   pytest test_queryPlans.py --plan-budget-update  # record budgets, commit plan_budgets.json
+# The SQL is read from the string templates in src/ (same extraction as queryStatsReport.py),
+# run with EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) against a synthetic dataset loaded into its
+# own database, and each plan must not Seq Scan a large table or touch more shared buffers than
+# its budget in plan_budgets.json. The committed budgets are for PLAN_DATASET at the default size
+# on the reference environment; a query with no budget fails. --plan-budget-update records this
+# run's buffers times BUDGET_HEADROOM instead, after a change that is meant to move a plan.
+import json
+import math
+import os
+import re
+import sys
+
+import numpy as np
+import pytest
+from psycopg2 import sql
+
+import generateSyntheticDataset
+from conftest import connect, locked_state
+from queryStatsReport import find_sql_templates
+
+sys.path.insert(0, generateSyntheticDataset.DATA_PREPARATION_DIR)
+from geoCells import cell_neighbor_sets  # noqa: E402
+
+PLAN_TEST_USERS = int(os.getenv("PLAN_TEST_USERS", "100000"))
+PLAN_TEST_SEED = 0
+PLAN_DATASET = f"users={PLAN_TEST_USERS} seed={PLAN_TEST_SEED}"
+LARGE_TABLE_ROWS = 10_000  # Seq Scans on tables smaller than this are fine
+MILES_PER_DEGREE_LAT = np.pi * 3958.8 / 180  # Same as createZipcodeWithinRangesCsv.py
+STORY_RADIUS_MILES = 200
+METERS_IN_A_MILE = 1609.34  # Same as CalendarDayRepository.ts
+STORY_PAGE_SIZE = 20  # STORIES_DEFAULT_PAGE_SIZE in calendarDayHandlers.ts
+PLAN_BUDGETS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "plan_budgets.json")
+BUDGET_HEADROOM = 1.5  # A budget is the buffers its recording run touched times this
+
+pytestmark = [
+    pytest.mark.db_only,
+    pytest.mark.skipif(not PLAN_TEST_USERS, reason="PLAN_TEST_USERS=0 skips the plan suite"),
+]
+
+# ${...} expressions in the templates, by their text, and the SQL they turn into at runtime
+INTERPOLATIONS = {
+    "METERS_IN_A_MILE": str(METERS_IN_A_MILE),
+    "CALENDAR_DAY_COLUMNS":
+        "calendar_id, user_id, date, user_video_url, vimeo_uri, processing_status, updated_at, created_at",
+    "maxDistanceMiles * METERS_IN_A_MILE": str(STORY_RADIUS_MILES * METERS_IN_A_MILE),
+    "cellFilter": "AND (sf.geo_cell_3 = ANY($5::text[]) OR sf.geo_cell_3 IS NULL)",
+    "keysetFilter": "",  # First page of the stories feed
+    "limitClause": f"LIMIT {STORY_PAGE_SIZE + 1}",
+}
+
+# (method, which SQL literal in it, parameters from the sample row)
+PLAN_CASES = [
+    ("CalendarDayRepository.findNearbyStoriesByDate", 0,
+     lambda s: [s["story_date"], s["user_id"], s["latitude"], s["longitude"], s["neighbor_cells"]]),
+    ("CalendarDayRepository.getCalendarDayVideosByDateAndZipCode", 0,
+     lambda s: [s["story_date"], [s["zipcode"]]]),
+    ("CalendarDayRepository.getCalendarDaysByUserId", 0, lambda s: [s["user_id"]]),
+    ("CalendarDayRepository.getCalendarDayByUserIdAndDate", 0, lambda s: [s["user_id"], s["story_date"]]),
+    ("CalendarDayRepository.getCalendarDayById", 0, lambda s: [s["calendar_id"]]),
+    ("DatesRepository.findConflictingDatesForUsers", 0,
+     lambda s: [s["date"], [s["date_from"], s["date_to"]], s["time"]]),
+    ("DatesRepository.getConfirmedDateAtTimeForUser", 0, lambda s: [s["date_from"], s["date"], s["time"]]),
+    ("DatesRepository.getDateEntryByIdWithUserDetails", 0, lambda s: [s["date_id"]]),
+    ("DatesRepository.getUpcomingDatesByUserId", 0, lambda s: [s["date_from"]]),
+    ("DatesRepository.getDateEntryByUsersAndDate", 0, lambda s: [s["date_from"], s["date_to"], s["date"]]),
+    ("AttractionRepository.getAttraction", 0,
+     lambda s: [s["attraction_from"], s["attraction_to"], s["attraction_date"]]),
+    ("AttractionRepository.getAttractionsByUserFrom", 0, lambda s: [s["attraction_from"]]),
+    ("AttractionRepository.getAttractionsByUserTo", 0, lambda s: [s["attraction_to"]]),
+    ("AttractionRepository.getAttractionsByUserFromAndUserTo", 0,
+     lambda s: [s["attraction_from"], s["attraction_to"]]),
+    ("NotificationService.getUserProfile", 0, lambda s: [s["user_id"]]),
+    ("NotificationService.getFcmToken", 0, lambda s: [s["user_id"]]),
+    ("notificationHandlers.getMyNotificationsHandler", 0, lambda s: [s["notified_user"]]),
+    ("notificationHandlers.getMyNotificationsHandler", 1, lambda s: [s["notified_user"]]),
+    ("TransactionRepository.getUserTokens", 0, lambda s: [s["user_id"]]),
+]
+
+def render(template_text):
+    def substitute(match):
+        expression = " ".join(match.group(1).split())
+        if expression not in INTERPOLATIONS:
+            pytest.fail(f"No INTERPOLATIONS entry for ${{{expression}}}, add what it renders to at runtime")
+        return INTERPOLATIONS[expression]
+    return re.sub(r"\$\{([^}]*)\}", substitute, template_text)
+
+@pytest.fixture(scope="module")
+def sql_templates():
+    templates = {}
+    for template in find_sql_templates():
+        templates.setdefault(template["method"], []).append(template)
+    return templates
+
+@pytest.fixture(scope="module")
+def plan_db(template_database):
+    """<template>_plans, filled by generateSyntheticDataset. Kept between runs and only
+    rebuilt when the size or the schema template changes."""
+    name = f"{template_database}_plans"
+    fingerprint = PLAN_DATASET
+    admin = connect(os.getenv("TEST_ADMIN_DB", "postgres"))
+    admin.autocommit = True
+    with admin.cursor() as cur:
+        cur.execute("SELECT shobj_description(oid, 'pg_database') FROM pg_database WHERE datname = %s", (name,))
+        row = cur.fetchone()
+        cur.execute("SELECT shobj_description(oid, 'pg_database') FROM pg_database WHERE datname = %s",
+                    (template_database,))
+        fingerprint += f" schema={cur.fetchone()[0]}"
+        if row is None or row[0] != fingerprint:
+            cur.execute(sql.SQL("DROP DATABASE IF EXISTS {} WITH (FORCE)").format(sql.Identifier(name)))
+            cur.execute(sql.SQL("CREATE DATABASE {} TEMPLATE {}").format(
+                sql.Identifier(name), sql.Identifier(template_database)))
+            conn = connect(name)
+            args = generateSyntheticDataset.parse_args(
+                ["--users", str(PLAN_TEST_USERS), "--seed", str(PLAN_TEST_SEED)])
+            generateSyntheticDataset.load(conn, args)
+            conn.close()
+            cur.execute(sql.SQL("COMMENT ON DATABASE {} IS {}").format(sql.Identifier(name), sql.Literal(fingerprint)))
+    admin.close()
+
+    conn = connect(name)
+    yield conn
+    conn.close()
+
+@pytest.fixture(scope="module")
+def large_tables(plan_db):
+    with plan_db.cursor() as cur:
+        cur.execute("SELECT relname FROM pg_class WHERE relkind = 'r' AND reltuples >= %s", (LARGE_TABLE_ROWS,))
+        return {row[0] for row in cur.fetchall()}
+
+# Parameters taken from the dataset: a user in the middle of it, on the latest story day,
+# and existing attraction, date and notification rows
+@pytest.fixture(scope="module")
+def sample(plan_db):
+    cur = plan_db.cursor()
+    cur.execute("SELECT MAX(date) FROM calendar_day")
+    story_date = cur.fetchone()[0]
+    cur.execute("SELECT user_id, latitude, longitude, zipcode FROM users ORDER BY user_id OFFSET %s LIMIT 1",
+                (PLAN_TEST_USERS // 2,))
+    user_id, latitude, longitude, zipcode = cur.fetchone()
+    cur.execute("SELECT calendar_id FROM calendar_day WHERE user_id = %s ORDER BY date DESC LIMIT 1", (user_id,))
+    calendar = cur.fetchone()
+    cur.execute("SELECT user_from, user_to, date FROM attractions ORDER BY attraction_id OFFSET %s LIMIT 1",
+                (PLAN_TEST_USERS // 2,))
+    attraction_from, attraction_to, attraction_date = cur.fetchone()
+    cur.execute("SELECT date_id, user_from, user_to, date, time FROM dates ORDER BY date_id OFFSET %s LIMIT 1",
+                (PLAN_TEST_USERS // 4,))
+    date_id, date_from, date_to, date, time = cur.fetchone()
+    cur.execute("SELECT user_id FROM notifications ORDER BY notification_id OFFSET %s LIMIT 1",
+                (PLAN_TEST_USERS // 2,))
+    notified_user = cur.fetchone()[0]
+    cur.close()
+
+    (_, neighbor_cells), = cell_neighbor_sets(np.array([longitude]), np.array([latitude]),
+                                              STORY_RADIUS_MILES, 3, MILES_PER_DEGREE_LAT)
+    return {
+        "story_date": story_date, "user_id": user_id, "latitude": latitude, "longitude": longitude,
+        "zipcode": zipcode, "neighbor_cells": neighbor_cells, "calendar_id": calendar[0] if calendar else 1,
+        "attraction_from": attraction_from, "attraction_to": attraction_to, "attraction_date": attraction_date,
+        "date_id": date_id, "date_from": date_from, "date_to": date_to, "date": date, "time": time,
+        "notified_user": notified_user,
+    }
+
+def plan_nodes(node):
+    yield node
+    for child in node.get("Plans", []):
+        yield from plan_nodes(child)
+
+def explain(conn, query, params):
+    with conn.cursor() as cur:
+        cur.execute("DEALLOCATE ALL")
+        cur.execute(f"PREPARE plan_case AS {query.strip().rstrip(';')}")
+        placeholders = sql.SQL(", ").join(sql.Placeholder() * len(params))
+        cur.execute(sql.SQL("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) EXECUTE plan_case({})").format(placeholders),
+                    params)
+        plan = cur.fetchone()[0]
+    conn.rollback()
+    return plan[0]["Plan"]
+
+@pytest.fixture(scope="module")
+def plan_budgets():
+    """Committed budgets for this dataset, empty when they were recorded for another one"""
+    if not os.path.exists(PLAN_BUDGETS):
+        return {}
+    with open(PLAN_BUDGETS) as f:
+        state = json.load(f)
+    return state["buffers"] if state.get("dataset") == PLAN_DATASET else {}
+
+def record_budget(case, buffers):
+    # Several xdist workers may record at once, so merge under the file lock
+    with locked_state(PLAN_BUDGETS) as state:
+        if state.get("dataset") != PLAN_DATASET:
+            state.clear()
+            state["dataset"] = PLAN_DATASET
+        state.setdefault("buffers", {})[case] = max(1, math.ceil(buffers * BUDGET_HEADROOM))
+
+@pytest.mark.parametrize("method, index, params", PLAN_CASES,
+                         ids=[f"{case[0]}[{case[1]}]" for case in PLAN_CASES])
+def test_query_plan(request, plan_db, plan_budgets, sql_templates, large_tables, sample, method, index, params):
+    templates = sql_templates.get(method, [])
+    assert len(templates) > index, f"No SQL literal #{index} found in {method}, was it renamed?"
+    template = templates[index]
+    plan = explain(plan_db, render(template["text"]), params(sample))
+
+    seq_scans = sorted({node["Relation Name"] for node in plan_nodes(plan)
+                        if node["Node Type"] == "Seq Scan" and node["Relation Name"] in large_tables})
+    assert not seq_scans, (f"{method} ({template['file']}:{template['line']}) does a Seq Scan on "
+                           f"{', '.join(seq_scans)}, check its indexes")
+
+    buffers = plan.get("Shared Hit Blocks", 0) + plan.get("Shared Read Blocks", 0)
+    case = f"{method}[{index}]"
+    if request.config.getoption("plan_budget_update"):
+        record_budget(case, buffers)
+        return
+    assert case in plan_budgets, (f"No budget for {case} with {PLAN_DATASET} in {os.path.basename(PLAN_BUDGETS)}, "
+                                  f"run with --plan-budget-update to record one")
+    assert buffers <= plan_budgets[case], (f"{method} ({template['file']}:{template['line']}) touched "
+                                           f"{buffers} shared buffers, budget is {plan_budgets[case]}")
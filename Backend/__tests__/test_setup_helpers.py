@@ -1,10 +1,18 @@
 # test_setup_helpers.py
+import os
 import pytest
 import logging
+import warnings
+
+# Under pytest-xdist (pytest -n auto) each worker seeds its own copy of the test users,
+# e.g. gw0-123 and gw1-123, so workers never insert or cascade-delete each other's rows.
+# Serial runs keep the plain IDs.
+XDIST_WORKER = os.getenv('PYTEST_XDIST_WORKER', '')
+WORKER_PREFIX = f'{XDIST_WORKER}-' if XDIST_WORKER else ''
 
 default_users_data = [
     {
-        'user_id': '123',
+        'user_id': f'{WORKER_PREFIX}123',
         'first_name': 'John',
         'last_name': 'Doe',
         'profile_picture_url': 'http://example.com/profile.jpg',
@@ -14,7 +22,7 @@ default_users_data = [
         'enable_notifications': True,
     },
     {
-        'user_id': '124',
+        'user_id': f'{WORKER_PREFIX}124',
         'first_name': 'Jane',
         'last_name': 'Doe',
         'profile_picture_url': 'http://example.com/profile2.jpg',
@@ -26,14 +34,14 @@ default_users_data = [
 ]
 
 default_calendar_days_data = [
-    {'user_id': '123', 'date': '2024-05-01', 'user_video_url': 'https://vimeo.com/926973062'},
-    {'user_id': '124', 'date': '2024-05-01', 'user_video_url': 'https://vimeo.com/921388669'}
+    {'user_id': f'{WORKER_PREFIX}123', 'date': '2024-05-01', 'user_video_url': 'https://vimeo.com/926973062'},
+    {'user_id': f'{WORKER_PREFIX}124', 'date': '2024-05-01', 'user_video_url': 'https://vimeo.com/921388669'}
 ]
 
 def delete_user_cascade(cur, user_id):
     cur.execute(f"SELECT delete_user_cascade('{user_id}');")
 
-def insert_initial_transaction(cur, user_id='123', transaction_type='replenishment', token_amount=50, amount_usd=0, description='Initial tokens'):
+def insert_initial_transaction(cur, user_id=f'{WORKER_PREFIX}123', transaction_type='replenishment', token_amount=50, amount_usd=0, description='Initial tokens'):
     cur.execute(
         """
         INSERT INTO transactions (user_id, transaction_type, token_amount, amount_usd, description)
@@ -42,18 +50,19 @@ def insert_initial_transaction(cur, user_id='123', transaction_type='replenishme
         (user_id, transaction_type, token_amount, amount_usd, description)
     )
 
-def insert_test_user(cur, user_id='123', first_name='John', last_name='Doe', profile_picture_url='http://example.com/profile.jpg', video_url='http://example.com/video.mp4', zipcode='12345', stickers='{"sticker1": "value1"}', enable_notifications=True, initial_token_amount=50):
+def insert_test_user(cur, user_id=f'{WORKER_PREFIX}123', first_name='John', last_name='Doe', profile_picture_url='http://example.com/profile.jpg', video_url='http://example.com/video.mp4', zipcode='12345', stickers='{"sticker1": "value1"}', enable_notifications=True, initial_token_amount=50, email=None):
+    # users.email is UNIQUE NOT NULL in create.sql, so every test user gets its own address
     cur.execute(
         """
-        INSERT INTO users (user_id, first_name, last_name, profile_picture_url, video_url, zipcode, stickers, enable_notifications)
-        VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+        INSERT INTO users (user_id, email, first_name, last_name, profile_picture_url, video_url, zipcode, stickers, enable_notifications)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
         ON CONFLICT (user_id) DO NOTHING
         """,
-        (user_id, first_name, last_name, profile_picture_url, video_url, zipcode, stickers, enable_notifications)
+        (user_id, email or f'{user_id}@example.com', first_name, last_name, profile_picture_url, video_url, zipcode, stickers, enable_notifications)
     )
     insert_initial_transaction(cur, user_id=user_id, token_amount=initial_token_amount)
 
-def insert_calendar_day(cur, user_id='123', date='2024-01-01', user_video_url='http://example.com/video.mp4'):
+def insert_calendar_day(cur, user_id=f'{WORKER_PREFIX}123', date='2024-01-01', user_video_url='http://example.com/video.mp4'):
     cur.execute(
         """
         INSERT INTO calendar_day (user_id, date, user_video_url)
@@ -63,7 +72,7 @@ def insert_calendar_day(cur, user_id='123', date='2024-01-01', user_video_url='h
         (user_id, date, user_video_url)
     )
 
-def insert_attraction(cur, user_from='123', user_to='456', date='2024-01-01', romantic_rating=1, sexual_rating=1, friendship_rating=1):
+def insert_attraction(cur, user_from=f'{WORKER_PREFIX}123', user_to=f'{WORKER_PREFIX}456', date='2024-01-01', romantic_rating=1, sexual_rating=1, friendship_rating=1):
     logging.info("Inserting attraction data into test database...")
     logging.info(user_from, user_to, date, romantic_rating, sexual_rating, friendship_rating)
     cur.execute(
@@ -75,7 +84,7 @@ def insert_attraction(cur, user_from='123', user_to='456', date='2024-01-01', ro
         (user_from, user_to, date, romantic_rating, sexual_rating, friendship_rating)
     )
 
-def insert_date(cur, user_from='123', user_to='456', date='2024-01-01', location_metadata='{"address": "123 street", "city": "Cityville", "state": "CA"}', status='pending', user_from_approved=True, user_to_approved=False):
+def insert_date(cur, user_from=f'{WORKER_PREFIX}123', user_to=f'{WORKER_PREFIX}456', date='2024-01-01', location_metadata='{"address": "123 street", "city": "Cityville", "state": "CA"}', status='pending', user_from_approved=True, user_to_approved=False):
     cur.execute(
         """
         INSERT INTO dates (user_from, user_to, date, location_metadata, status, user_from_approved, user_to_approved)
@@ -124,3 +133,19 @@ def get_user_tokens(db_conn, user_id):
     cur = db_conn.cursor()
     cur.execute("SELECT SUM(token_amount) as total_tokens FROM transactions WHERE user_id = %s", (user_id,))
     return cur.fetchone()[0]
+
+# Number of SQL statements the server ran for a response (X-Query-Count, only sent by a server
+# started with NODE_ENV=test, which the conftest server fixture does). None when it's missing.
+def query_count(response):
+    value = response.headers.get('X-Query-Count')
+    return int(value) if value is not None else None
+
+def assert_max_queries(response, max_queries):
+    """Fail when the request ran more than max_queries statements (BEGIN/COMMIT included),
+    so an N+1 loop in a handler shows up as a test failure."""
+    count = query_count(response)
+    if count is None:
+        warnings.warn("No X-Query-Count header, start the server with NODE_ENV=test to check query counts")
+        return
+    method, path = response.request.method, response.request.path_url
+    assert count <= max_queries, f"{method} {path} ran {count} queries, expected at most {max_queries}"
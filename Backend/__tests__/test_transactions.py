@@ -1,23 +1,24 @@
 import pytest
 from datetime import datetime
+from test_setup_helpers import WORKER_PREFIX
 
 @pytest.fixture(scope="function")
-def setup_test_data(db_conn):
-    """Setup and teardown for test data"""
-    cur = db_conn.cursor()
+def setup_test_data(db_rollback):
+    """Setup for test data, rolled back with everything else the test writes (see conftest.db_rollback)"""
+    cur = db_rollback.cursor()
 
-    # Clear previous user and token transactions data
-    cur.execute("SELECT delete_user_cascade('user123');")
-    cur.execute("SELECT delete_user_cascade('user456');")
+    # Clear rows left over from older runs (also rolled back afterwards)
+    cur.execute(f"SELECT delete_user_cascade('{WORKER_PREFIX}user123');")
+    cur.execute(f"SELECT delete_user_cascade('{WORKER_PREFIX}user456');")
 
     # Insert test users
     users_to_insert = [
         (
-            'user123', 'John', 'Doe', 'http://example.com/profile.jpg', 'http://example.com/video.mp4',
+            f'{WORKER_PREFIX}user123', 'John', 'Doe', 'http://example.com/profile.jpg', 'http://example.com/video.mp4',
             '12345', '{"sticker1": "value1"}', True
         ),
         (
-            'user456', 'Jane', 'Doe', 'http://example.com/profile2.jpg', 'http://example.com/video2.mp4',
+            f'{WORKER_PREFIX}user456', 'Jane', 'Doe', 'http://example.com/profile2.jpg', 'http://example.com/video2.mp4',
             '54321', '{"sticker2": "value2"}', True
         )
     ]
@@ -31,18 +32,11 @@ def setup_test_data(db_conn):
             (user_id, first_name, last_name, profile_picture_url, video_url, zipcode, stickers, enable_notifications)
         )
 
-    db_conn.commit()
-
     yield
-
-    # Clear test data after test
-    cur.execute("SELECT delete_user_cascade('user123');")
-    cur.execute("SELECT delete_user_cascade('user456');")
-    db_conn.commit()
     cur.close()
 
-def get_transaction(db_conn, transaction_id):
-    cur = db_conn.cursor()
+def get_transaction(db_rollback, transaction_id):
+    cur = db_rollback.cursor()
     query = """
         SELECT transaction_id, user_id, transaction_type, token_amount, amount_usd, description
         FROM transactions
@@ -52,10 +46,10 @@ def get_transaction(db_conn, transaction_id):
     return cur.fetchone()
 
 @pytest.mark.usefixtures("setup_test_data")
-def test_create_transaction(db_conn):
-    cur = db_conn.cursor()
+def test_create_transaction(db_rollback):
+    cur = db_rollback.cursor()
     transaction_data = {
-        "user_id": "user123",
+        "user_id": f"{WORKER_PREFIX}user123",
         "transaction_type": "purchase",
         "token_amount": 100,
         "amount_usd": 10.00,
@@ -69,9 +63,9 @@ def test_create_transaction(db_conn):
     """
     cur.execute(query, transaction_data)
     transaction_id = cur.fetchone()[0]
-    db_conn.commit()
+    db_rollback.commit()
 
-    transaction = get_transaction(db_conn, transaction_id)
+    transaction = get_transaction(db_rollback, transaction_id)
 
     assert transaction is not None
     assert transaction[1] == transaction_data['user_id']
@@ -81,11 +75,11 @@ def test_create_transaction(db_conn):
     assert transaction[5] == transaction_data['description']
 
 @pytest.mark.usefixtures("setup_test_data")
-def test_get_user_tokens(db_conn):
+def test_get_user_tokens(db_rollback):
     # Create an initial transaction for user123
-    cur = db_conn.cursor()
+    cur = db_rollback.cursor()
     transaction_data = {
-        "user_id": "user123",
+        "user_id": f"{WORKER_PREFIX}user123",
         "transaction_type": "purchase",
         "token_amount": 100,
         "amount_usd": 10.00,
@@ -96,12 +90,12 @@ def test_get_user_tokens(db_conn):
         VALUES (%(user_id)s, %(transaction_type)s, %(token_amount)s, %(amount_usd)s, %(description)s)
     """
     cur.execute(query, transaction_data)
-    db_conn.commit()
+    db_rollback.commit()
 
     # Test fetching the total tokens for user123
-    cur.execute("SELECT SUM(token_amount) as total_tokens FROM transactions WHERE user_id = %s", ('user123',))
+    cur.execute("SELECT SUM(token_amount) as total_tokens FROM transactions WHERE user_id = %s", (f'{WORKER_PREFIX}user123',))
     result = cur.fetchone()
-    assert result is not None, "No user found with user_id 'user123'"
+    assert result is not None, f"No user found with user_id '{WORKER_PREFIX}user123'"
     tokens = result[0]
     assert tokens == 100, f"Expected 100 tokens, but got {tokens}"
 
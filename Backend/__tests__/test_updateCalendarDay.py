@@ -2,6 +2,7 @@ import pytest
 import requests
 import sys
 from datetime import datetime
+from test_setup_helpers import WORKER_PREFIX
 
 @pytest.fixture(scope="function")
 def setup_test_data(db_conn):
@@ -10,15 +11,15 @@ def setup_test_data(db_conn):
 
     # Clear previous calendar day data
     cur.execute(
-        "DELETE FROM calendar_day WHERE user_id = '123' AND date = '2024-01-01';"
+        f"DELETE FROM calendar_day WHERE user_id = '{WORKER_PREFIX}123' AND date = '2024-01-01';"
     )
 
     # Clear previous user data
-    cur.execute("DELETE FROM users WHERE user_id = '123';")
+    cur.execute(f"DELETE FROM users WHERE user_id = '{WORKER_PREFIX}123';")
 
     # Insert test user if it does not exist
     user_data = (
-        '123', 'John', 'Doe', 'http://example.com/profile.jpg', 'http://example.com/video.mp4',
+        f'{WORKER_PREFIX}123', 'John', 'Doe', 'http://example.com/profile.jpg', 'http://example.com/video.mp4',
         '12345', '{"sticker1": "value1"}', True
     )
     cur.execute(
@@ -32,7 +33,7 @@ def setup_test_data(db_conn):
 
     # Insert test calendar day
     calendar_day_data = (
-        '123', '2024-01-01', 'http://example.com/video.mp4'
+        f'{WORKER_PREFIX}123', '2024-01-01', 'http://example.com/video.mp4'
     )
     cur.execute(
         """
@@ -49,16 +50,16 @@ def setup_test_data(db_conn):
 
     # Clear test data after test
     cur.execute(
-        "DELETE FROM calendar_day WHERE user_id = '123' AND date = '2024-01-01';"
+        f"DELETE FROM calendar_day WHERE user_id = '{WORKER_PREFIX}123' AND date = '2024-01-01';"
     )
-    cur.execute("DELETE FROM users WHERE user_id = '123';")
+    cur.execute(f"DELETE FROM users WHERE user_id = '{WORKER_PREFIX}123';")
     db_conn.commit()
     cur.close()
 
 # Function to simulate patching data to update a calendar day
 def patch_update_calendar_day(url, calendar_day_data, expected_status_code):
     headers = {
-        "Authorization": "Bearer test-123"  # Test token for user 123
+        "Authorization": f"Bearer test-{WORKER_PREFIX}123"  # Test token for user 123
     }
     response = requests.patch(url, json=calendar_day_data, headers=headers)
     assert response.status_code == expected_status_code
@@ -70,7 +71,7 @@ def test_update_calendar_day():
     url = "http://localhost:3000/calendarDays"
     # Test data for updating an existing calendar day
     updated_calendar_day = {
-        "userId": "123",
+        "userId": f"{WORKER_PREFIX}123",
         "date": "2024-01-01",
         "userVideoUrl": "http://example.com/updated_video.mp4",
     }
@@ -83,7 +84,7 @@ def test_update_calendar_day():
     
     # Attempt to update a non-existent calendar day
     non_existent_calendar_day_update = {
-        "userId": "123",
+        "userId": f"{WORKER_PREFIX}123",
         "date": "2024-01-02",  # Different date to ensure it doesn't exist
         "userVideoUrl": "http://example.com/updated_video.mp4",
     }
@@ -2,6 +2,7 @@ import pytest
 import requests
 import sys
 from datetime import datetime
+from test_setup_helpers import WORKER_PREFIX
 
 @pytest.fixture(scope="function")
 def setup_test_data(db_conn):
@@ -9,16 +10,16 @@ def setup_test_data(db_conn):
     cur = db_conn.cursor()
 
     # Clear previous user data
-    cur.execute("DELETE FROM users WHERE user_id IN ('user123', 'user456');")
+    cur.execute(f"DELETE FROM users WHERE user_id IN ('{WORKER_PREFIX}user123', '{WORKER_PREFIX}user456');")
 
     # Insert test users if they do not exist
     users_to_insert = [
         (
-            'user123', 'John', 'Doe', 'http://example.com/profile.jpg', 'http://example.com/video.mp4',
+            f'{WORKER_PREFIX}user123', 'John', 'Doe', 'http://example.com/profile.jpg', 'http://example.com/video.mp4',
             '12345', '{"sticker1": "value1"}', True
         ),
         (
-            'user456', 'Jane', 'Doe', 'http://example.com/profile2.jpg', 'http://example.com/video2.mp4',
+            f'{WORKER_PREFIX}user456', 'Jane', 'Doe', 'http://example.com/profile2.jpg', 'http://example.com/video2.mp4',
             '54321', '{"sticker2": "value2"}', True
         )
     ]
@@ -34,14 +35,14 @@ def setup_test_data(db_conn):
 
     # Clear previous date data
     cur.execute(
-        "DELETE FROM dates WHERE (user_from = 'user123' AND user_to = 'user456') "
-        "OR (user_from = 'user456' AND user_to = 'user123') AND date IN ('2024-01-01', '2024-01-02');"
+        f"DELETE FROM dates WHERE (user_from = '{WORKER_PREFIX}user123' AND user_to = '{WORKER_PREFIX}user456') "
+        f"OR (user_from = '{WORKER_PREFIX}user456' AND user_to = '{WORKER_PREFIX}user123') AND date IN ('2024-01-01', '2024-01-02');"
     )
 
     # Insert test dates if they do not exist
     dates_to_insert = [
-        ('user123', 'user456', '2024-01-01', '{"address": "1234 Test St", "city": "Testville", "state": "TS"}', 'pending'),
-        ('user123', 'user456', '2024-01-02', '{"address": "1234 Test St", "city": "Testville", "state": "TS"}', 'pending')
+        (f'{WORKER_PREFIX}user123', f'{WORKER_PREFIX}user456', '2024-01-01', '{"address": "1234 Test St", "city": "Testville", "state": "TS"}', 'pending'),
+        (f'{WORKER_PREFIX}user123', f'{WORKER_PREFIX}user456', '2024-01-02', '{"address": "1234 Test St", "city": "Testville", "state": "TS"}', 'pending')
     ]
     for user_from, user_to, date, location_metadata, status in dates_to_insert:
         cur.execute(
@@ -59,18 +60,18 @@ def setup_test_data(db_conn):
 
     # Clear test date data after test
     cur.execute(
-        "DELETE FROM dates WHERE (user_from = 'user123' AND user_to = 'user456') "
-        "OR (user_from = 'user456' AND user_to = 'user123') AND date IN ('2024-01-01', '2024-01-02');"
+        f"DELETE FROM dates WHERE (user_from = '{WORKER_PREFIX}user123' AND user_to = '{WORKER_PREFIX}user456') "
+        f"OR (user_from = '{WORKER_PREFIX}user456' AND user_to = '{WORKER_PREFIX}user123') AND date IN ('2024-01-01', '2024-01-02');"
     )
     # Remove test users
-    cur.execute("DELETE FROM users WHERE user_id IN ('user123', 'user456');")
+    cur.execute(f"DELETE FROM users WHERE user_id IN ('{WORKER_PREFIX}user123', '{WORKER_PREFIX}user456');")
     db_conn.commit()
     cur.close()
 
 # Function to simulate patching data to update or create a date
 def patch_update_date(url, date_data, expected_status_code):
     headers = {
-        "Authorization": "Bearer test-user123"  # Test token for user 123
+        "Authorization": f"Bearer test-{WORKER_PREFIX}user123"  # Test token for user 123
     }
     response = requests.patch(url, json=date_data, headers=headers)
     assert response.status_code == expected_status_code
@@ -84,8 +85,8 @@ def test_update_date():
     new_date = {
         "date": "2024-01-01",
         "time": "18:00",
-        "userFrom": "user123",
-        "userTo": "user456",
+        "userFrom": f"{WORKER_PREFIX}user123",
+        "userTo": f"{WORKER_PREFIX}user456",
         "locationMetadata": {
             "address": "1234 Test St",
             "city": "Testville",
@@ -111,8 +112,8 @@ def test_update_date():
     update_date = {
         "dateId": response_data['dateId'],
         "time": "20:00",
-        "userFrom": "user123",
-        "userTo": "user456",
+        "userFrom": f"{WORKER_PREFIX}user123",
+        "userTo": f"{WORKER_PREFIX}user456",
         "locationMetadata": {
             "address": "5678 Test Ave",
             "city": "Newville",
@@ -134,8 +135,8 @@ def test_update_date():
     # Test updating the existing date entry to change the status to pending
     update_pending = {
         "dateId": response_data['dateId'],
-        "userFrom": "user123",
-        "userTo": "user456",
+        "userFrom": f"{WORKER_PREFIX}user123",
+        "userTo": f"{WORKER_PREFIX}user456",
         "userFromApproved": False,
     }
     response_pending = patch_update_date(url, update_pending, 200)
@@ -147,8 +148,8 @@ def test_update_date():
     non_existent_date_update = {
         "dateId": 99999,
         "time": "20:00",
-        "userFrom": "user123",
-        "userTo": "user456",
+        "userFrom": f"{WORKER_PREFIX}user123",
+        "userTo": f"{WORKER_PREFIX}user456",
         "locationMetadata": {
             "address": "5678 Test Ave",
             "city": "Newville",
@@ -166,8 +167,8 @@ def test_update_date():
     update_cancelled = {
         "dateId": response_data['dateId'],
         "time": "20:00",
-        "userFrom": "user123",
-        "userTo": "user456",
+        "userFrom": f"{WORKER_PREFIX}user123",
+        "userTo": f"{WORKER_PREFIX}user456",
         "locationMetadata": {
             "address": "5678 Test Ave",
             "city": "Newville",
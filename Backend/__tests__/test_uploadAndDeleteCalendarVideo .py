@@ -1,6 +1,7 @@
 import pytest
 import requests
 import os
+from test_setup_helpers import WORKER_PREFIX
 
 @pytest.fixture(scope="function")
 def setup_test_data(db_conn):
@@ -9,15 +10,15 @@ def setup_test_data(db_conn):
 
     # Clear previous calendar day data
     cur.execute(
-        "DELETE FROM calendar_day WHERE user_id = 'user123' AND date = '2024-01-01';"
+        f"DELETE FROM calendar_day WHERE user_id = '{WORKER_PREFIX}user123' AND date = '2024-01-01';"
     )
 
     # Clear previous user data
-    cur.execute("DELETE FROM users WHERE user_id = 'user123';")
+    cur.execute(f"DELETE FROM users WHERE user_id = '{WORKER_PREFIX}user123';")
 
     # Insert test user if it does not exist
     user_data = (
-        'user123', 'John', 'Doe', 'http://example.com/profile.jpg', 'http://example.com/video.mp4',
+        f'{WORKER_PREFIX}user123', 'John', 'Doe', 'http://example.com/profile.jpg', 'http://example.com/video.mp4',
         '12345', '{"sticker1": "value1"}', True
     )
     cur.execute(
@@ -31,7 +32,7 @@ def setup_test_data(db_conn):
 
     # Insert test calendar day if it does not exist
     calendar_day_to_insert = (
-        'user123', '2024-01-01', None
+        f'{WORKER_PREFIX}user123', '2024-01-01', None
     )
     cur.execute(
         """
@@ -48,16 +49,16 @@ def setup_test_data(db_conn):
 
     # Clear test data after test
     cur.execute(
-        "DELETE FROM calendar_day WHERE user_id = 'user123' AND date = '2024-01-01';"
+        f"DELETE FROM calendar_day WHERE user_id = '{WORKER_PREFIX}user123' AND date = '2024-01-01';"
     )
-    cur.execute("DELETE FROM users WHERE user_id = 'user123';")
+    cur.execute(f"DELETE FROM users WHERE user_id = '{WORKER_PREFIX}user123';")
     db_conn.commit()
     cur.close()
 
 # Function to simulate posting a video file
 def post_calendar_video(url, video_path, form_data, expected_status_code):
     headers = {
-        "Authorization": "Bearer test-user123"  # Test token for user 123
+        "Authorization": f"Bearer test-{WORKER_PREFIX}user123"  # Test token for user 123
     }
     files = {
         'video': open(video_path, 'rb')
@@ -73,7 +74,7 @@ def post_calendar_video(url, video_path, form_data, expected_status_code):
 def delete_calendar_video(url, data, expected_status_code):
     headers = {
         'Content-Type': 'application/json',
-        "Authorization": "Bearer test-user123"  # Test token for user 123
+        "Authorization": f"Bearer test-{WORKER_PREFIX}user123"  # Test token for user 123
     }
     response = requests.delete(url, json=data, headers=headers)
     assert response.status_code == expected_status_code
@@ -101,10 +102,10 @@ def test_upload_and_delete_calendar_video():
     assert response_delete['message'] == 'Calendar day updated successfully', "Failed to delete calendar video"
 
     # Verify the video URL is set to null
-    calendar_day_url = f"http://localhost:3000/calendarDays/user123/{date}"
+    calendar_day_url = f"http://localhost:3000/calendarDays/{WORKER_PREFIX}user123/{date}"
     response_calendar_day = requests.get(calendar_day_url, headers={
         'Content-Type': 'application/json',
-        "Authorization": "Bearer test-user123"  # Test token for user 123
+        "Authorization": f"Bearer test-{WORKER_PREFIX}user123"  # Test token for user 123
     })
     assert response_calendar_day.status_code == 200, f"Failed to get calendar day, status code: {response_calendar_day.status_code}"
     calendar_day_data = response_calendar_day.json()
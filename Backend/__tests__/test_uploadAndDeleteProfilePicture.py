@@ -1,6 +1,7 @@
 import pytest
 import requests
 import os
+from test_setup_helpers import WORKER_PREFIX
 
 @pytest.fixture(scope="function")
 def setup_test_data(db_conn):
@@ -8,11 +9,11 @@ def setup_test_data(db_conn):
     cur = db_conn.cursor()
 
     # Clear previous user data
-    cur.execute("DELETE FROM users WHERE user_id = 'user123';")
+    cur.execute(f"DELETE FROM users WHERE user_id = '{WORKER_PREFIX}user123';")
 
     # Insert test user if it does not exist
     user_data = (
-        'user123', 'John', 'Doe', None, None,
+        f'{WORKER_PREFIX}user123', 'John', 'Doe', None, None,
         '12345', '{"sticker1": "value1"}', True
     )
     cur.execute(
@@ -29,14 +30,14 @@ def setup_test_data(db_conn):
     yield
 
     # Clear test data after test
-    cur.execute("DELETE FROM users WHERE user_id = 'user123';")
+    cur.execute(f"DELETE FROM users WHERE user_id = '{WORKER_PREFIX}user123';")
     db_conn.commit()
     cur.close()
 
 # Function to simulate posting an image file
 def post_profile_picture(url, image_path, form_data, expected_status_code):
     headers = {
-        "Authorization": "Bearer test-user123"  # Test token for user 123
+        "Authorization": f"Bearer test-{WORKER_PREFIX}user123"  # Test token for user 123
     }
     files = {
         'image': open(image_path, 'rb')
@@ -52,7 +53,7 @@ def post_profile_picture(url, image_path, form_data, expected_status_code):
 def delete_profile_picture(url, data, expected_status_code):
     headers = {
         'Content-Type': 'application/json',
-        "Authorization": "Bearer test-user123"  # Test token for user 123
+        "Authorization": f"Bearer test-{WORKER_PREFIX}user123"  # Test token for user 123
     }
     response = requests.delete(url, json=data, headers=headers)
     assert response.status_code == expected_status_code
@@ -78,10 +79,10 @@ def test_upload_and_delete_profile_picture():
     assert response_delete['message'] == 'Profile picture deleted successfully', "Failed to delete profile picture"
 
     # Verify the profile picture URL is set to null
-    user_url = "http://localhost:3000/users/user123"
+    user_url = f"http://localhost:3000/users/{WORKER_PREFIX}user123"
     response_user = requests.get(user_url, headers={
         'Content-Type': 'application/json',
-        "Authorization": "Bearer test-user123"  # Test token for user 123
+        "Authorization": f"Bearer test-{WORKER_PREFIX}user123"  # Test token for user 123
     })
     assert response_user.status_code == 200, f"Failed to get user, status code: {response_user.status_code}"
     user_data = response_user.json()
@@ -0,0 +1,108 @@
+# Checks the dataPreparation builds against each other on a small zipcode sample:
+# Philadelphia/Camden (dense, many neighbors) plus three Alaskan zipcodes out west.
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+DATA_PREPARATION_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'dataPreparation')
+sys.path.insert(0, DATA_PREPARATION_DIR)
+import createZipcodeWithinRangesCsv as zipcodes  # noqa: E402
+from geoCells import geohash_encode  # noqa: E402
+from zipcodeNeighborIndex import NeighborIndex, write_neighbor_index  # noqa: E402
+
+# Pure file builds, no database or API server involved
+pytestmark = pytest.mark.db_only
+
+SAMPLE_CSV = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'testzipcodes', 'zipcodes_sample.csv')
+RADII = [5, 10, 20]
+
+def build_csv(input_path, output_path):
+    gdf = zipcodes.load_zipcodes(input_path)
+    zipcodes.groups_frame(gdf, RADII).to_csv(output_path, index=False)
+    zipcodes.write_manifest(output_path, input_path, RADII, gdf)
+
+def read_groups(path):
+    return pd.read_csv(path, dtype=str).set_index('zipcode').sort_index()
+
+def test_incremental_rebuild_matches_full_rebuild(tmp_path):
+    output = str(tmp_path / 'groups.csv')
+    build_csv(SAMPLE_CSV, output)
+
+    # Move one zipcode across the city, drop one and add a new one next to another
+    sample = pd.read_csv(SAMPLE_CSV, dtype={'zipcode': str})
+    sample.loc[sample['zipcode'] == '19102', ['longitude', 'latitude']] = (-75.05, 40.0)
+    sample = sample[sample['zipcode'] != '19104']
+    sample = pd.concat([sample, pd.DataFrame({'longitude': [-75.17], 'latitude': [39.96], 'zipcode': ['19199']})])
+    changed_input = str(tmp_path / 'changed.csv')
+    sample.to_csv(changed_input, index=False)
+
+    gdf = zipcodes.load_zipcodes(changed_input)
+    manifest = zipcodes.read_manifest(output, RADII)
+    patched, _, removed = zipcodes.rebuild_incrementally(gdf, RADII, output, manifest)
+    assert removed == ['19104']
+    patched.to_csv(output, index=False)
+
+    full = str(tmp_path / 'full.csv')
+    build_csv(changed_input, full)
+    pd.testing.assert_frame_equal(read_groups(output), read_groups(full))
+
+def neighbor_lists(index):
+    return {zipcode: [(neighbor, round(float(miles), 3)) for neighbor, miles in zip(*index.neighbors(zipcode))]
+            for zipcode in index.zipcodes.tolist()}
+
+def test_tiled_index_matches_untiled_index(tmp_path):
+    gdf = zipcodes.load_zipcodes(SAMPLE_CSV)
+    src, dst, dist = zipcodes.find_neighbor_pairs(gdf, max(RADII))
+    write_neighbor_index(str(tmp_path / 'untiled'), gdf['zipcode'].to_numpy(), src, dst, dist, max(RADII))
+
+    # Tiles smaller than the radius, so most pairs cross a tile edge and come from the halo
+    order, tiles, results = zipcodes.run_tiles(gdf, max(RADII), 0.1, 1, str(tmp_path))
+    zipcodes.write_tiled_index(str(tmp_path / 'tiled'), gdf['zipcode'].to_numpy()[order], results, tiles,
+                               max(RADII))
+
+    untiled = neighbor_lists(NeighborIndex(str(tmp_path / 'untiled')))
+    tiled = neighbor_lists(NeighborIndex(str(tmp_path / 'tiled')))
+    assert tiled.keys() == untiled.keys()
+    for zipcode, neighbors in untiled.items():
+        # Rows are numbered differently, so equal distances may come back in another order
+        assert sorted(tiled[zipcode]) == sorted(neighbors), f'{zipcode} differs between tiled and untiled'
+
+def test_index_lookups_match_csv(tmp_path):
+    output = str(tmp_path / 'groups.csv')
+    build_csv(SAMPLE_CSV, output)
+    gdf = zipcodes.load_zipcodes(SAMPLE_CSV)
+    src, dst, dist = zipcodes.find_neighbor_pairs(gdf, max(RADII))
+    write_neighbor_index(str(tmp_path / 'index'), gdf['zipcode'].to_numpy(), src, dst, dist, max(RADII))
+    index = NeighborIndex(str(tmp_path / 'index'))
+
+    groups = read_groups(output)
+    assert len(groups) == len(index.zipcodes)
+    for zipcode, row in groups.iterrows():
+        for miles in RADII:
+            found, _ = index.neighbors(zipcode, miles)
+            assert found.tolist() == zipcodes.parse_postgres_array(row[f'within_{miles}_miles']), \
+                f'{zipcode} within {miles} miles'
+    # Camden's 4-digit source zipcodes come out padded, like users.zipcode
+    assert '08102' in index.rows and '19102' in index.neighbors('08102', 5)[0].tolist()
+
+# (latitude, longitude) -> encodeGeoCell(latitude, longitude, 3) and (..., 4) from src/geoCell.ts
+GEO_CELL_TS = {
+    (39.952962, -75.16558): ('dr4', 'dr4e'),
+    (51.87957, -176.63675): ('b14', 'b14r'),
+    (21.3069, -157.8583): ('87z', '87z9'),
+    (0.0, 0.0): ('s00', 's000'),
+    (-33.8688, 151.2093): ('r3g', 'r3gx'),
+    (90.0, 180.0): ('zzz', 'zzzz'),
+}
+
+def test_geo_cells_match_server_encoding():
+    lat, lon = (np.array(a) for a in zip(*GEO_CELL_TS))
+    for position, precision in enumerate((3, 4)):
+        expected = [cells[position] for cells in GEO_CELL_TS.values()]
+        assert geohash_encode(lon, lat, precision).tolist() == expected
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,131 @@
+import argparse
+import os
+import time
+
+import numpy as np
+from psycopg2.extras import execute_values
+
+from createZipcodeWithinRangesCsv import db_conn, load_zipcodes
+from geoCells import geohash_encode
+
+USER_GEO_CELL_PRECISION = 4  # Same as src/geoCell.ts
+
+# Users the stories query can't place yet: no coordinates, or no geo_cell (see geoCells.py).
+# Walks the primary key from the cursor, so every batch is an index range scan.
+SELECT_BATCH = '''
+    SELECT user_id, zipcode, latitude, longitude
+    FROM users
+    WHERE user_id > %s
+      AND (latitude IS NULL OR longitude IS NULL OR geo_cell IS NULL)
+    ORDER BY user_id
+    LIMIT %s
+'''
+
+UPDATE_BATCH = '''
+    UPDATE users AS u
+    SET latitude = v.latitude, longitude = v.longitude, geo_cell = v.geo_cell,
+        updated_at = CURRENT_TIMESTAMP
+    FROM (VALUES %s) AS v(user_id, latitude, longitude, geo_cell)
+    WHERE u.user_id = v.user_id
+'''
+
+# zipcode -> (latitude, longitude) from the same CSV the zipcode groups are built from
+def load_coordinates(csv_path):
+    gdf = load_zipcodes(csv_path)
+    return dict(zip(gdf['zipcode'], zip(gdf.geometry.y.to_numpy(), gdf.geometry.x.to_numpy())))
+
+# (user_id, latitude, longitude, geo_cell) for every row we can fix. Rows that already have
+# coordinates keep them and only get a geo_cell, the rest are looked up by 5-digit zipcode
+# (users.zipcode may hold ZIP+4). Unknown zipcodes are left alone.
+def resolve_batch(rows, coordinates):
+    resolved = []
+    for user_id, zipcode, latitude, longitude in rows:
+        if latitude is None or longitude is None:
+            coords = coordinates.get((zipcode or '').strip()[:5].zfill(5))
+            if coords is None:
+                continue
+            latitude, longitude = coords
+        resolved.append((user_id, float(latitude), float(longitude)))
+    if not resolved:
+        return []
+
+    lat = np.array([r[1] for r in resolved])
+    lon = np.array([r[2] for r in resolved])
+    cells = geohash_encode(lon, lat, USER_GEO_CELL_PRECISION)
+    return [(user_id, latitude, longitude, cell)
+            for (user_id, latitude, longitude), cell in zip(resolved, cells.tolist())]
+
+def read_cursor(path):
+    if path and os.path.exists(path):
+        with open(path) as f:
+            return f.read().strip()
+    return ''
+
+def write_cursor(path, user_id):
+    if not path:
+        return
+    tmp = f'{path}.tmp'
+    with open(tmp, 'w') as f:
+        f.write(user_id)
+    os.replace(tmp, path)
+
+# One short transaction per batch, committed before the cursor moves, so the job can be
+# killed at any point and restarted where it left off.
+def backfill(conn, coordinates, cursor, batch_size, pause_seconds, cursor_file, dry_run):
+    scanned = updated = 0
+    start = time.perf_counter()
+    while True:
+        with conn, conn.cursor() as cur:
+            cur.execute(SELECT_BATCH, (cursor, batch_size))
+            rows = cur.fetchall()
+            if not rows:
+                break
+            values = resolve_batch(rows, coordinates)
+            if values and not dry_run:
+                execute_values(cur, UPDATE_BATCH, values,
+                               template='(%s, %s::double precision, %s::double precision, %s)',
+                               page_size=len(values))
+        cursor = rows[-1][0]
+        scanned += len(rows)
+        updated += len(values)
+        if not dry_run:
+            write_cursor(cursor_file, cursor)
+        elapsed = time.perf_counter() - start
+        print(f'{scanned} users scanned, {updated} {"fixable" if dry_run else "updated"}, '
+              f'cursor {cursor} ({scanned / elapsed:.0f} rows/s)')
+        if len(rows) < batch_size:
+            break
+        # Leave the primary some room between batches
+        time.sleep(pause_seconds)
+    return scanned, updated
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description='Fill users.latitude/longitude/geo_cell from the zipcode CSV in batches.')
+    parser.add_argument('--input', default='US_zipcodes_longitude_and_latitude.csv')
+    parser.add_argument('--batch-size', type=int, default=5000, help='Users per UPDATE (default: 5000)')
+    parser.add_argument('--pause', type=float, default=0.2,
+                        help='Seconds to sleep between batches (default: 0.2)')
+    parser.add_argument('--cursor-file', default='backfill_user_coordinates.cursor',
+                        help='Last committed user_id, read on start and rewritten after every batch')
+    parser.add_argument('--start-after', default=None,
+                        help='Start after this user_id instead of the one in --cursor-file')
+    parser.add_argument('--dry-run', action='store_true', help='Count fixable users without writing')
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    cursor = args.start_after if args.start_after is not None else read_cursor(args.cursor_file)
+    coordinates = load_coordinates(args.input)
+    print(f'Loaded {len(coordinates)} zipcodes, starting after user_id {cursor!r}')
+
+    conn = db_conn()
+    try:
+        scanned, updated = backfill(conn, coordinates, cursor, args.batch_size, args.pause,
+                                    args.cursor_file, args.dry_run)
+    finally:
+        conn.close()
+    print(f'Done: {scanned} users scanned, {updated} {"fixable" if args.dry_run else "updated"}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,141 @@
+import argparse
+import io
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
+
+import numpy as np
+import pandas as pd
+import geopandas as gpd
+
+from createZipcodeWithinRangesCsv import (
+    DEFAULT_RADII_MILES, find_nearby_zipcodes, find_neighbor_pairs, format_postgres_array, load_zipcodes,
+)
+from zipcodeNeighborIndex import write_neighbor_index
+
+DEFAULT_SIZES = (1_000, 10_000, 43_000, 200_000)
+JITTER_DEG = 0.05  # ~3.5 miles, keeps resampled points from stacking on the same spot
+
+# Synthetic point cloud with the real density pattern: resample the zipcode CSV with
+# replacement and jitter each point, so 200k points look like a denser US, not a uniform box.
+# Seeded, so every commit benchmarks the same points.
+def synthetic_zipcodes(csv_path, size, seed=0):
+    real = load_zipcodes(csv_path)
+    rng = np.random.default_rng(seed)
+    pick = rng.integers(0, len(real), size)
+    lon = real.geometry.x.to_numpy()[pick] + rng.normal(0, JITTER_DEG, size)
+    lat = np.clip(real.geometry.y.to_numpy()[pick] + rng.normal(0, JITTER_DEG, size), -89.9, 89.9)
+    zipcodes = np.char.zfill(np.arange(size).astype(str), 6)
+    return gpd.GeoDataFrame({'zipcode': zipcodes, 'longitude': lon, 'latitude': lat},
+                            geometry=gpd.points_from_xy(lon, lat), crs='EPSG:4326')
+
+def peak_rss_mb():
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    scale = 1 if sys.platform == 'darwin' else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale / 2 ** 20
+
+def directory_bytes(directory):
+    return sum(os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory))
+
+# One (size, radius) case. Runs in a fresh worker process so peak RSS belongs to this case alone.
+def run_case(csv_path, size, miles):
+    gdf = synthetic_zipcodes(csv_path, size)
+    baseline_mb = peak_rss_mb()
+
+    start = time.perf_counter()
+    neighbors = find_nearby_zipcodes(gdf, [miles])[miles]
+    neighbors_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    out = pd.DataFrame({'zipcode': gdf['zipcode'].to_numpy(),
+                        f'within_{miles:g}_miles': [format_postgres_array(n) for n in neighbors]})
+    buffer = io.StringIO()
+    out.to_csv(buffer, index=False)
+    csv_bytes = len(buffer.getvalue().encode())
+    csv_seconds = time.perf_counter() - start
+    pairs = int(sum(len(n) for n in neighbors))
+    del neighbors, out, buffer
+
+    start = time.perf_counter()
+    with tempfile.TemporaryDirectory(prefix='zipcode_bench_') as directory:
+        src, dst, dist = find_neighbor_pairs(gdf, miles)
+        write_neighbor_index(directory, gdf['zipcode'].to_numpy(), src, dst, dist, miles)
+        csr_bytes = directory_bytes(directory)
+    csr_seconds = time.perf_counter() - start
+
+    return {
+        'points': size,
+        'radius_miles': miles,
+        'pairs': pairs,
+        'neighbors_seconds': round(neighbors_seconds, 3),
+        'csv_format_seconds': round(csv_seconds, 3),
+        'csv_bytes': csv_bytes,
+        'csr_seconds': round(csr_seconds, 3),
+        'csr_bytes': csr_bytes,
+        'baseline_rss_mb': round(baseline_mb, 1),
+        'peak_rss_mb': round(peak_rss_mb(), 1),
+    }
+
+def run_isolated(csv_path, size, miles):
+    # spawn, not fork, so the child starts without the parent's memory
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as pool:
+        try:
+            return pool.submit(run_case, csv_path, size, miles).result()
+        except BrokenProcessPool:
+            return {'points': size, 'radius_miles': miles, 'error': 'worker died (out of memory?)'}
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description='Benchmark zipcode neighbor generation and its CSV/CSR output on synthetic points.')
+    parser.add_argument('--input', default='US_zipcodes_longitude_and_latitude.csv',
+                        help='Real zipcodes the synthetic points are resampled from')
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES),
+                        help='Point counts (default: 1000 10000 43000 200000)')
+    parser.add_argument('--radii', type=float, nargs='+', default=list(DEFAULT_RADII_MILES),
+                        help='Radii in miles, each benchmarked on its own (default: 5 10 20)')
+    parser.add_argument('--output', default='benchmark_results.json',
+                        help='JSON results, stable key order so runs can be diffed across commits')
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    cases = []
+    for size in args.sizes:
+        for miles in sorted(set(args.radii)):
+            result = run_isolated(args.input, size, miles)
+            cases.append(result)
+            if 'error' in result:
+                print(f'{size:>7} points, {miles:g} miles: {result["error"]}')
+                continue
+            print(f'{size:>7} points, {miles:g} miles: {result["pairs"]} pairs, '
+                  f'neighbors {result["neighbors_seconds"]:.2f}s, csv {result["csv_bytes"] / 2 ** 20:.1f} MiB, '
+                  f'csr {result["csr_bytes"] / 2 ** 20:.1f} MiB, peak {result["peak_rss_mb"]:.0f} MiB')
+
+    with open(args.output, 'w') as f:
+        json.dump({
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'cpu_count': os.cpu_count(),
+            'cases': cases,
+        }, f, indent=2, sort_keys=True)
+        f.write('\n')
+    print(f'Wrote {len(cases)} cases to {args.output}')
+
+if __name__ == '__main__':
+    main()
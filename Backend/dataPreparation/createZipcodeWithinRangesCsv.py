@@ -1,41 +1,520 @@
+import argparse
+import hashlib
+import io
+import json
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
 import pandas as pd
 import geopandas as gpd
-from shapely.geometry import Point
-from geopandas.tools import sjoin
-
-# Load the CSV file
-df = pd.read_csv('US_zipcodes_longitude_and_latitude.csv')
-df['geometry'] = [Point(xy) for xy in zip(df.longitude, df.latitude)]
-gdf = gpd.GeoDataFrame(df, geometry='geometry')
-
-# Create a spatial index
-gdf.set_crs(epsg=4326, inplace=True)  # Make sure coordinates are in latitude/longitude
-gdf = gdf.to_crs(epsg=3857)  # Convert to metric system for distance calculations (meters)
-spatial_index = gdf.sindex
-
-# Function to find nearby zip codes within specified meters
-def find_nearby_zipcodes(gdf, distance_in_meters):
-    gdf['within_distance'] = gdf.geometry.apply(lambda geom: 
-        gdf.iloc[list(spatial_index.intersection(geom.buffer(distance_in_meters).bounds))].zipcode.tolist())
-    print(f'Found zip codes within {distance_in_meters} meters')
-    return gdf
+import shapely
+import psycopg2
+from psycopg2 import sql
+from dotenv import load_dotenv
+
+from zipcodeNeighborIndex import write_neighbor_index
+from geoCells import cell_neighbor_sets, precision_for_radius
+
+EARTH_RADIUS_MILES = 3958.8
+MILES_PER_DEGREE_LAT = np.pi * EARTH_RADIUS_MILES / 180
+DEFAULT_RADII_MILES = (5, 10, 20)
+
+# Load the CSV file as lon/lat points
+def load_zipcodes(csv_path):
+    df = pd.read_csv(csv_path, dtype={'zipcode': str})
+    # The source CSV drops leading zeros (e.g. 501 for 00501), users.zipcode keeps them
+    df['zipcode'] = df['zipcode'].str.zfill(5)
+    return gpd.GeoDataFrame(df, geometry=gpd.points_from_xy(df.longitude, df.latitude), crs='EPSG:4326')
+
+# Great-circle distance in miles between lon/lat arrays given in degrees
+def haversine_miles(lon1, lat1, lon2, lat2):
+    lon1, lat1, lon2, lat2 = map(np.radians, (lon1, lat1, lon2, lat2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_MILES * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+# Boxes for lon ranges [west, east] that may run past ±180. A range that does is split in
+# two at the antimeridian, e.g. Adak (-176.6) at 200 miles also needs a box near +180.
+# Returns the boxes and, for each box, the index of the range it came from.
+def antimeridian_boxes(west, south, east, north):
+    west, south, east, north = (np.atleast_1d(np.asarray(a, dtype=float)) for a in (west, south, east, north))
+    boxes = shapely.box(np.maximum(west, -180), south, np.minimum(east, 180), north)
+    # A range past both edges already covers every longitude once clipped
+    over_east, over_west = east > 180, west < -180
+    wrap = np.flatnonzero(over_east ^ over_west)
+    wrapped = shapely.box(np.where(over_east[wrap], -180, west[wrap] + 360), south[wrap],
+                          np.where(over_east[wrap], east[wrap] - 360, 180), north[wrap])
+    return np.concatenate([boxes, wrapped]), np.concatenate([np.arange(len(west)), wrap])
+
+# Lon/lat boxes around each point that are guaranteed to contain its radius circle.
+# A degree of longitude shrinks with cos(latitude), so widen using the poleward edge.
+# Returns the boxes and the position in lon/lat of the point each belongs to (see antimeridian_boxes).
+def search_boxes(lon, lat, distance_in_miles):
+    dlat = distance_in_miles / MILES_PER_DEGREE_LAT
+    edge_lat = np.minimum(np.abs(lat) + dlat, 89.9)
+    dlon = np.minimum(dlat / np.cos(np.radians(edge_lat)), 180.0)
+    return antimeridian_boxes(lon - dlon, lat - dlat, lon + dlon, lat + dlat)
+
+# Find every zipcode pair within the largest radius in one bulk spatial index query.
+# The index only narrows candidates down to boxes, so each pair is then checked
+# against its exact great-circle distance.
+# Returns (source, neighbor, distance_in_miles) arrays sorted by source, then by distance.
+# `sources` (sorted row positions) limits the query to those rows, every row by default.
+def find_neighbor_pairs(gdf, max_distance_in_miles, sources=None):
+    lon = gdf.geometry.x.to_numpy()
+    lat = gdf.geometry.y.to_numpy()
+    return neighbor_pairs(lon, lat, gdf.sindex, max_distance_in_miles, sources)
+
+# Same as find_neighbor_pairs on plain lon/lat arrays and a spatial index (STRtree) over them
+def neighbor_pairs(lon, lat, tree, max_distance_in_miles, sources=None):
+    if sources is None:
+        sources = np.arange(len(lon))
+    boxes, owner = search_boxes(lon[sources], lat[sources], max_distance_in_miles)
+    box, dst = tree.query(boxes)
+    src = sources[owner[box]]
+    if len(boxes) > len(sources):
+        # Both halves of a split box can touch a point right on the antimeridian
+        _, first = np.unique(src.astype(np.int64) * len(lon) + dst, return_index=True)
+        src, dst = src[first], dst[first]
+
+    dist = haversine_miles(lon[src], lat[src], lon[dst], lat[dst])
+    keep = dist <= max_distance_in_miles
+    src, dst, dist = src[keep], dst[keep], dist[keep]
+
+    # Ties on distance fall back to row order, so partial rebuilds match full ones exactly
+    order = np.lexsort((dst, dist, src))
+    return src[order], dst[order], dist[order]
+
+# Function to find nearby zip codes within each radius (in miles) from a single neighbor list.
+# Returns one list per row in `sources` (every row by default) for each radius.
+def find_nearby_zipcodes(gdf, radii_miles=DEFAULT_RADII_MILES, sources=None):
+    if sources is None:
+        sources = np.arange(len(gdf))
+    src, dst, dist = find_neighbor_pairs(gdf, max(radii_miles), sources)
+    groups = split_by_radius(gdf['zipcode'].to_numpy(), src, dst, dist, radii_miles, sources)
+    for miles in radii_miles:
+        print(f'Found zip codes within {miles:g} miles')
+    return groups
+
+# Cut sorted (source, neighbor, distance) pairs into one zipcode list per source and radius
+def split_by_radius(zipcodes, src, dst, dist, radii_miles, sources):
+    groups = {}
+    for miles in radii_miles:
+        within = dist <= miles
+        counts = np.bincount(np.searchsorted(sources, src[within]), minlength=len(sources))
+        groups[miles] = np.split(zipcodes[dst[within]], np.cumsum(counts)[:-1])
+    return groups
 
 # Helper function to format the list of zip codes as a PostgreSQL array
 def format_postgres_array(zip_codes):
     return "{" + ",".join(map(str, zip_codes)) + "}"
 
-# Calculate for 5 miles (8047 meters), 10 miles (16093 meters), and 20 miles (32186 meters)
-gdf = find_nearby_zipcodes(gdf, 8047)  # 5 miles in meters
-gdf['within_5_miles'] = gdf['within_distance'].apply(format_postgres_array)
+def parse_postgres_array(value):
+    return value.strip('{}').split(',') if value != '{}' else []
+
+# One row per zipcode with a within_<r>_miles column per radius, for `sources` rows only
+def groups_frame(gdf, radii_miles, sources=None):
+    if sources is None:
+        sources = np.arange(len(gdf))
+    out = pd.DataFrame({'zipcode': gdf['zipcode'].to_numpy()[sources]})
+    for miles, neighbors in find_nearby_zipcodes(gdf, radii_miles, sources).items():
+        out[f'within_{miles:g}_miles'] = [format_postgres_array(n) for n in neighbors]
+    return out
+
+# One (cell, radius_miles, neighbor_cells) row per populated geohash cell and radius,
+# for the story_feed.geo_cell_3 prefilter in findNearbyStoriesByDate
+def geo_cells_frame(gdf, radii_miles):
+    lon = gdf.geometry.x.to_numpy()
+    lat = gdf.geometry.y.to_numpy()
+    frames = []
+    for miles in radii_miles:
+        rows = cell_neighbor_sets(lon, lat, miles, precision_for_radius(miles), MILES_PER_DEGREE_LAT)
+        frames.append(pd.DataFrame({
+            'cell': [cell for cell, _ in rows],
+            'radius_miles': miles,
+            'neighbor_cells': [format_postgres_array(cells) for _, cells in rows],
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+# --- Tiled builds ---
+# Large radii (the server searches 200 miles) produce far more pairs than fit comfortably in
+# memory at once. Tiled mode sorts zipcodes into lon/lat tiles so every tile is a contiguous
+# block of rows, computes each tile in a worker process against the tile plus a halo of every
+# point within the radius of it, and streams each tile's pairs to disk. Output is then
+# assembled one tile at a time, in tile (= row) order.
+
+TILE_CHUNK_ROWS = 1024  # Sources per bulk query inside a worker, bounds the candidate arrays
+
+def tile_order(lon, lat, tile_size_deg):
+    """Row order that makes every tile contiguous, and the [start, end) row range of each tile"""
+    tx = np.floor((lon - lon.min()) / tile_size_deg).astype(np.int64)
+    ty = np.floor((lat - lat.min()) / tile_size_deg).astype(np.int64)
+    keys = ty * (tx.max() + 1) + tx
+    order = np.argsort(keys, kind='stable')
+    bounds = np.flatnonzero(np.diff(keys[order])) + 1
+    starts = np.concatenate(([0], bounds))
+    ends = np.concatenate((bounds, [len(lon)]))
+    return order, list(zip(starts, ends))
+
+def compute_tile(task):
+    """Worker: pairs for rows [start, end) of the tiled order, written to `path` as .npz"""
+    start, end, halo_rows, lon, lat, max_distance_in_miles, path = task
+    tree = shapely.STRtree(shapely.points(lon, lat))
+    # halo_rows is sorted and contains the tile's own rows, so they are a contiguous slice of it
+    first = np.searchsorted(halo_rows, start)
+    sources = np.arange(first, first + (end - start))
+
+    parts = [neighbor_pairs(lon, lat, tree, max_distance_in_miles, chunk)
+             for chunk in np.array_split(sources, max(1, len(sources) // TILE_CHUNK_ROWS))]
+    src, dst, dist = (np.concatenate(a) for a in zip(*parts))
+    np.savez(path, src=halo_rows[src].astype(np.int32), dst=halo_rows[dst].astype(np.int32),
+             dist=dist.astype(np.float32))
+    return path, len(dst)
+
+def tile_tasks(lon, lat, tiles, max_distance_in_miles, workdir):
+    """One task per tile with the tile's halo: every point inside the union of its search boxes"""
+    tree = shapely.STRtree(shapely.points(lon, lat))
+    dlat = max_distance_in_miles / MILES_PER_DEGREE_LAT
+    for i, (start, end) in enumerate(tiles):
+        tile_lon, tile_lat = lon[start:end], lat[start:end]
+        edge_lat = min(np.abs(tile_lat).max() + dlat, 89.9)
+        dlon = min(dlat / np.cos(np.radians(edge_lat)), 180.0)
+        halo, _ = antimeridian_boxes(tile_lon.min() - dlon, tile_lat.min() - dlat,
+                                     tile_lon.max() + dlon, tile_lat.max() + dlat)
+        halo_rows = np.unique(tree.query(halo)[1])
+        yield (start, end, halo_rows, lon[halo_rows], lat[halo_rows], max_distance_in_miles,
+               os.path.join(workdir, f'tile_{i:05d}.npz'))
+
+def run_tiles(gdf, max_distance_in_miles, tile_size_deg, workers, workdir):
+    """Tiled row order, each tile's row range, and each tile's (path, pair count)"""
+    lon = gdf.geometry.x.to_numpy()
+    lat = gdf.geometry.y.to_numpy()
+    order, tiles = tile_order(lon, lat, tile_size_deg)
+    lon, lat = lon[order], lat[order]
+    print(f'Computing {len(tiles)} tiles of {tile_size_deg:g} degrees on {workers} workers')
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(compute_tile, tile_tasks(lon, lat, tiles, max_distance_in_miles, workdir)))
+    return order, tiles, results
+
+def write_tiled_index(directory, zipcodes, results, tiles, max_distance_in_miles):
+    """Assemble tile files into the CSR index without holding more than one tile in memory"""
+    os.makedirs(directory, exist_ok=True)
+    total = sum(count for _, count in results)
+    offsets = np.zeros(len(zipcodes) + 1, dtype=np.int32)
+    indices = np.lib.format.open_memmap(os.path.join(directory, 'indices.npy'), mode='w+',
+                                        dtype=np.int32, shape=(total,))
+    distances = np.lib.format.open_memmap(os.path.join(directory, 'distances.npy'), mode='w+',
+                                          dtype=np.float32, shape=(total,))
+    position = 0
+    for (path, count), (start, end) in zip(results, tiles):
+        with np.load(path) as tile:
+            offsets[start + 1:end + 1] = np.bincount(tile['src'] - start, minlength=end - start)
+            indices[position:position + count] = tile['dst']
+            distances[position:position + count] = tile['dist']
+        position += count
+        os.remove(path)
+    np.cumsum(offsets, out=offsets)
+    indices.flush()
+    distances.flush()
+
+    np.save(os.path.join(directory, 'zipcodes.npy'), np.asarray(zipcodes).astype(str))
+    np.save(os.path.join(directory, 'offsets.npy'), offsets)
+    with open(os.path.join(directory, 'index.json'), 'w') as f:
+        json.dump({'max_distance_miles': float(max_distance_in_miles),
+                   'zipcodes': len(zipcodes), 'pairs': int(total)}, f)
+    return total
+
+def write_tiled_csv(output_path, zipcodes, results, tiles, radii_miles):
+    """Append every tile's rows to the CSV as soon as they are formatted"""
+    columns = ['zipcode'] + [f'within_{miles:g}_miles' for miles in radii_miles]
+    pd.DataFrame(columns=columns).to_csv(output_path, index=False)
+    for (path, _), (start, end) in zip(results, tiles):
+        with np.load(path) as tile:
+            sources = np.arange(start, end)
+            groups = split_by_radius(zipcodes, tile['src'], tile['dst'], tile['dist'], radii_miles, sources)
+        out = pd.DataFrame({'zipcode': zipcodes[start:end]})
+        for miles, neighbors in groups.items():
+            out[f'within_{miles:g}_miles'] = [format_postgres_array(n) for n in neighbors]
+        out.to_csv(output_path, mode='a', header=False, index=False)
+        os.remove(path)
+
+# --- Incremental rebuilds ---
+# The manifest next to the output records the radii and a hash of every zipcode's
+# coordinates, so the next run only has to recompute what moved.
+
+def manifest_path(output_path):
+    return os.path.splitext(output_path)[0] + '.manifest.json'
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def coordinate_hashes(gdf):
+    hashes = pd.util.hash_pandas_object(gdf[['longitude', 'latitude']], index=False)
+    return dict(zip(gdf['zipcode'], (f'{h:016x}' for h in hashes)))
+
+def write_manifest(output_path, input_path, radii_miles, gdf):
+    with open(manifest_path(output_path), 'w') as f:
+        json.dump({
+            'radii': list(radii_miles),
+            'input_sha256': file_sha256(input_path),
+            'zipcodes': coordinate_hashes(gdf),
+        }, f)
+
+def read_manifest(output_path, radii_miles):
+    """Return the previous manifest, or None if a full rebuild is needed"""
+    path = manifest_path(output_path)
+    if not (os.path.exists(path) and os.path.exists(output_path)):
+        return None
+    with open(path) as f:
+        manifest = json.load(f)
+    return manifest if manifest['radii'] == list(radii_miles) else None
+
+# Recompute only the zipcodes whose lists can have changed: every added, moved or removed
+# zipcode plus everything within the largest radius of its old or new position.
+# Returns the patched output, the recomputed rows and the removed zipcodes.
+def rebuild_incrementally(gdf, radii_miles, output_path, manifest):
+    previous = manifest['zipcodes']
+    current = coordinate_hashes(gdf)
+    changed = {z for z, h in current.items() if previous.get(z) != h}
+    removed = set(previous) - set(current)
+
+    old = pd.read_csv(output_path, dtype=str).set_index('zipcode')
+    max_column = f'within_{max(radii_miles):g}_miles'
+
+    # Old neighbors come straight from the existing output, new ones from a query at the new positions
+    affected = set(changed)
+    for zipcode in (changed | removed) & set(old.index):
+        affected.update(parse_postgres_array(old.at[zipcode, max_column]))
+    row_of = pd.Series(np.arange(len(gdf)), index=gdf['zipcode'])
+    changed_rows = np.sort(row_of[list(changed)].to_numpy())
+    if len(changed_rows):
+        _, dst, _ = find_neighbor_pairs(gdf, max(radii_miles), changed_rows)
+        affected.update(gdf['zipcode'].to_numpy()[dst])
+    affected -= removed
+
+    rows = groups_frame(gdf, radii_miles, np.sort(row_of[list(affected)].to_numpy()))
+    patched = old.reindex(gdf['zipcode'])
+    patched.loc[rows['zipcode'], rows.columns[1:]] = rows.set_index('zipcode').to_numpy()
+    print(f'{len(changed)} zip codes added or moved, {len(removed)} removed, {len(rows)} recomputed')
+    return patched.reset_index(), rows, sorted(removed)
+
+def db_conn():
+    """Connect the same way the server does: DATABASE_URL if set, else DB_* variables"""
+    load_dotenv()
+    if os.getenv("DATABASE_URL"):
+        return psycopg2.connect(os.getenv("DATABASE_URL"))
+    return psycopg2.connect(
+        dbname=os.getenv("DB_NAME"),
+        user=os.getenv("DB_USER"),
+        password=os.getenv("DB_PASSWORD"),
+        host=os.getenv("DB_HOST"),
+        port=os.getenv("DB_PORT"),
+    )
+
+# Stream a CSV into a staging table with COPY, then swap it in for the live table.
+# The live table is only locked for the renames at the very end, so stories queries keep
+# reading the old rows while the load runs.
+def swap_in_csv(conn, csv_path, table, column_defs, primary_key):
+    with open(csv_path) as f:
+        columns = f.readline().strip().split(',')
+    staging, old = f'{table}_staging', f'{table}_old'
+
+    start = time.perf_counter()
+    with conn, conn.cursor() as cur:
+        cur.execute(sql.SQL('DROP TABLE IF EXISTS {}').format(sql.Identifier(staging)))
+        cur.execute(sql.SQL('CREATE TABLE {} ({})').format(
+            sql.Identifier(staging), sql.SQL(', ').join(column_defs)))
+        with open(csv_path) as f:
+            cur.copy_expert(
+                sql.SQL('COPY {} ({}) FROM STDIN WITH (FORMAT csv, HEADER true)').format(
+                    sql.Identifier(staging), sql.SQL(', ').join(map(sql.Identifier, columns))),
+                f,
+            )
+        cur.execute(sql.SQL('SELECT count(*) FROM {}').format(sql.Identifier(staging)))
+        rows = cur.fetchone()[0]
+        # Build the index after the data is in, it is much cheaper than maintaining it per row
+        cur.execute(sql.SQL('ALTER TABLE {} ADD PRIMARY KEY ({})').format(
+            sql.Identifier(staging), sql.SQL(', ').join(map(sql.Identifier, primary_key))))
+        cur.execute(sql.SQL('ANALYZE {}').format(sql.Identifier(staging)))
+
+        # Give up instead of queueing behind long-running readers (and blocking everyone after them)
+        cur.execute("SET LOCAL lock_timeout = '5s'")
+        cur.execute(sql.SQL('ALTER TABLE IF EXISTS {} RENAME TO {}').format(
+            sql.Identifier(table), sql.Identifier(old)))
+        cur.execute(sql.SQL('DROP TABLE IF EXISTS {}').format(sql.Identifier(old)))
+        cur.execute(sql.SQL('ALTER TABLE {} RENAME TO {}').format(
+            sql.Identifier(staging), sql.Identifier(table)))
+        cur.execute(sql.SQL('ALTER INDEX {} RENAME TO {}').format(
+            sql.Identifier(f'{staging}_pkey'), sql.Identifier(f'{table}_pkey')))
+
+    elapsed = time.perf_counter() - start
+    print(f'Loaded {rows} rows into {table} in {elapsed:.2f}s ({rows / elapsed:.0f} rows/s)')
+
+def load_groups_csv(conn, csv_path, table='zipcode_neighbors'):
+    with open(csv_path) as f:
+        columns = f.readline().strip().split(',')
+    column_defs = [sql.SQL('zipcode VARCHAR(10) NOT NULL')] + [
+        sql.SQL('{} TEXT[] NOT NULL').format(sql.Identifier(c)) for c in columns[1:]
+    ]
+    swap_in_csv(conn, csv_path, table, column_defs, ('zipcode',))
+
+def load_geo_cells_csv(conn, csv_path, table='geo_cell_neighbors'):
+    column_defs = [sql.SQL('cell VARCHAR(12) NOT NULL'), sql.SQL('radius_miles REAL NOT NULL'),
+                   sql.SQL('neighbor_cells TEXT[] NOT NULL')]
+    swap_in_csv(conn, csv_path, table, column_defs, ('cell', 'radius_miles'))
+
+# Upsert recomputed rows and delete removed zipcodes in place, for incremental runs.
+# Only the touched rows are locked, so there is no table swap.
+def patch_groups_in_database(conn, rows, removed, table='zipcode_neighbors'):
+    columns = list(rows.columns)
+    patch = f'{table}_patch'
+    buffer = io.StringIO()
+    rows.to_csv(buffer, index=False)
+    buffer.seek(0)
+
+    with conn, conn.cursor() as cur:
+        cur.execute(sql.SQL('CREATE TEMP TABLE {} (LIKE {}) ON COMMIT DROP').format(
+            sql.Identifier(patch), sql.Identifier(table)))
+        cur.copy_expert(
+            sql.SQL('COPY {} ({}) FROM STDIN WITH (FORMAT csv, HEADER true)').format(
+                sql.Identifier(patch), sql.SQL(', ').join(map(sql.Identifier, columns))),
+            buffer,
+        )
+        cur.execute(sql.SQL(
+            'INSERT INTO {table} ({columns}) SELECT {columns} FROM {patch} '
+            'ON CONFLICT (zipcode) DO UPDATE SET {updates}'
+        ).format(
+            table=sql.Identifier(table),
+            patch=sql.Identifier(patch),
+            columns=sql.SQL(', ').join(map(sql.Identifier, columns)),
+            updates=sql.SQL(', ').join(
+                sql.SQL('{0} = EXCLUDED.{0}').format(sql.Identifier(c)) for c in columns[1:]),
+        ))
+        if removed:
+            cur.execute(sql.SQL('DELETE FROM {} WHERE zipcode = ANY(%s)').format(sql.Identifier(table)),
+                        (list(removed),))
+    print(f'Patched {len(rows)} rows and deleted {len(removed)} rows in {table}')
+
+def with_database(load, *args):
+    conn = db_conn()
+    try:
+        load(conn, *args)
+    finally:
+        conn.close()
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Group US zipcodes by great-circle distance.')
+    parser.add_argument('--input', default='US_zipcodes_longitude_and_latitude.csv')
+    parser.add_argument('--output', default='zipcode_distance_groups.csv')
+    parser.add_argument('--radii', type=float, nargs='+', default=list(DEFAULT_RADII_MILES),
+                        help='Mile thresholds, one within_<r>_miles column each (default: 5 10 20)')
+    parser.add_argument('--format', choices=('csv', 'csr'), default='csv',
+                        help='csv: PostgreSQL array columns, csr: binary neighbor index in --index-dir')
+    parser.add_argument('--index-dir', default='zipcode_neighbor_index',
+                        help='Output directory for --format csr, built for the largest of --radii. '
+                             'ZipcodeService loads it at startup; build with --radii 200 for its lookups')
+    parser.add_argument('--load', action='store_true',
+                        help='Load the output CSV into the zipcode_neighbors table after writing it')
+    parser.add_argument('--load-only', action='store_true',
+                        help='Skip the computation and load an existing --output CSV')
+    parser.add_argument('--tiled', action='store_true',
+                        help='Compute lon/lat tiles in parallel worker processes and stream them to '
+                             'disk, for large radii (e.g. --radii 200) that do not fit in memory at once')
+    parser.add_argument('--tile-size', type=float, default=2.0, help='Tile edge in degrees (default: 2)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                        help='Worker processes for --tiled (default: every core)')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Only recompute zip codes near rows that changed since the last run '
+                             '(per the manifest next to --output), and patch --output and, with --load, '
+                             'the zipcode_neighbors table in place')
+    parser.add_argument('--geo-cells', action='store_true',
+                        help='Write geohash cell neighbor sets for --radii to --geo-cells-output instead '
+                             'of the zipcode groups, and with --load/--load-only load geo_cell_neighbors. '
+                             'Stories are searched within 200 miles, so build with --radii 200')
+    parser.add_argument('--geo-cells-output', default='geo_cell_neighbors.csv')
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    if args.load_only:
+        if args.geo_cells:
+            with_database(load_geo_cells_csv, args.geo_cells_output)
+        else:
+            with_database(load_groups_csv, args.output)
+        return
+
+    radii = sorted(set(args.radii))
+
+    start = time.perf_counter()
+    gdf = load_zipcodes(args.input)
+
+    if args.geo_cells:
+        out = geo_cells_frame(gdf, radii)
+        out.to_csv(args.geo_cells_output, index=False)
+        elapsed = time.perf_counter() - start
+        print(f'Wrote {len(out)} cell neighbor sets to {args.geo_cells_output} in {elapsed:.2f}s')
+        if args.load:
+            with_database(load_geo_cells_csv, args.geo_cells_output)
+        return
+
+    if args.tiled:
+        output = args.index_dir if args.format == 'csr' else args.output
+        workdir = tempfile.mkdtemp(prefix='zipcode_tiles_', dir=os.path.dirname(os.path.abspath(output)))
+        try:
+            order, tiles, results = run_tiles(gdf, max(radii), args.tile_size, args.workers, workdir)
+            zipcodes = gdf['zipcode'].to_numpy()[order]
+            if args.format == 'csr':
+                write_tiled_index(args.index_dir, zipcodes, results, tiles, max(radii))
+            else:
+                write_tiled_csv(args.output, zipcodes, results, tiles, radii)
+                write_manifest(args.output, args.input, radii, gdf)
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+        elapsed = time.perf_counter() - start
+        pairs = sum(count for _, count in results)
+        print(f'Wrote {pairs} neighbor pairs to {output} in {elapsed:.2f}s ({len(gdf) / elapsed:.0f} rows/s)')
+        if args.load and args.format == 'csv':
+            with_database(load_groups_csv, args.output)
+        return
+
+    if args.format == 'csr':
+        src, dst, dist = find_neighbor_pairs(gdf, max(radii))
+        write_neighbor_index(args.index_dir, gdf['zipcode'].to_numpy(), src, dst, dist, max(radii))
+        elapsed = time.perf_counter() - start
+        print(f'Wrote {len(dst)} neighbor pairs to {args.index_dir} in {elapsed:.2f}s '
+              f'({len(gdf) / elapsed:.0f} rows/s)')
+        return
+
+    manifest = read_manifest(args.output, radii) if args.incremental else None
+    if manifest and manifest['input_sha256'] == file_sha256(args.input):
+        print(f'{args.input} is unchanged since {args.output} was built, nothing to do')
+        return
+
+    if manifest:
+        out, rows, removed = rebuild_incrementally(gdf, radii, args.output, manifest)
+    else:
+        if args.incremental:
+            print('No manifest for these radii, doing a full rebuild')
+        out = groups_frame(gdf, radii)
 
-gdf = find_nearby_zipcodes(gdf, 16093)  # 10 miles
-gdf['within_10_miles'] = gdf['within_distance'].apply(format_postgres_array)
+    # Save to CSV
+    out.to_csv(args.output, index=False)
+    write_manifest(args.output, args.input, radii, gdf)
 
-gdf = find_nearby_zipcodes(gdf, 32186)  # 20 miles
-gdf['within_20_miles'] = gdf['within_distance'].apply(format_postgres_array)
+    elapsed = time.perf_counter() - start
+    print(f'Processed {len(gdf)} zip codes in {elapsed:.2f}s ({len(gdf) / elapsed:.0f} rows/s)')
 
-# Drop temporary columns and unnecessary geometry for CSV output
-gdf.drop(columns=['geometry', 'within_distance'], inplace=True)
+    if args.load and manifest:
+        with_database(patch_groups_in_database, rows, removed)
+    elif args.load:
+        with_database(load_groups_csv, args.output)
 
-# Save to CSV
-gdf[['zipcode', 'within_5_miles', 'within_10_miles', 'within_20_miles']].to_csv('zipcode_distance_groups.csv', index=False)
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+from functools import reduce
+
+import numpy as np
+
+# Standard geohash cells: longitude and latitude bits interleaved (longitude first),
+# five bits per base32 character. Must match encodeGeoCell in src/geoCell.ts, which
+# fills users.geo_cell at precision 4; its first 3 characters are the precision 3 cell.
+BASE32 = np.array(list('0123456789bcdefghjkmnpqrstuvwxyz'))
+GEO_CELL_PRECISIONS = (3, 4)
+# Neighbor sets for radii above this use precision 3 cells (~156 x 156 km), smaller
+# radii use precision 4 (~39 x 20 km) so the cell list stays short either way.
+COARSE_RADIUS_MILES = 25
+
+def precision_for_radius(distance_in_miles):
+    return GEO_CELL_PRECISIONS[0] if distance_in_miles > COARSE_RADIUS_MILES else GEO_CELL_PRECISIONS[1]
+
+# Number of longitude and latitude bits in a cell id
+def cell_bits(precision):
+    return (5 * precision + 1) // 2, 5 * precision // 2
+
+# Cell width and height in degrees
+def cell_size(precision):
+    lon_bits, lat_bits = cell_bits(precision)
+    return 360.0 / 2 ** lon_bits, 180.0 / 2 ** lat_bits
+
+# Column and row of the cell containing each lon/lat point
+def cell_indices(lon, lat, precision):
+    lon_bits, lat_bits = cell_bits(precision)
+    width, height = cell_size(precision)
+    i = np.clip(np.floor((np.asarray(lon) + 180) / width), 0, 2 ** lon_bits - 1).astype(np.int64)
+    j = np.clip(np.floor((np.asarray(lat) + 90) / height), 0, 2 ** lat_bits - 1).astype(np.int64)
+    return i, j
+
+# Geohash strings for cell columns/rows
+def encode_indices(i, j, precision):
+    lon_bits, lat_bits = cell_bits(precision)
+    code = np.zeros(len(i), dtype=np.int64)
+    for bit in range(5 * precision):
+        if bit % 2 == 0:
+            code = (code << 1) | ((i >> (lon_bits - 1 - bit // 2)) & 1)
+        else:
+            code = (code << 1) | ((j >> (lat_bits - 1 - bit // 2)) & 1)
+    chars = [BASE32[(code >> (5 * (precision - 1 - k))) & 31] for k in range(precision)]
+    return reduce(np.char.add, chars)
+
+def geohash_encode(lon, lat, precision):
+    return encode_indices(*cell_indices(lon, lat, precision), precision)
+
+# For every cell that contains a zipcode, list the cells that can hold a point within
+# `distance_in_miles` of any point inside it: the cell's box widened by the radius,
+# using the poleward edge for longitude like search_boxes. This is a superset, so
+# the exact distance check still runs on whatever the cell prefilter lets through.
+# Returns a list of (cell, sorted neighbor cells) sorted by cell.
+def cell_neighbor_sets(lon, lat, distance_in_miles, precision, miles_per_degree_lat):
+    lon_bits, lat_bits = cell_bits(precision)
+    width, height = cell_size(precision)
+    i, j = cell_indices(lon, lat, precision)
+    cells = np.unique(np.stack([i, j], axis=1), axis=0)
+
+    dlat = distance_in_miles / miles_per_degree_lat
+    rows = []
+    for ci, cj in cells:
+        lat0, lat1 = -90 + cj * height, -90 + (cj + 1) * height
+        edge_lat = min(max(abs(lat0), abs(lat1)) + dlat, 89.9)
+        dlon = min(dlat / np.cos(np.radians(edge_lat)), 180.0)
+        lon0, lon1 = -180 + ci * width, -180 + (ci + 1) * width
+
+        cols = np.arange(np.floor((lon0 - dlon + 180) / width), np.floor((lon1 + dlon + 180) / width) + 1)
+        cols = np.unique(cols.astype(np.int64) % 2 ** lon_bits)  # wrap around the antimeridian
+        lats = np.arange(max(np.floor((lat0 - dlat + 90) / height), 0),
+                         min(np.floor((lat1 + dlat + 90) / height), 2 ** lat_bits - 1) + 1).astype(np.int64)
+        ni, nj = (a.ravel() for a in np.meshgrid(cols, lats))
+        source = encode_indices(np.array([ci]), np.array([cj]), precision)[0]
+        rows.append((source, sorted(encode_indices(ni, nj, precision).tolist())))
+    rows.sort()
+    return rows
@@ -0,0 +1,55 @@
+import json
+import os
+
+import numpy as np
+
+# Compact CSR layout of the zipcode neighbor graph, one .npy file per array:
+#   zipcodes.npy   zipcode of every row
+#   offsets.npy    int32, neighbors of row i are indices[offsets[i]:offsets[i + 1]]
+#   indices.npy    int32 rows into zipcodes.npy, sorted by distance within each row
+#   distances.npy  float32 miles, parallel to indices.npy
+#   index.json     radius the graph was built with and array sizes
+ARRAYS = ('zipcodes', 'offsets', 'indices', 'distances')
+
+# Write (source, neighbor, distance) pairs sorted by source then distance as a CSR index
+def write_neighbor_index(directory, zipcodes, src, dst, dist, max_distance_in_miles):
+    os.makedirs(directory, exist_ok=True)
+    counts = np.bincount(src, minlength=len(zipcodes))
+    offsets = np.zeros(len(zipcodes) + 1, dtype=np.int32)
+    np.cumsum(counts, out=offsets[1:])
+
+    np.save(os.path.join(directory, 'zipcodes.npy'), np.asarray(zipcodes).astype(str))
+    np.save(os.path.join(directory, 'offsets.npy'), offsets)
+    np.save(os.path.join(directory, 'indices.npy'), dst.astype(np.int32))
+    np.save(os.path.join(directory, 'distances.npy'), dist.astype(np.float32))
+    with open(os.path.join(directory, 'index.json'), 'w') as f:
+        json.dump({'max_distance_miles': float(max_distance_in_miles),
+                   'zipcodes': len(zipcodes), 'pairs': len(dst)}, f)
+
+class NeighborIndex:
+    """Memory-mapped CSR neighbor index written by write_neighbor_index"""
+
+    def __init__(self, directory):
+        with open(os.path.join(directory, 'index.json')) as f:
+            self.max_distance_miles = json.load(f)['max_distance_miles']
+        arrays = {name: np.load(os.path.join(directory, f'{name}.npy'), mmap_mode='r') for name in ARRAYS}
+        self.zipcodes = arrays['zipcodes']
+        self.offsets = arrays['offsets']
+        self.indices = arrays['indices']
+        self.distances = arrays['distances']
+        self.rows = {z: i for i, z in enumerate(self.zipcodes.tolist())}
+
+    def neighbors(self, zipcode, miles=None):
+        """Return (zipcodes, distances) within `miles` of `zipcode`, nearest first"""
+        if miles is None:
+            miles = self.max_distance_miles
+        if miles > self.max_distance_miles:
+            raise ValueError(f'Index was built for {self.max_distance_miles:g} miles, asked for {miles:g}')
+        row = self.rows.get(zipcode)
+        if row is None:
+            return np.array([], dtype=self.zipcodes.dtype), np.array([], dtype=np.float32)
+
+        start, end = self.offsets[row], self.offsets[row + 1]
+        # Rows are sorted by distance, so the radius cut-off is a binary search
+        end = start + np.searchsorted(self.distances[start:end], miles, side='right')
+        return self.zipcodes[self.indices[start:end]], self.distances[start:end]
@@ -7,6 +7,7 @@ DROP TABLE IF EXISTS user_tutorials;
 DROP TABLE IF EXISTS transactions;
 DROP TABLE IF EXISTS dates;
 DROP TABLE IF EXISTS attractions;
+DROP TABLE IF EXISTS story_feed;
 DROP TABLE IF EXISTS calendar_day;
 DROP TABLE IF EXISTS notifications;
 DROP TABLE IF EXISTS advertisements;
@@ -26,6 +27,10 @@ DROP TYPE IF EXISTS date_outcome_type;
 -- RECREATING TYPES AND TABLES
 -- =================================================================
 
+-- Step 0: Extensions. earth_box/earth_distance are used by the nearby stories query.
+CREATE EXTENSION IF NOT EXISTS cube;
+CREATE EXTENSION IF NOT EXISTS earthdistance;
+
 -- Step 1: Create Custom Types first
 -- ✅ FIX: Added 'pending_conflict' and 'needs_rescheduling' to the enum
 DO $$ BEGIN
@@ -82,9 +87,17 @@ CREATE TABLE users (
     email VARCHAR(255) UNIQUE NOT NULL,
     tokens INTEGER DEFAULT 100,
     fcm_token VARCHAR(255) NULL,
-    referral_source VARCHAR(255) DEFAULT NULL
+    referral_source VARCHAR(255) DEFAULT NULL,
+    has_seen_calendar_tutorial BOOLEAN DEFAULT FALSE,
+    -- Zipcode centroid, set by UserService from the zipcode (see ZipcodeService.getCoordsForZip)
+    latitude DOUBLE PRECISION DEFAULT NULL,
+    longitude DOUBLE PRECISION DEFAULT NULL,
+    -- Precision 4 geohash of the user's coordinates, set by UserService with latitude/longitude
+    geo_cell VARCHAR(12) DEFAULT NULL
 );
 
+-- The stories query prefilters on precision 3 cells through story_feed.geo_cell_3 (indexed there)
+
 CREATE TABLE advertisements (
     ad_id SERIAL PRIMARY KEY,
     video_url VARCHAR(1024),
@@ -106,6 +119,26 @@ CREATE TABLE tutorials (
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
 );
 
+-- ZIPCODE_NEIGHBORS Table (not dropped above)
+-- Filled by dataPreparation/createZipcodeWithinRangesCsv.py --load, which COPYs into a
+-- staging table and swaps it in, so re-running this script must not wipe it.
+CREATE TABLE IF NOT EXISTS zipcode_neighbors (
+    zipcode VARCHAR(10) PRIMARY KEY,
+    within_5_miles TEXT[] NOT NULL,
+    within_10_miles TEXT[] NOT NULL,
+    within_20_miles TEXT[] NOT NULL
+);
+
+-- GEO_CELL_NEIGHBORS Table (not dropped above)
+-- Filled by createZipcodeWithinRangesCsv.py --geo-cells --radii 200 --load: for every geohash
+-- cell with a zipcode in it, the cells that can hold a point within radius_miles of it.
+CREATE TABLE IF NOT EXISTS geo_cell_neighbors (
+    cell VARCHAR(12) NOT NULL,
+    radius_miles REAL NOT NULL,
+    neighbor_cells TEXT[] NOT NULL,
+    PRIMARY KEY (cell, radius_miles)
+);
+
 
 -- Step 3: Create Tables that depend on USERS
 CREATE TABLE notifications (
@@ -123,6 +156,9 @@ CREATE TABLE notifications (
     FOREIGN KEY (notified_user_id) REFERENCES users(user_id) ON DELETE SET NULL
 );
 
+-- Unread/read notification lists and the unread count, newest first
+CREATE INDEX IF NOT EXISTS idx_notifications_user_status_created ON notifications (user_id, status, created_at DESC);
+
 CREATE TABLE calendar_day (
     calendar_id SERIAL PRIMARY KEY,
     user_id VARCHAR(255) NOT NULL,
@@ -130,6 +166,12 @@ CREATE TABLE calendar_day (
     user_video_url VARCHAR(1024) DEFAULT NULL,
     vimeo_uri TEXT NULL,
     processing_status TEXT DEFAULT 'pending',
+    -- Signed Vimeo play link kept fresh by PlayableUrlRefresher, so the stories feed can serve
+    -- it straight from here. expires_at already has a safety margin taken off.
+    playable_url TEXT NULL,
+    playable_url_expires_at TIMESTAMP WITH TIME ZONE NULL,
+    -- Set while a refresher has claimed the row and is asking Vimeo, see claimPlayableUrlsToRefresh
+    playable_url_refreshing_until TIMESTAMP WITH TIME ZONE NULL,
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
     FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE,
@@ -138,6 +180,26 @@ CREATE TABLE calendar_day (
 
 CREATE INDEX IF NOT EXISTS idx_calendar_day_vimeo_uri ON calendar_day (vimeo_uri);
 CREATE INDEX IF NOT EXISTS idx_calendar_day_user_date ON calendar_day (user_id, date);
+-- Stories and videos for a day across all users
+CREATE INDEX IF NOT EXISTS idx_calendar_day_date ON calendar_day (date);
+-- Refresher scan: finished videos whose link is missing or expires soonest
+CREATE INDEX IF NOT EXISTS idx_calendar_day_playable_url_expiry ON calendar_day (playable_url_expires_at NULLS FIRST)
+    WHERE processing_status = 'complete' AND vimeo_uri IS NOT NULL;
+
+-- STORY_FEED Table: materialized index of the stories feed, one row per finished story whose
+-- author has a location. Kept in sync by the triggers at the end of this file (story finished,
+-- re-processed or moved, author moved) and by the cascade when a story or user is deleted, so
+-- the feed query is a (date, cell) range scan instead of a calendar_day x users join.
+CREATE TABLE story_feed (
+    calendar_id INT PRIMARY KEY,
+    date DATE NOT NULL,
+    user_id VARCHAR(255) NOT NULL,
+    geo_cell_3 VARCHAR(3) NULL, -- left(users.geo_cell, 3), the cells in geo_cell_neighbors
+    location EARTH NOT NULL, -- ll_to_earth(users.latitude, users.longitude)
+    FOREIGN KEY (calendar_id) REFERENCES calendar_day(calendar_id) ON DELETE CASCADE
+);
+
+CREATE INDEX IF NOT EXISTS idx_story_feed_date_cell ON story_feed (date, geo_cell_3);
 
 -- ATTRACTIONS Table (RENAMED)
 CREATE TABLE attractions (
@@ -160,6 +222,9 @@ CREATE TABLE attractions (
     UNIQUE(user_from, user_to, date)
 );
 
+-- The UNIQUE constraint covers lookups by user_from, this one covers user_to
+CREATE INDEX IF NOT EXISTS idx_attractions_user_to_date ON attractions (user_to, date);
+
 CREATE TABLE dates (
     date_id SERIAL PRIMARY KEY,
     date DATE NOT NULL,
@@ -178,6 +243,9 @@ CREATE TABLE dates (
     UNIQUE(user_from, user_to, date)
 );
 
+-- (user_from = $1 OR user_to = $1) lookups combine this with the UNIQUE index
+CREATE INDEX IF NOT EXISTS idx_dates_user_to_date ON dates (user_to, date);
+
 CREATE TABLE transactions (
     transaction_id SERIAL PRIMARY KEY,
     user_id VARCHAR(255) NOT NULL,
@@ -191,6 +259,8 @@ CREATE TABLE transactions (
     FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE
 );
 
+CREATE INDEX IF NOT EXISTS idx_transactions_user_id ON transactions (user_id);
+
 CREATE TABLE user_blocks (
     blocker_id VARCHAR(255) NOT NULL,
     blocked_id VARCHAR(255) NOT NULL,
@@ -264,4 +334,69 @@ BEGIN
    END IF;
    RETURN NEW;
 END;
-$$ LANGUAGE 'plpgsql';
\ No newline at end of file
+$$ LANGUAGE 'plpgsql';
+
+-- Rebuilds the story_feed rows of the given calendar days from calendar_day and users
+CREATE OR REPLACE FUNCTION sync_story_feed(p_calendar_ids INT[])
+RETURNS VOID AS $$
+BEGIN
+    DELETE FROM story_feed WHERE calendar_id = ANY(p_calendar_ids);
+    INSERT INTO story_feed (calendar_id, date, user_id, geo_cell_3, location)
+    SELECT cd.calendar_id, cd.date, cd.user_id, left(u.geo_cell, 3), ll_to_earth(u.latitude, u.longitude)
+    FROM calendar_day cd
+    JOIN users u ON u.user_id = cd.user_id
+    WHERE cd.calendar_id = ANY(p_calendar_ids)
+      AND cd.processing_status = 'complete'
+      AND cd.vimeo_uri IS NOT NULL
+      AND u.latitude IS NOT NULL AND u.longitude IS NOT NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Statement level, so a bulk COPY into calendar_day syncs in one go
+CREATE OR REPLACE FUNCTION story_feed_calendar_day_inserted()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM sync_story_feed(ARRAY(SELECT calendar_id FROM new_rows));
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER story_feed_on_calendar_day_insert
+    AFTER INSERT ON calendar_day
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION story_feed_calendar_day_inserted();
+
+-- e.g. updateCalendarDay marking a story 'complete', or a new video on the same day
+CREATE OR REPLACE FUNCTION story_feed_calendar_day_updated()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM sync_story_feed(ARRAY[NEW.calendar_id]);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER story_feed_on_calendar_day_update
+    AFTER UPDATE OF processing_status, vimeo_uri, date, user_id ON calendar_day
+    FOR EACH ROW
+    WHEN (OLD.processing_status IS DISTINCT FROM NEW.processing_status
+          OR OLD.vimeo_uri IS DISTINCT FROM NEW.vimeo_uri
+          OR OLD.date IS DISTINCT FROM NEW.date
+          OR OLD.user_id IS DISTINCT FROM NEW.user_id)
+    EXECUTE FUNCTION story_feed_calendar_day_updated();
+
+-- A user who changes zipcode moves all of their stories
+CREATE OR REPLACE FUNCTION story_feed_user_moved()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM sync_story_feed(ARRAY(SELECT calendar_id FROM calendar_day WHERE user_id = NEW.user_id));
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER story_feed_on_user_move
+    AFTER UPDATE OF latitude, longitude, geo_cell ON users
+    FOR EACH ROW
+    WHEN (OLD.latitude IS DISTINCT FROM NEW.latitude
+          OR OLD.longitude IS DISTINCT FROM NEW.longitude
+          OR OLD.geo_cell IS DISTINCT FROM NEW.geo_cell)
+    EXECUTE FUNCTION story_feed_user_moved();
@@ -0,0 +1,83 @@
+// File: src/concurrency.ts
+
+// Runs a task once fewer than `concurrency` tasks passed to the same limiter are running.
+export type Limiter = <R>(task: () => Promise<R>) => Promise<R>
+
+export const LIMITER_QUEUE_FULL = 'LIMITER_QUEUE_FULL'
+
+// A limiter is meant to be created once at module level and shared, so the cap holds across all
+// requests in the process rather than per request. At most `maxQueued` tasks wait for a slot;
+// past that a task is rejected straight away (error.code LIMITER_QUEUE_FULL) instead of
+// building a backlog that every later caller has to wait behind.
+export const createLimiter = (concurrency: number, maxQueued: number = Infinity): Limiter => {
+  let active = 0
+  const queue: (() => void)[] = []
+
+  const release = (): void => {
+    active--
+    const next = queue.shift()
+    if (next) next()
+  }
+
+  return <R>(task: () => Promise<R>): Promise<R> =>
+    new Promise<R>((resolve, reject) => {
+      const run = (): void => {
+        active++
+        task().then(resolve, reject).finally(release)
+      }
+      if (active < concurrency) run()
+      else if (queue.length < maxQueued) queue.push(run)
+      else {
+        const error = new Error('Limiter queue is full')
+        ;(error as any).code = LIMITER_QUEUE_FULL
+        reject(error)
+      }
+    })
+}
+
+export interface DeadlineOptions {
+  limiter: Limiter // Shared cap on how many workers run at once
+  deadlineMs: number // Stop waiting after this long, whatever is still pending comes back undefined
+}
+
+// Maps items through an async worker via the limiter, and returns at the deadline with whatever
+// has finished by then. The result array lines up with `items`: undefined where the worker had
+// not finished in time, threw, or found the limiter's queue full. Workers already running at the
+// deadline are left to finish in the background (cache fills aren't thrown away); items still
+// waiting for a slot are dropped when their turn comes, so they don't hold up later callers.
+export const mapWithDeadline = async <T, R>(
+  items: T[],
+  worker: (item: T) => Promise<R>,
+  { limiter, deadlineMs }: DeadlineOptions,
+): Promise<(R | undefined)[]> => {
+  const results: (R | undefined)[] = new Array(items.length).fill(undefined)
+  let expired = false
+  let rejected = 0
+
+  const all = Promise.all(
+    items.map((item, index) =>
+      limiter(async () => (expired ? undefined : worker(item))).then(
+        (value) => {
+          if (!expired) results[index] = value
+        },
+        (err) => {
+          if (err?.code === LIMITER_QUEUE_FULL) rejected++
+          else console.error(`[mapWithDeadline] Worker failed for item ${index}:`, err)
+        },
+      ),
+    ),
+  )
+
+  let timer: NodeJS.Timeout | undefined
+  const deadline = new Promise<void>((resolve) => {
+    timer = setTimeout(resolve, deadlineMs)
+  })
+
+  await Promise.race([all, deadline])
+  clearTimeout(timer)
+  expired = true // Anything finishing after this point is no longer part of the answer
+  if (rejected > 0) {
+    console.warn(`[mapWithDeadline] ${rejected} of ${items.length} items skipped, limiter queue full.`)
+  }
+  return results
+}
@@ -83,7 +83,8 @@
 
 // src / db.ts
 
-import { Pool } from 'pg'
+import { Pool, PoolConfig } from 'pg'
+import { AsyncLocalStorage } from 'async_hooks'
 import dotenv from 'dotenv'
 
 dotenv.config()
@@ -124,4 +125,91 @@ pool
     console.error('❌ PostgreSQL Connection Failed:', err)
   })
 
-export default pool
+// --- Test mode: per-request database and query counting ---
+// With NODE_ENV=test, every request runs inside a TestRequestContext (see index.ts). A request
+// carrying an X-Test-Database header runs all of its queries against that database: a per-test
+// clone made by the server_db fixture in __tests__/conftest.py. Every statement is counted
+// (BEGIN/COMMIT included) and the total goes back in the X-Query-Count response header.
+export const TEST_MODE = process.env.NODE_ENV === 'test'
+
+export interface TestRequestContext {
+  database?: string
+  queryCount: number
+}
+
+export const testRequestContext = new AsyncLocalStorage<TestRequestContext>()
+const testPools = new Map<string, Pool>()
+
+const testPoolConfig = (database: string): PoolConfig => {
+  if (process.env.DATABASE_URL) {
+    const url = new URL(process.env.DATABASE_URL)
+    url.pathname = `/${database}`
+    return { connectionString: url.toString(), ssl: { rejectUnauthorized: false } }
+  }
+  return {
+    user: process.env.DB_USER,
+    host: process.env.DB_HOST,
+    database,
+    password: process.env.DB_PASSWORD,
+    port: parseInt(process.env.DB_PORT || '5432'),
+  }
+}
+
+const testPoolFor = (database: string): Pool => {
+  let testPool = testPools.get(database)
+  if (!testPool) {
+    const created = new Pool({ ...testPoolConfig(database), max: 4, idleTimeoutMillis: 1000 })
+    // The fixture drops its clone WITH (FORCE) after the test, which kills these connections
+    created.on('error', (err) => {
+      console.warn(`[db] Test database ${database} went away:`, err.message)
+      testPools.delete(database)
+      created.end().catch(() => {})
+    })
+    created.on('remove', () => {
+      if (created.totalCount === 0) testPools.delete(database)
+    })
+    testPools.set(database, created)
+    testPool = created
+  }
+  return testPool
+}
+
+// Counts query() calls on a pool or a checked-out client. The context is captured when the
+// client is handed out, so queries on it still count if they resume in another async context.
+const countQueries = <T extends object>(target: T, context: TestRequestContext): T =>
+  new Proxy(target, {
+    get(t, prop) {
+      const value = Reflect.get(t, prop, t)
+      if (typeof value !== 'function') return value
+      if (prop === 'query') {
+        return (...args: unknown[]) => {
+          context.queryCount += 1
+          return value.apply(t, args)
+        }
+      }
+      if (prop === 'connect') {
+        return (...args: unknown[]) => {
+          const result = value.apply(t, args)
+          return result instanceof Promise
+            ? result.then((client: object) => countQueries(client, context))
+            : result
+        }
+      }
+      return value.bind(t)
+    },
+  })
+
+// Same interface as the pool, but resolves to the request's test database on every access
+const routedPool = new Proxy<Pool>(pool, {
+  get(target, prop) {
+    const context = testRequestContext.getStore()
+    if (!context) {
+      const value = Reflect.get(target, prop, target)
+      return typeof value === 'function' ? value.bind(target) : value
+    }
+    const active = context.database ? testPoolFor(context.database) : target
+    return Reflect.get(countQueries(active, context), prop)
+  },
+})
+
+export default TEST_MODE ? routedPool : pool
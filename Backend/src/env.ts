@@ -0,0 +1,7 @@
+// File: src/env.ts
+
+// Numeric settings from the environment, falling back to the default when unset or invalid
+export const readPositiveInt = (name: string, fallback: number): number => {
+  const value = Number(process.env[name])
+  return Number.isInteger(value) && value > 0 ? value : fallback
+}
@@ -0,0 +1,63 @@
+// File: src/expiringCache.ts
+
+import LruCache from './lruCache'
+
+export interface Expiring<V> {
+  value: V
+  expiresAt: number // epoch ms
+}
+
+// LRU cache whose entries also carry their own expiry time. getOrLoad() serves a hit until it
+// expires, and concurrent misses for the same key share one in-flight load instead of each
+// calling upstream. A load that throws is not cached, so the next caller retries.
+export class ExpiringCache<K, V> {
+  private readonly entries: LruCache<K, Expiring<V>>
+  private readonly inFlight = new Map<K, Promise<V>>()
+
+  constructor(maxEntries: number) {
+    this.entries = new LruCache<K, Expiring<V>>(maxEntries)
+  }
+
+  get(key: K): V | undefined {
+    const entry = this.entries.get(key)
+    if (!entry) return undefined
+    if (entry.expiresAt <= Date.now()) {
+      this.entries.delete(key)
+      return undefined
+    }
+    return entry.value
+  }
+
+  set(key: K, value: V, expiresAt: number): void {
+    if (expiresAt > Date.now()) this.entries.set(key, { value, expiresAt })
+  }
+
+  delete(key: K): boolean {
+    return this.entries.delete(key)
+  }
+
+  async getOrLoad(key: K, load: () => Promise<Expiring<V>>): Promise<V> {
+    const cached = this.get(key)
+    if (cached !== undefined) return cached
+
+    const pending = this.inFlight.get(key)
+    if (pending) return pending
+
+    const loading = load()
+      .then(({ value, expiresAt }) => {
+        this.set(key, value, expiresAt)
+        return value
+      })
+      .finally(() => {
+        this.inFlight.delete(key)
+      })
+    this.inFlight.set(key, loading)
+    return loading
+  }
+
+  get size(): number {
+    return this.entries.size
+  }
+}
+
+export default ExpiringCache
@@ -0,0 +1,44 @@
+// File: src/geoCell.ts
+
+// Geohash cells for the nearby-stories prefilter. users.geo_cell stores the precision 4
+// cell (~39 x 20 km), and its first 3 characters are the precision 3 cell (~156 km).
+// Must match dataPreparation/geoCells.py, which precomputes geo_cell_neighbors.
+const BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+export const USER_GEO_CELL_PRECISION = 4
+
+export const encodeGeoCell = (
+  latitude: number,
+  longitude: number,
+  precision: number = USER_GEO_CELL_PRECISION,
+): string => {
+  const lat = [-90, 90]
+  const lon = [-180, 180]
+  let cell = ''
+  let bits = 0
+  let charIndex = 0
+  let isLonBit = true
+
+  // Bisect longitude and latitude alternately, longitude first, 5 bits per character
+  while (cell.length < precision) {
+    const range = isLonBit ? lon : lat
+    const value = isLonBit ? longitude : latitude
+    const mid = (range[0] + range[1]) / 2
+    if (value >= mid) {
+      charIndex = (charIndex << 1) | 1
+      range[0] = mid
+    } else {
+      charIndex = charIndex << 1
+      range[1] = mid
+    }
+    isLonBit = !isLonBit
+    if (++bits === 5) {
+      cell += BASE32[charIndex]
+      bits = 0
+      charIndex = 0
+    }
+  }
+  return cell
+}
+
+export default encodeGeoCell
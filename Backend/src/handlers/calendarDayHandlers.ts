@@ -14,7 +14,10 @@ import {
 import { asyncHandler, CustomRequest } from '../middleware'
 import { upload, handleMulterError, handleVideoUpload, deleteVideoHandler } from '../uploadUtils'
 
-import CalendarDayService from '../services/internal/CalendarDayService'
+import CalendarDayService, {
+  decodeStoryCursor,
+  encodeStoryCursor,
+} from '../services/internal/CalendarDayService'
 import UserService from '../services/internal/UserService'
 
 const calendarDayService = new CalendarDayService()
@@ -22,6 +25,12 @@ const userService = new UserService()
 
 console.log('[CalendarDayHandler] Services instantiated.')
 
+// GET /stories/:date?limit=20&cursor=... pages through the feed; the cursor for the next page
+// comes back in the X-Next-Cursor header (absent on the last page). Without limit or cursor the
+// whole feed is returned, as before.
+const STORIES_DEFAULT_PAGE_SIZE = 20
+const STORIES_MAX_PAGE_SIZE = 100
+
 export const getStoriesByDateHandler = asyncHandler(
   async (req: CustomRequest, res: Response, next: NextFunction) => {
     const targetDate = req.params.date
@@ -35,20 +44,42 @@ export const getStoriesByDateHandler = asyncHandler(
       return res.status(400).json({ message: 'Invalid or missing date parameter (YYYY-MM-DD).' })
     }
 
+    const { limit: limitParam, cursor: cursorParam } = req.query
+    let limit: number | null = null
+    if (limitParam !== undefined) {
+      limit = Number(limitParam)
+      if (!Number.isInteger(limit) || limit < 1 || limit > STORIES_MAX_PAGE_SIZE) {
+        return res
+          .status(400)
+          .json({ message: `limit must be an integer from 1 to ${STORIES_MAX_PAGE_SIZE}.` })
+      }
+    }
+    const after = typeof cursorParam === 'string' ? decodeStoryCursor(cursorParam) : null
+    if (cursorParam !== undefined && after === null) {
+      return res.status(400).json({ message: 'Invalid cursor.' })
+    }
+    if (after !== null && limit === null) limit = STORIES_DEFAULT_PAGE_SIZE
+
     console.log(
       `[Handler:GetStories] User ${loggedInUserId} fetching stories for date: ${targetDate}, applying distance and block filters.`,
     )
 
     try {
-      const storiesData = await calendarDayService.getStoriesForDateWithFreshUrls(
+      const storiesPage = await calendarDayService.getStoriesForDateWithFreshUrls(
         targetDate,
         loggedInUserId,
+        { limit, after },
       )
 
-      if (storiesData === null) {
+      if (storiesPage === null) {
         return res.status(500).json({ message: 'Failed to retrieve stories data.' })
       }
 
+      const storiesData = storiesPage.stories
+      if (storiesPage.nextCursor) {
+        res.setHeader('X-Next-Cursor', encodeStoryCursor(storiesPage.nextCursor))
+      }
+
       if (storiesData.length === 0) {
         console.log(`[Handler:GetStories] No nearby stories found for user ${loggedInUserId}.`)
         return res.status(200).json([])
@@ -120,8 +151,12 @@ export const uploadCalendarVideoHandler = asyncHandler(
 
         // --- NAYI LOGIC START ---
         // Ab hum check karenge ke is user ke ilawa aas paas koi aur stories hain ya nahi.
-        const nearbyStories = await calendarDayService.getStoriesForDateWithFreshUrls(date, userId)
-        const hasNearbyStories = nearbyStories ? nearbyStories.length > 0 : false
+        // Ek story kaafi hai yeh janne ke liye, poori feed load karne ki zaroorat nahi.
+        const nearbyStories = await calendarDayService.getStoriesForDateWithFreshUrls(date, userId, {
+          limit: 1,
+          after: null,
+        })
+        const hasNearbyStories = nearbyStories ? nearbyStories.stories.length > 0 : false
 
         console.log(
           `[Handler:Upload] Check for user ${userId} on ${date}. Found other nearby stories: ${hasNearbyStories}`,
@@ -6,6 +6,9 @@ import bodyParser from 'body-parser'
 import cors from 'cors' // CORS middleware import karna
 import routes from './routes' // Apne routes file ko import karna (path check kar lein)
 import { setupSwagger } from './swagger' // Swagger setup ko import karna (path check kar lein)
+import { TEST_MODE, TestRequestContext, testRequestContext } from './db'
+import { TRAFFIC_CAPTURE_FILE, captureTraffic } from './trafficCapture'
+import PlayableUrlRefresher from './services/internal/PlayableUrlRefresher'
 
 // Express application banayein
 const app: Application = express()
@@ -42,6 +45,8 @@ const corsOptions: cors.CorsOptions = {
   methods: ['GET', 'POST', 'PATCH', 'DELETE', 'OPTIONS'],
   // Allowed headers (Authorization token bhej ne ke liye zaroori hai)
   allowedHeaders: ['Content-Type', 'Authorization'],
+  // Stories feed pagination cursor (GET /stories/:date?limit=...)
+  exposedHeaders: ['X-Next-Cursor'],
   // Agar aap cookies ya authorization headers use kar rahe hain cross-origin
   credentials: true,
 }
@@ -56,6 +61,32 @@ app.use(cors(corsOptions))
 app.use(bodyParser.json())
 app.use(bodyParser.urlencoded({ extended: true }))
 
+// 2b. Test mode only: run this request's queries against the database in X-Test-Database,
+// and report how many it ran in X-Query-Count (queries after the response is sent don't count).
+// Registered after the body parsers, whose stream callbacks would lose the async context.
+if (TEST_MODE) {
+  console.log('NODE_ENV=test: honouring X-Test-Database and sending X-Query-Count headers.')
+  app.use((req: Request, res: Response, next: NextFunction) => {
+    const database = req.header('X-Test-Database')
+    const context: TestRequestContext = {
+      database: database && /^[A-Za-z0-9_]+$/.test(database) ? database : undefined,
+      queryCount: 0,
+    }
+    const writeHead = res.writeHead
+    res.writeHead = function (this: Response, ...args: Parameters<Response['writeHead']>) {
+      this.setHeader('X-Query-Count', String(context.queryCount))
+      return writeHead.apply(this, args)
+    } as Response['writeHead']
+    testRequestContext.run(context, next)
+  })
+}
+
+// 2c. Optional: record /api traffic for replay against a local build (see trafficCapture.ts)
+if (TRAFFIC_CAPTURE_FILE) {
+  console.log(`Capturing /api traffic to ${TRAFFIC_CAPTURE_FILE}`)
+  app.use('/api', captureTraffic)
+}
+
 // 3. API Routes Middleware (CORS aur BodyParser ke baad)
 // *** YEH SABSE ZAROORI BADLAAV HAI ***
 // Yeh Express ko batata hai ki '/api' se shuru hone wali sabhi requests ko 'routes' file handle karegi
@@ -88,6 +119,11 @@ app.use((err: any, req: Request, res: Response, next: NextFunction) => {
 app.listen(PORT, () => {
   console.log(`Backend server is running on port ${PORT}`)
   console.log(`CORS enabled for origins: ${allowedOrigins.join(', ')}`)
+  // Stored story play links ko background mein fresh rakhta hai. Tests mein band hai (Vimeo
+  // calls), aur PLAYABLE_URL_REFRESHER=off se bhi band kiya ja sakta hai.
+  if (!TEST_MODE && process.env.PLAYABLE_URL_REFRESHER !== 'off') {
+    new PlayableUrlRefresher().start()
+  }
 })
 
 // Optional: Export app agar testing wagera ke liye zaroorat ho
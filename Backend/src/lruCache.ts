@@ -0,0 +1,36 @@
+// File: src/lruCache.ts
+
+// Small size-bounded LRU cache. A Map keeps insertion order, so re-inserting a key on
+// every hit keeps the least recently used entry first in line for eviction.
+export class LruCache<K, V> {
+  private readonly entries = new Map<K, V>()
+
+  constructor(private readonly maxEntries: number) {}
+
+  get(key: K): V | undefined {
+    const value = this.entries.get(key)
+    if (value === undefined) return undefined
+    this.entries.delete(key)
+    this.entries.set(key, value)
+    return value
+  }
+
+  set(key: K, value: V): void {
+    this.entries.delete(key)
+    this.entries.set(key, value)
+    while (this.entries.size > this.maxEntries) {
+      const oldestKey = this.entries.keys().next().value as K
+      this.entries.delete(oldestKey)
+    }
+  }
+
+  delete(key: K): boolean {
+    return this.entries.delete(key)
+  }
+
+  get size(): number {
+    return this.entries.size
+  }
+}
+
+export default LruCache
@@ -4,6 +4,7 @@
 import { Request, Response, NextFunction } from 'express'
 import { auth, AuthOptions, InvalidTokenError } from 'express-oauth2-jwt-bearer'
 import { validationResult } from 'express-validator' // Assuming you might use this elsewhere
+import { TEST_MODE } from './db'
 
 // --- Configuration ---
 const AUTH0_DOMAIN = process.env.AUTH0_DOMAIN
@@ -43,7 +44,28 @@ export const logAuthHeader = (req: Request, res: Response, next: NextFunction) =
 }
 
 // --- JWT Validation Middleware ---
-export const checkJwt = auth(checkJwtOptions)
+const verifyJwt = auth(checkJwtOptions)
+
+// With NODE_ENV=test and ALLOW_TEST_TOKENS=1, `Bearer test-<userId>` (what __tests__ and the
+// load/replay tools send) authenticates as <userId> without Auth0. Any other token still goes
+// through verifyJwt. Both are required so a stray NODE_ENV alone can't open this up, and the
+// server won't start with ALLOW_TEST_TOKENS set outside test mode.
+const TEST_TOKEN = /^Bearer test-(.+)$/
+const ALLOW_TEST_TOKENS = process.env.ALLOW_TEST_TOKENS === '1'
+
+if (process.env.ALLOW_TEST_TOKENS && !TEST_MODE) {
+  console.error('FATAL ERROR: ALLOW_TEST_TOKENS is set but NODE_ENV is not test.')
+  process.exit(1)
+}
+
+export const checkJwt = TEST_MODE && ALLOW_TEST_TOKENS
+  ? (req: Request, res: Response, next: NextFunction) => {
+      const match = TEST_TOKEN.exec(req.headers.authorization || '')
+      if (!match) return verifyJwt(req, res, next)
+      req.auth = { payload: { sub: match[1] }, header: { alg: 'none' }, token: '' }
+      next()
+    }
+  : verifyJwt
 
 // --- Extract User ID Middleware (Runs AFTER checkJwt) ---
 // This uses the CustomRequest type we defined and exported
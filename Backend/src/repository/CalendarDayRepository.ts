@@ -8,22 +8,96 @@ import {
   UpdateCalendarDay,
   StoryQueryResult,
   NearbyVideoData,
+  StoryPage,
+  StoryPageRequest,
+  PlayableUrlRefreshTarget,
+  PlayableUrlUpdate,
 } from '../types/CalendarDay'
 import * as humps from 'humps'
 import moment from 'moment'
+import LruCache from '../lruCache'
+import { encodeGeoCell } from '../geoCell'
 
 // ✅ METERS_IN_A_MILE constant for distance calculation
 const METERS_IN_A_MILE = 1609.34
+// geo_cell_neighbors is built with precision 3 cells for the 200 mile stories radius
+// (python createZipcodeWithinRangesCsv.py --geo-cells --radii 200 --load). It only changes
+// when that script is re-run, so lookups are cached per process. Misses aren't cached: a cell
+// with no row yet is looked up again, so it starts using the prefilter once the script is re-run.
+const STORY_CELL_PRECISION = 3
+const neighborCellsCache = new LruCache<string, string[]>(1000)
+// What the calendar_day methods below return. Not SELECT *: the refresher's playable_url
+// columns hold signed Vimeo links and claim state that only the stories feed query should expose.
+const CALENDAR_DAY_COLUMNS =
+  'calendar_id, user_id, date, user_video_url, vimeo_uri, processing_status, updated_at, created_at'
 
 class CalendarDayRepository {
+  // Cells that can hold a user within maxDistanceMiles of any point in `cell`, or null if
+  // geo_cell_neighbors has no row for it (then the stories query skips the cell prefilter)
+  private async findNeighborCells(
+    cell: string,
+    maxDistanceMiles: number,
+  ): Promise<string[] | null> {
+    const cacheKey = `${cell}:${maxDistanceMiles}`
+    const cached = neighborCellsCache.get(cacheKey)
+    if (cached !== undefined) return cached
+
+    // Any radius at least as large gives a valid (if looser) superset
+    const query = `
+      SELECT neighbor_cells AS "neighborCells" FROM geo_cell_neighbors
+      WHERE cell = $1 AND radius_miles >= $2
+      ORDER BY radius_miles
+      LIMIT 1
+    `
+    try {
+      const { rows } = await pool.query(query, [cell, maxDistanceMiles])
+      if (rows.length === 0) return null
+      neighborCellsCache.set(cacheKey, rows[0].neighborCells)
+      return rows[0].neighborCells
+    } catch (error) {
+      console.error('Error in findNeighborCells:', error)
+      return null
+    }
+  }
+
   // ✅✅✅ --- QUERY KO POORI TARAH UPDATE KIYA GAYA HAI --- ✅✅✅
+  // Reads story_feed, which create.sql triggers keep in sync with calendar_day and users
+  // (updateCalendarDay marking a story complete, deleteCalendarDay, a user changing zipcode).
   async findNearbyStoriesByDate(
     date: string,
     loggedInUserId: string,
     loggedInUserLat: number,
     loggedInUserLon: number,
+    page: StoryPageRequest = { limit: null, after: null },
     maxDistanceMiles: number = 200,
-  ): Promise<StoryQueryResult[] | null> {
+  ): Promise<StoryPage<StoryQueryResult> | null> {
+    const neighborCells = await this.findNeighborCells(
+      encodeGeoCell(loggedInUserLat, loggedInUserLon, STORY_CELL_PRECISION),
+      maxDistanceMiles,
+    )
+    const params: any[] = [date, loggedInUserId, loggedInUserLat, loggedInUserLon]
+    if (neighborCells) params.push(neighborCells)
+    // story_feed (date, geo_cell_3) index par range scan. Authors without a cell yet still go
+    // through the exact distance check below.
+    const cellFilter = neighborCells
+      ? `AND (sf.geo_cell_3 = ANY($5::text[]) OR sf.geo_cell_3 IS NULL)`
+      : ''
+    // Keyset pagination: rows strictly after the cursor in (distance, calendarId) order, and
+    // one row more than the page so we know whether there is a next page
+    let keysetFilter = ''
+    if (page.after) {
+      params.push(page.after.distance, page.after.calendarId)
+      const [distanceParam, calendarIdParam] = [params.length - 1, params.length]
+      keysetFilter = `WHERE (distance, calendar_id) > ($${distanceParam}::float8, $${calendarIdParam})`
+    }
+    let limitClause = ''
+    if (page.limit !== null) {
+      params.push(page.limit + 1)
+      limitClause = `LIMIT $${params.length}`
+    }
+
+    // Pehle story_feed se sirf is page ki stories (doori aur block flag ke sath), phir unhi ke
+    // liye calendar_day aur users se baaki details.
     const query = `
       SELECT
           cd.calendar_id AS "calendarId", 
@@ -34,49 +108,61 @@ class CalendarDayRepository {
           (u.first_name || ' ' || u.last_name) AS "userName",
           u.profile_picture_url AS "profilePictureUrl",
           u.zipcode,
-          (ub.blocker_id IS NOT NULL) AS "isBlocked",
-          -- ✅ Yahan hum 'earthdistance' ka istemaal karke miles mein doori nikal rahe hain
-          (earth_distance(
-              ll_to_earth(u.latitude, u.longitude),
-              ll_to_earth($3, $4)
-          ) / ${METERS_IN_A_MILE}) as distance
-      FROM calendar_day cd
-      JOIN users u ON cd.user_id = u.user_id
-      LEFT JOIN user_blocks ub ON u.user_id = ub.blocked_id AND ub.blocker_id = $2
-      WHERE 
-        cd.date::date = $1::date
-        AND cd.vimeo_uri IS NOT NULL
-        AND cd.processing_status = 'complete'
-        AND u.user_id != $2
-        AND u.latitude IS NOT NULL AND u.longitude IS NOT NULL
-        -- ✅ Yeh 'earth_box' query ko tez banata hai (optimisation)
-        AND earth_box(ll_to_earth($3, $4), ${
-          maxDistanceMiles * METERS_IN_A_MILE
-        }) @> ll_to_earth(u.latitude, u.longitude)
-        -- ✅ Yeh sahi doori check karta hai
-        AND earth_distance(
-              ll_to_earth(u.latitude, u.longitude),
-              ll_to_earth($3, $4)
-          ) <= ${maxDistanceMiles * METERS_IN_A_MILE}
-      -- ✅ Sabse zaroori: Doori ke hisaab se sort karna (sabse qareeb pehle)
-      ORDER BY
-        distance ASC;
+          page."isBlocked",
+          -- Refresher ka rakha hua link, agar abhi valid hai
+          CASE WHEN cd.playable_url_expires_at > NOW() THEN cd.playable_url END AS "playableUrl",
+          page.distance
+      FROM (
+        SELECT * FROM (
+          SELECT
+              sf.calendar_id,
+              sf.user_id,
+              (ub.blocker_id IS NOT NULL) AS "isBlocked",
+              -- ✅ Yahan hum 'earthdistance' ka istemaal karke miles mein doori nikal rahe hain
+              (earth_distance(sf.location, ll_to_earth($3, $4)) / ${METERS_IN_A_MILE}) as distance
+          FROM story_feed sf
+          LEFT JOIN user_blocks ub ON sf.user_id = ub.blocked_id AND ub.blocker_id = $2
+          WHERE
+            sf.date = $1::date
+            AND sf.user_id != $2
+            ${cellFilter}
+            -- ✅ Yeh 'earth_box' query ko tez banata hai (optimisation)
+            AND earth_box(ll_to_earth($3, $4), ${
+              maxDistanceMiles * METERS_IN_A_MILE
+            }) @> sf.location
+            -- ✅ Yeh sahi doori check karta hai
+            AND earth_distance(sf.location, ll_to_earth($3, $4)) <= ${
+              maxDistanceMiles * METERS_IN_A_MILE
+            }
+        ) candidates
+        ${keysetFilter}
+        -- ✅ Sabse zaroori: Doori ke hisaab se sort karna (sabse qareeb pehle), calendar_id
+        -- barabar doori walon ka order fix karta hai
+        ORDER BY distance ASC, calendar_id ASC
+        ${limitClause}
+      ) page
+      JOIN calendar_day cd ON cd.calendar_id = page.calendar_id
+      JOIN users u ON u.user_id = page.user_id
+      ORDER BY page.distance ASC, page.calendar_id ASC;
     `
     try {
-      const { rows } = await pool.query(query, [
-        date,
-        loggedInUserId,
-        loggedInUserLat,
-        loggedInUserLon,
-      ])
-      // ✅ Yahan hum har row ko format kar rahe hain, distance ko string bana rahe hain
-      return rows.map((row) => ({
-        ...row,
-        calendarId: parseInt(row.calendarId, 10),
-        date: moment(row.date).format('YYYY-MM-DD'),
-        userName: (row.userName || 'User').trim(),
-        distance: parseFloat(row.distance).toFixed(2), // distance ko format karke bhejna
-      }))
+      const { rows } = await pool.query(query, params)
+      const hasMore = page.limit !== null && rows.length > page.limit
+      const pageRows = hasMore ? rows.slice(0, page.limit as number) : rows
+      const last = pageRows[pageRows.length - 1]
+      return {
+        // ✅ Yahan hum har row ko format kar rahe hain, distance ko string bana rahe hain
+        stories: pageRows.map((row) => ({
+          ...row,
+          calendarId: parseInt(row.calendarId, 10),
+          date: moment(row.date).format('YYYY-MM-DD'),
+          userName: (row.userName || 'User').trim(),
+          distance: parseFloat(row.distance).toFixed(2), // distance ko format karke bhejna
+        })),
+        nextCursor: hasMore
+          ? { distance: parseFloat(last.distance), calendarId: parseInt(last.calendarId, 10) }
+          : null,
+      }
     } catch (error) {
       console.error('Error in findNearbyStoriesByDate:', error)
       return null
@@ -84,7 +170,7 @@ class CalendarDayRepository {
   }
 
   async getCalendarDayById(calendarId: number): Promise<CalendarDay | null> {
-    const query = `SELECT * FROM calendar_day WHERE calendar_id = $1`
+    const query = `SELECT ${CALENDAR_DAY_COLUMNS} FROM calendar_day WHERE calendar_id = $1`
     try {
       const { rows } = await pool.query(query, [calendarId])
       if (rows.length === 0) return null
@@ -110,6 +196,16 @@ class CalendarDayRepository {
 
     if (fieldsToUpdate.length === 0) return true
 
+    // New or re-processed video: the stored link points at the old file, the refresher
+    // fetches a new one once processing is complete
+    if (updateData.vimeoUri !== undefined || updateData.processingStatus !== undefined) {
+      fieldsToUpdate.push(
+        'playable_url = NULL',
+        'playable_url_expires_at = NULL',
+        'playable_url_refreshing_until = NULL',
+      )
+    }
+
     fieldsToUpdate.push(`updated_at = CURRENT_TIMESTAMP`)
     values.push(calendarId)
     const query = `UPDATE calendar_day SET ${fieldsToUpdate.join(
@@ -125,6 +221,57 @@ class CalendarDayRepository {
     }
   }
 
+  // Claims up to `batchSize` finished videos from the last `recentDays` days whose link is
+  // missing or expires before `refreshBefore`, soonest first, by setting
+  // playable_url_refreshing_until `leaseMs` ahead. It is a single statement, so it commits on its
+  // own: no locks or connection are held while the caller asks Vimeo, and other server instances
+  // skip the claimed rows until the lease runs out.
+  async claimPlayableUrlsToRefresh(
+    refreshBefore: Date,
+    recentDays: number,
+    batchSize: number,
+    leaseMs: number,
+  ): Promise<PlayableUrlRefreshTarget[]> {
+    const query = `
+      UPDATE calendar_day
+      SET playable_url_refreshing_until = NOW() + $4 * INTERVAL '1 millisecond'
+      WHERE calendar_id IN (
+        SELECT calendar_id
+        FROM calendar_day
+        WHERE processing_status = 'complete'
+          AND vimeo_uri IS NOT NULL
+          AND (playable_url_expires_at IS NULL OR playable_url_expires_at < $1)
+          AND (playable_url_refreshing_until IS NULL OR playable_url_refreshing_until < NOW())
+          AND date >= CURRENT_DATE - $2::int
+        ORDER BY playable_url_expires_at NULLS FIRST
+        LIMIT $3
+        FOR UPDATE SKIP LOCKED
+      )
+      RETURNING calendar_id AS "calendarId", vimeo_uri AS "vimeoUri"
+    `
+    const { rows } = await pool.query(query, [refreshBefore, recentDays, batchSize, leaseMs])
+    return rows
+  }
+
+  // Stores fetched links and releases their claim. Rows whose claim was cleared in the meantime
+  // (updateCalendarDay changed the video) are left alone, the link would be for the old file.
+  async savePlayableUrls(updates: PlayableUrlUpdate[]): Promise<number> {
+    if (updates.length === 0) return 0
+    const query = `
+      UPDATE calendar_day cd
+      SET playable_url = u.playable_url, playable_url_expires_at = u.expires_at,
+          playable_url_refreshing_until = NULL
+      FROM unnest($1::int[], $2::text[], $3::timestamptz[]) AS u(calendar_id, playable_url, expires_at)
+      WHERE cd.calendar_id = u.calendar_id AND cd.playable_url_refreshing_until IS NOT NULL
+    `
+    const { rowCount } = await pool.query(query, [
+      updates.map((u) => u.calendarId),
+      updates.map((u) => u.playableUrl),
+      updates.map((u) => u.expiresAt),
+    ])
+    return rowCount ?? 0
+  }
+
   async getCalendarDayVideosByDateAndZipCode(
     date: string,
     zipcodeList: string[],
@@ -143,7 +290,7 @@ class CalendarDayRepository {
   }
 
   async createCalendarDay(calendarDay: CreateCalendarDay): Promise<CalendarDay | null> {
-    const query = `INSERT INTO calendar_day (user_id, date, user_video_url) VALUES ($1, $2, $3) RETURNING *`
+    const query = `INSERT INTO calendar_day (user_id, date, user_video_url) VALUES ($1, $2, $3) RETURNING ${CALENDAR_DAY_COLUMNS}`
     try {
       const { rows } = await pool.query(query, [
         calendarDay.userId,
@@ -158,7 +305,7 @@ class CalendarDayRepository {
   }
 
   async getCalendarDaysByUserId(userId: string): Promise<CalendarDay[]> {
-    const query = `SELECT * FROM calendar_day WHERE user_id = $1 ORDER BY date DESC`
+    const query = `SELECT ${CALENDAR_DAY_COLUMNS} FROM calendar_day WHERE user_id = $1 ORDER BY date DESC`
     try {
       const { rows } = await pool.query(query, [userId])
       return rows.map((row) => humps.camelizeKeys(row) as CalendarDay)
@@ -169,7 +316,7 @@ class CalendarDayRepository {
   }
 
   async getCalendarDayByUserIdAndDate(userId: string, date: string): Promise<CalendarDay | null> {
-    const query = `SELECT * FROM calendar_day WHERE user_id = $1 AND date::date = $2::date`
+    const query = `SELECT ${CALENDAR_DAY_COLUMNS} FROM calendar_day WHERE user_id = $1 AND date::date = $2::date`
     try {
       const { rows } = await pool.query(query, [userId, date])
       if (rows.length === 0) return null
@@ -28,6 +28,7 @@ const mapRowToUser = (row: any): User | null => {
     referralSource: camelizedDbRow.referralSource,
     latitude: camelizedDbRow.latitude,
     longitude: camelizedDbRow.longitude,
+    geoCell: camelizedDbRow.geoCell,
     hasSeenCalendarTutorial: !!camelizedDbRow.hasSeenCalendarTutorial, // ✅ NAYI PROPERTY
   }
 }
@@ -43,11 +44,12 @@ class UserRepository {
       'tokens',
       'latitude',
       'longitude',
+      'geo_cell',
       'enable_notifications',
       'is_profile_complete',
       'has_seen_calendar_tutorial', // ✅ NAYI PROPERTY
     ]
-    const placeholders = ['$1', '$2', '$3', '$4', '$5', '$6', '$7', '$8', '$9', '$10', '$11'] // ✅ NAYI PROPERTY
+    const placeholders = columns.map((_, i) => `$${i + 1}`)
     const values = [
       userData.userId,
       userData.email,
@@ -57,6 +59,7 @@ class UserRepository {
       userData.tokens,
       userData.latitude,
       userData.longitude,
+      userData.geoCell ?? null,
       userData.enableNotifications ?? true,
       userData.is_profile_complete ?? false,
       false, // ✅ NAYI PROPERTY: Default to false for new users
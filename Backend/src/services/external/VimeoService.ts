@@ -2,6 +2,7 @@
 import fs from 'fs'
 import path from 'path'
 import client from '../../vimeo' // Corrected path assuming vimeo.ts is in config folder
+import ExpiringCache, { Expiring } from '../../expiringCache'
 
 // Interfaces
 interface VimeoFileLink {
@@ -42,6 +43,15 @@ interface VimeoLinkResponse {
   link?: string
 }
 
+// Vimeo play links are signed and expire after a few hours. Resolved links are shared by every
+// VimeoService instance until shortly before that, so a hot story costs one API call per expiry
+// window instead of one per view, and concurrent misses for the same video share one call.
+const PLAYABLE_URL_CACHE_SIZE = 5000
+const PLAYABLE_URL_EXPIRY_MARGIN_MS = 5 * 60 * 1000 // Links handed out have at least this long left
+const PLAYABLE_URL_DEFAULT_TTL_MS = 15 * 60 * 1000 // When Vimeo gives no expiry at all
+const PLAYABLE_URL_MISS_TTL_MS = 30 * 1000 // No playable link yet (still transcoding, API error)
+const playableUrlCache = new ExpiringCache<string, string | null>(PLAYABLE_URL_CACHE_SIZE)
+
 type VimeoClientCallback = (
   error: Error | null,
   body: any,
@@ -202,6 +212,16 @@ class VimeoService {
       return null
     }
 
+    const normalizedUri = this.normalizeVideoUri(videoUri)
+    if (!normalizedUri) return null
+    console.log(`VimeoService.getFreshPlayableUrl: Normalized URI to: '${normalizedUri}'`)
+    return playableUrlCache.getOrLoad(normalizedUri, () =>
+      this.resolvePlayableUrl(normalizedUri, videoUri),
+    )
+  }
+
+  // '/videos/ID', 'videos/ID' or 'ID' as '/videos/ID', or null if it is none of those
+  private normalizeVideoUri(videoUri: string): string | null {
     let normalizedUri = videoUri.trim()
     if (normalizedUri.startsWith('/videos/')) {
       const idPart = normalizedUri.substring('/videos/'.length)
@@ -229,14 +249,30 @@ class VimeoService {
       )
       return null
     }
-    console.log(`VimeoService.getFreshPlayableUrl: Normalized URI to: '${normalizedUri}'`)
+    return normalizedUri
+  }
+
+  // For PlayableUrlRefresher: always asks Vimeo (via getVideoMetadata) instead of the cache, and
+  // returns the link with its expiry so it can be stored. The cache is updated as well.
+  async refreshPlayableUrl(videoUri: string): Promise<Expiring<string | null>> {
+    const normalizedUri = this.normalizeVideoUri(videoUri)
+    if (!normalizedUri) return { value: null, expiresAt: Date.now() + PLAYABLE_URL_MISS_TTL_MS }
+    const resolved = await this.resolvePlayableUrl(normalizedUri, videoUri)
+    playableUrlCache.set(normalizedUri, resolved.value, resolved.expiresAt)
+    return resolved
+  }
 
+  // The uncached lookup behind getFreshPlayableUrl: the link plus when it stops being usable
+  private async resolvePlayableUrl(
+    normalizedUri: string,
+    videoUri: string,
+  ): Promise<Expiring<string | null>> {
     const metadata = await this.getVideoMetadata(normalizedUri)
     if (!metadata) {
       console.warn(
         `VimeoService.getFreshPlayableUrl: No metadata found for normalized URI ${normalizedUri} (original: ${videoUri}).`,
       )
-      return null
+      return { value: null, expiresAt: Date.now() + PLAYABLE_URL_MISS_TTL_MS }
     }
 
     // --- CRITICAL LOGGING (Keep this for debugging) ---
@@ -252,14 +288,14 @@ class VimeoService {
       console.log(
         `VimeoService.getFreshPlayableUrl: Video ${normalizedUri} upload not complete (status: ${metadata.upload?.status})`,
       )
-      return null
+      return { value: null, expiresAt: Date.now() + PLAYABLE_URL_MISS_TTL_MS }
     }
 
     if (metadata.transcode?.status !== 'complete') {
       console.log(
         `VimeoService.getFreshPlayableUrl: Video ${normalizedUri} not yet transcoded (status: ${metadata.transcode?.status})`,
       )
-      return null
+      return { value: null, expiresAt: Date.now() + PLAYABLE_URL_MISS_TTL_MS }
     }
 
     let playableUrl: string | null = null
@@ -270,7 +306,7 @@ class VimeoService {
       console.log(
         `VimeoService.getFreshPlayableUrl: Success - Found Progressive MP4 URL from 'play' data for ${normalizedUri}.`,
       )
-      return playableUrl
+      return { value: playableUrl, expiresAt: this.linkExpiresAt(metadata, playableUrl) }
     }
     console.log(
       `VimeoService.getFreshPlayableUrl: Info - No Progressive MP4 URL found in 'play.progressive' for ${normalizedUri}.`,
@@ -283,7 +319,7 @@ class VimeoService {
       console.log(
         `VimeoService.getFreshPlayableUrl: Success - Found HLS URL from 'play.hls' for ${normalizedUri}.`,
       )
-      return playableUrl // This will be an .m3u8 link
+      return { value: playableUrl, expiresAt: this.linkExpiresAt(metadata, playableUrl) } // .m3u8 link
     }
     console.log(
       `VimeoService.getFreshPlayableUrl: Info - No HLS URL found in 'play.hls' for ${normalizedUri}.`,
@@ -301,7 +337,7 @@ class VimeoService {
       console.log(
         `VimeoService.getFreshPlayableUrl: Success - Found MP4 URL from 'files' data (legacy) for ${normalizedUri}.`,
       )
-      return playableUrl
+      return { value: playableUrl, expiresAt: this.linkExpiresAt(metadata, playableUrl) }
     }
     console.log(
       `VimeoService.getFreshPlayableUrl: Info - No MP4 URL found in 'files' data (legacy) for ${normalizedUri}.`,
@@ -311,7 +347,25 @@ class VimeoService {
       // Final error if nothing is found
       `VimeoService.getFreshPlayableUrl: FAILURE - No playable URL (MP4, HLS, or legacy MP4) found for ${normalizedUri}.`,
     )
-    return null
+    return { value: null, expiresAt: Date.now() + PLAYABLE_URL_MISS_TTL_MS }
+  }
+
+  // When a play link stops working: its own `expires`, the HLS link_expiration_time, or the
+  // exp= (epoch seconds) Vimeo signs into the URL, less a margin so clients have time to play it
+  private linkExpiresAt(metadata: VimeoVideoMetadata, link: string): number {
+    const file = [...(metadata.play?.progressive ?? []), ...(metadata.files ?? [])].find(
+      (f) => f.link === link,
+    )
+    const hlsExpires =
+      metadata.play?.hls?.link === link ? metadata.play.hls.link_expiration_time : undefined
+    let expiresAt = Date.parse(file?.expires ?? hlsExpires ?? '')
+    if (Number.isNaN(expiresAt)) {
+      const signedExpiry = /[?&]exp=(\d+)/.exec(link)
+      expiresAt = signedExpiry
+        ? Number(signedExpiry[1]) * 1000
+        : Date.now() + PLAYABLE_URL_DEFAULT_TTL_MS + PLAYABLE_URL_EXPIRY_MARGIN_MS
+    }
+    return expiresAt - PLAYABLE_URL_EXPIRY_MARGIN_MS
   }
 
   async uploadVideo(
@@ -416,6 +470,7 @@ class VimeoService {
     console.log(
       `VimeoService.replaceVideoSource: Replacing source for ${fullVideoPath} with file ${filePath}`,
     )
+    playableUrlCache.delete(fullVideoPath)
 
     return new Promise<{ uri: string; pageLink: string }>((resolve, reject) => {
       client.replace(
@@ -479,6 +534,7 @@ class VimeoService {
     }
     const videoPath = `/videos/${videoId}`
     console.log(`VimeoService.deleteVideo: Attempting to delete video: ${videoPath}`)
+    playableUrlCache.delete(videoPath)
 
     return new Promise<void>((resolve, reject) => {
       const callback: VimeoClientCallback = (error, body, statusCode) => {
@@ -1,12 +1,115 @@
 // File: src/services/external/ZipcodeService.ts
 // ✅ COMPLETE AND FINAL UPDATED CODE
 
+import fs from 'fs'
+import path from 'path'
 import zipcodes from 'zipcodes'
+import LruCache from '../../lruCache'
 
 const MAX_DISTANCE_MILES = 200
+// Built by: python createZipcodeWithinRangesCsv.py --format csr --radii 200 (in dataPreparation/)
+const NEIGHBOR_INDEX_DIR = path.resolve(
+  process.env.ZIPCODE_NEIGHBOR_INDEX_DIR || 'dataPreparation/zipcode_neighbor_index',
+)
+const NEARBY_CACHE_SIZE = 2000
+
+// Precomputed zip-to-zip distances in CSR form (see dataPreparation/zipcodeNeighborIndex.py).
+// Neighbors of row i are indices[offsets[i]..offsets[i + 1]), sorted by distance in miles.
+interface ZipcodeNeighborIndex {
+  maxDistanceMiles: number
+  rows: Map<string, number>
+  zipcodes: string[]
+  offsets: Int32Array
+  indices: Int32Array
+  distances: Float32Array
+}
+
+// Minimal NumPy .npy reader for the little-endian, C-ordered arrays the data-prep script writes
+const readNpy = (filePath: string): { descr: string; data: Buffer } => {
+  const buf = fs.readFileSync(filePath)
+  const major = buf[6]
+  const headerStart = major === 1 ? 10 : 12
+  const headerLength = major === 1 ? buf.readUInt16LE(8) : buf.readUInt32LE(8)
+  const header = buf.toString('latin1', headerStart, headerStart + headerLength)
+  const descr = /'descr':\s*'([^']+)'/.exec(header)?.[1]
+  if (!descr || /'fortran_order':\s*True/.test(header)) {
+    throw new Error(`Unsupported .npy header in ${filePath}: ${header}`)
+  }
+  return { descr, data: buf.subarray(headerStart + headerLength) }
+}
+
+// Typed arrays need an aligned offset, so copy the payload into its own ArrayBuffer
+const alignedCopy = (data: Buffer): ArrayBuffer =>
+  data.buffer.slice(data.byteOffset, data.byteOffset + data.byteLength) as ArrayBuffer
+
+const readNpyNumbers = (filePath: string, expectedDescr: '<i4' | '<f4') => {
+  const { descr, data } = readNpy(filePath)
+  if (descr !== expectedDescr) {
+    throw new Error(`Expected ${expectedDescr} in ${filePath}, found ${descr}`)
+  }
+  return alignedCopy(data)
+}
+
+// Fixed-width numpy strings: '<U5' is UTF-32, '|S5' is one byte per character
+const readNpyStrings = (filePath: string): string[] => {
+  const { descr, data } = readNpy(filePath)
+  const match = /^[<|]([US])(\d+)$/.exec(descr)
+  if (!match) throw new Error(`Expected a string array in ${filePath}, found ${descr}`)
+  const bytesPerChar = match[1] === 'U' ? 4 : 1
+  const itemSize = parseInt(match[2], 10) * bytesPerChar
+  const values: string[] = []
+  for (let offset = 0; offset + itemSize <= data.length; offset += itemSize) {
+    let value = ''
+    for (let c = offset; c < offset + itemSize; c += bytesPerChar) {
+      const code = bytesPerChar === 4 ? data.readUInt32LE(c) : data[c]
+      if (code === 0) break
+      value += String.fromCodePoint(code)
+    }
+    values.push(value)
+  }
+  return values
+}
+
+const loadNeighborIndex = (dir: string): ZipcodeNeighborIndex | null => {
+  if (!fs.existsSync(path.join(dir, 'index.json'))) {
+    console.warn(
+      `[ZipcodeService] No neighbor index at ${dir}. Falling back to zipcodes.radius() lookups.`,
+    )
+    return null
+  }
+  try {
+    const meta = JSON.parse(fs.readFileSync(path.join(dir, 'index.json'), 'utf8'))
+    const zipcodeList = readNpyStrings(path.join(dir, 'zipcodes.npy'))
+    const index: ZipcodeNeighborIndex = {
+      maxDistanceMiles: meta.max_distance_miles,
+      rows: new Map(zipcodeList.map((zip, row) => [zip, row])),
+      zipcodes: zipcodeList,
+      offsets: new Int32Array(readNpyNumbers(path.join(dir, 'offsets.npy'), '<i4')),
+      indices: new Int32Array(readNpyNumbers(path.join(dir, 'indices.npy'), '<i4')),
+      distances: new Float32Array(readNpyNumbers(path.join(dir, 'distances.npy'), '<f4')),
+    }
+    console.log(
+      `[ZipcodeService] Loaded neighbor index: ${zipcodeList.length} zipcodes, ${index.indices.length} pairs within ${index.maxDistanceMiles} miles.`,
+    )
+    return index
+  } catch (error) {
+    console.error(`[ZipcodeService] Failed to load neighbor index from ${dir}:`, error)
+    return null
+  }
+}
+
+// Loaded once per process and shared by every ZipcodeService instance
+let neighborIndex: ZipcodeNeighborIndex | null | undefined
+const nearbyCache = new LruCache<string, string[]>(NEARBY_CACHE_SIZE)
+
+const getNeighborIndex = (): ZipcodeNeighborIndex | null => {
+  if (neighborIndex === undefined) neighborIndex = loadNeighborIndex(NEIGHBOR_INDEX_DIR)
+  return neighborIndex
+}
 
 class ZipcodeService {
   constructor() {
+    getNeighborIndex()
     console.log("[ZipcodeService] Ready to use 'zipcodes' functions.")
   }
 
@@ -33,23 +136,63 @@ class ZipcodeService {
 
   // Yeh function ab stories ke liye use nahi hoga, lekin ho sakta hai kahin aur use ho raha ho,
   // isliye isko rakha hai.
-  async findNearbyZipcodes(sourceZipcode: string): Promise<string[]> {
+  async findNearbyZipcodes(
+    sourceZipcode: string,
+    maxDistanceMiles: number = MAX_DISTANCE_MILES,
+  ): Promise<string[]> {
+    const cacheKey = `${sourceZipcode}:${maxDistanceMiles}`
+    // Callers get their own copy, so one that sorts or pushes into the list can't change the
+    // cached entry for everyone else
+    const cached = nearbyCache.get(cacheKey)
+    if (cached) return [...cached]
+
     try {
-      const nearbyZipsRaw = zipcodes.radius(sourceZipcode, MAX_DISTANCE_MILES) || []
-      const nearbyZips: string[] = nearbyZipsRaw.map((z: any) =>
-        typeof z === 'string' ? z : z.zip,
-      )
+      const nearbyZips =
+        this.findNearbyZipcodesInIndex(sourceZipcode, maxDistanceMiles) ??
+        this.findNearbyZipcodesByScan(sourceZipcode, maxDistanceMiles)
 
       if (!nearbyZips.includes(sourceZipcode)) {
         nearbyZips.push(sourceZipcode)
       }
 
-      return nearbyZips
+      nearbyCache.set(cacheKey, nearbyZips)
+      return [...nearbyZips]
     } catch (error) {
       console.error(`[ZipcodeService] Error finding nearby zipcodes for ${sourceZipcode}:`, error)
       return [sourceZipcode]
     }
   }
+
+  // Slice of the precomputed table, or null if the index can't answer this lookup
+  private findNearbyZipcodesInIndex(
+    sourceZipcode: string,
+    maxDistanceMiles: number,
+  ): string[] | null {
+    const index = getNeighborIndex()
+    if (!index || maxDistanceMiles > index.maxDistanceMiles) return null
+    const row = index.rows.get(sourceZipcode)
+    if (row === undefined) return null
+
+    // Neighbors are sorted by distance, so binary search for the radius cut-off
+    const start = index.offsets[row]
+    let low = start
+    let high = index.offsets[row + 1]
+    while (low < high) {
+      const mid = (low + high) >>> 1
+      if (index.distances[mid] <= maxDistanceMiles) low = mid + 1
+      else high = mid
+    }
+
+    const nearbyZips: string[] = []
+    for (let i = start; i < low; i++) nearbyZips.push(index.zipcodes[index.indices[i]])
+    return nearbyZips
+  }
+
+  // Linear scan over every US zipcode, only used when the index is missing or too small
+  private findNearbyZipcodesByScan(sourceZipcode: string, maxDistanceMiles: number): string[] {
+    const nearbyZipsRaw = zipcodes.radius(sourceZipcode, maxDistanceMiles) || []
+    return nearbyZipsRaw.map((z: any) => (typeof z === 'string' ? z : z.zip))
+  }
 }
 
 export default ZipcodeService
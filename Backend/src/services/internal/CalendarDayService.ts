@@ -7,11 +7,49 @@ import {
   UpdateCalendarDay,
   NearbyVideoData,
   StoryQueryResultWithUrl,
+  StoryCursor,
+  StoryPage,
+  StoryPageRequest,
 } from '../../types/CalendarDay'
 
 import CalendarDayRepository from '../../repository/CalendarDayRepository'
 import VimeoService from '../external/VimeoService'
 import UserService from './UserService' // ZipcodeService ki ab yahan zaroorat nahi
+import { createLimiter, mapWithDeadline } from '../../concurrency'
+import { readPositiveInt } from '../../env'
+
+// Story feed URL lookups: at most this many Vimeo calls in flight across all feed requests in
+// the process, and the feed is returned after the deadline even if some URLs are still missing
+// (those stories get playableUrl null and a retry hint instead of holding up the rest). Calls
+// already in flight finish into the cache; lookups that never got a slot are dropped, and past
+// STORY_URL_MAX_QUEUED waiting lookups new ones are not queued at all, so a busy date can't
+// leave a backlog for the requests after it.
+const STORY_URL_CONCURRENCY = readPositiveInt('STORY_URL_CONCURRENCY', 8)
+const STORY_URL_MAX_QUEUED = readPositiveInt('STORY_URL_MAX_QUEUED', 100)
+const STORY_URL_DEADLINE_MS = readPositiveInt('STORY_URL_DEADLINE_MS', 1500)
+const STORY_URL_RETRY_AFTER_MS = readPositiveInt('STORY_URL_RETRY_AFTER_MS', 2000)
+const storyUrlLimiter = createLimiter(STORY_URL_CONCURRENCY, STORY_URL_MAX_QUEUED)
+
+// Feed cursors are opaque to clients: base64url JSON of [distance, calendarId]
+export const encodeStoryCursor = (cursor: StoryCursor): string =>
+  Buffer.from(JSON.stringify([cursor.distance, cursor.calendarId])).toString('base64url')
+
+export const decodeStoryCursor = (value: string): StoryCursor | null => {
+  try {
+    const decoded = JSON.parse(Buffer.from(value, 'base64url').toString('utf8'))
+    if (
+      Array.isArray(decoded) &&
+      decoded.length === 2 &&
+      Number.isFinite(decoded[0]) &&
+      Number.isInteger(decoded[1])
+    ) {
+      return { distance: decoded[0], calendarId: decoded[1] }
+    }
+  } catch (error) {
+    // Not base64 JSON, handled below like any other malformed cursor
+  }
+  return null
+}
 
 class CalendarDayService {
   private calendarDayRepository: CalendarDayRepository
@@ -29,7 +67,8 @@ class CalendarDayService {
   async getStoriesForDateWithFreshUrls(
     date: string,
     loggedInUserId: string,
-  ): Promise<StoryQueryResultWithUrl[] | null> {
+    page: StoryPageRequest = { limit: null, after: null },
+  ): Promise<StoryPage<StoryQueryResultWithUrl> | null> {
     // 1. Logged-in user ka data (aur coordinates) check karein
     const loggedInUser = await this.userService.getUserById(loggedInUserId)
 
@@ -37,28 +76,32 @@ class CalendarDayService {
       console.warn(
         `[Service:GetStories] CRITICAL: User ${loggedInUserId} has no latitude/longitude. Cannot find nearby stories. Returning empty list.`,
       )
-      return [] // User ke coordinates nahi hain to qareebi stories nahi mil saktin
+      // User ke coordinates nahi hain to qareebi stories nahi mil saktin
+      return { stories: [], nextCursor: null }
     }
 
     // 2. Repository se સીધી (directly) nearby stories fetch karein.
-    // Ab hazaaron zipcodes ki list nahi bhejni.
-    const storiesFromRepo = await this.calendarDayRepository.findNearbyStoriesByDate(
+    // Ab hazaaron zipcodes ki list nahi bhejni. Sirf is page ki stories aati hain, to neeche
+    // URLs bhi sirf inhi ke resolve hote hain.
+    const storiesPage = await this.calendarDayRepository.findNearbyStoriesByDate(
       date,
       loggedInUserId,
       loggedInUser.latitude,
       loggedInUser.longitude,
+      page,
     )
 
-    if (storiesFromRepo === null) {
+    if (storiesPage === null) {
       console.error(`[Service:GetStories] Repository returned null for date: ${date}. DB error.`)
       return null
     }
 
+    const storiesFromRepo = storiesPage.stories
     if (storiesFromRepo.length === 0) {
       console.log(
         `[Service:GetStories] Repository found 0 stories for the given date and location.`,
       )
-      return []
+      return { stories: [], nextCursor: null }
     }
 
     // 3. Block kiye gaye users ko filter karein (yeh pehle se tha, aur zaroori hai)
@@ -66,25 +109,45 @@ class CalendarDayService {
     // lekin agar UI pe block/unblock live karna ho to yeh logic kaam aa sakti hai.
     // Abhi ke liye DB par bharosa karte hain.
 
-    // 4. Videos ke liye fresh URLs fetch karein
-    const storiesWithUrls = await Promise.all(
-      storiesFromRepo.map(async (story) => {
-        let playableUrl: string | null = null
-        if (story.processingStatus === 'complete' && story.vimeoUri) {
-          try {
-            playableUrl = await this.vimeoService.getFreshPlayableUrl(story.vimeoUri)
-          } catch (fetchErr) {
-            console.error(
-              `[Service:GetStories] Error fetching fresh URL for ${story.vimeoUri}:`,
-              fetchErr,
-            )
-          }
+    // 4. Refresher ka rakha hua link SQL se hi aa jata hai. Sirf jin complete videos ka link
+    // nahi hai (naya upload, purani date) unke liye Vimeo call, limited pool aur deadline ke sath.
+    const playable = storiesFromRepo.filter(
+      (story) => !story.playableUrl && story.processingStatus === 'complete' && story.vimeoUri,
+    )
+    const urls = await mapWithDeadline(
+      playable,
+      async (story) => {
+        try {
+          return await this.vimeoService.getFreshPlayableUrl(story.vimeoUri as string)
+        } catch (fetchErr) {
+          console.error(
+            `[Service:GetStories] Error fetching fresh URL for ${story.vimeoUri}:`,
+            fetchErr,
+          )
+          return null
         }
-        return { ...story, playableUrl: playableUrl }
-      }),
+      },
+      { limiter: storyUrlLimiter, deadlineMs: STORY_URL_DEADLINE_MS },
     )
+    const urlByCalendarId = new Map(playable.map((story, i) => [story.calendarId, urls[i]]))
+
+    let pending = 0
+    const storiesWithUrls: StoryQueryResultWithUrl[] = storiesFromRepo.map((story) => {
+      if (!urlByCalendarId.has(story.calendarId)) return story
+      const playableUrl = urlByCalendarId.get(story.calendarId)
+      if (playableUrl === undefined) {
+        pending++
+        return { ...story, playableUrl: null, playableUrlRetryAfterMs: STORY_URL_RETRY_AFTER_MS }
+      }
+      return { ...story, playableUrl }
+    })
+    if (pending > 0) {
+      console.warn(
+        `[Service:GetStories] ${pending} of ${playable.length} story URLs not resolved within ${STORY_URL_DEADLINE_MS}ms for date ${date}, returning them with a retry hint.`,
+      )
+    }
 
-    return storiesWithUrls
+    return { stories: storiesWithUrls, nextCursor: storiesPage.nextCursor }
   }
 
   // --- Baaki sabhi service methods bilkul waise hi rahenge ---
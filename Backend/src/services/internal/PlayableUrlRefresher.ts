@@ -0,0 +1,110 @@
+// File: src/services/internal/PlayableUrlRefresher.ts
+
+import CalendarDayRepository from '../../repository/CalendarDayRepository'
+import VimeoService from '../external/VimeoService'
+import { PlayableUrlUpdate } from '../../types/CalendarDay'
+import { createLimiter, mapWithDeadline } from '../../concurrency'
+import { readPositiveInt } from '../../env'
+
+// Keeps calendar_day.playable_url fresh in the background, so the stories feed serves play links
+// straight from SQL. Every interval it takes finished videos from the last RECENT_DAYS days whose
+// link is missing or expires within WINDOW_MS, a batch at a time, and re-fetches them from Vimeo.
+const REFRESH_INTERVAL_MS = readPositiveInt('PLAYABLE_URL_REFRESH_INTERVAL_MS', 60 * 1000)
+const REFRESH_WINDOW_MS = readPositiveInt('PLAYABLE_URL_REFRESH_WINDOW_MS', 10 * 60 * 1000)
+const REFRESH_RECENT_DAYS = readPositiveInt('PLAYABLE_URL_REFRESH_RECENT_DAYS', 30)
+const REFRESH_BATCH_SIZE = readPositiveInt('PLAYABLE_URL_REFRESH_BATCH_SIZE', 50)
+const REFRESH_CONCURRENCY = readPositiveInt('PLAYABLE_URL_REFRESH_CONCURRENCY', 4)
+const REFRESH_BATCH_DEADLINE_MS = 60 * 1000
+const refreshLimiter = createLimiter(REFRESH_CONCURRENCY, REFRESH_BATCH_SIZE)
+// Claimed rows are skipped by other instances for this long. Longer than the batch deadline, so a
+// claim only runs out early if the process died mid-batch.
+const REFRESH_CLAIM_LEASE_MS = 2 * REFRESH_BATCH_DEADLINE_MS
+const REFRESH_MAX_BATCHES_PER_RUN = 20 // Leaves the rest for the next interval
+// A video Vimeo has no link for is tried again after this, not on every run
+const REFRESH_MISS_RETRY_MS = readPositiveInt('PLAYABLE_URL_REFRESH_MISS_RETRY_MS', 10 * 60 * 1000)
+
+class PlayableUrlRefresher {
+  private calendarDayRepository: CalendarDayRepository
+  private vimeoService: VimeoService
+  private timer: NodeJS.Timeout | null = null
+  private running = false
+
+  constructor() {
+    this.calendarDayRepository = new CalendarDayRepository()
+    this.vimeoService = new VimeoService()
+  }
+
+  start(): void {
+    if (this.timer) return
+    console.log(
+      `[PlayableUrlRefresher] Started: every ${REFRESH_INTERVAL_MS}ms, links expiring within ${REFRESH_WINDOW_MS}ms, batches of ${REFRESH_BATCH_SIZE}.`,
+    )
+    this.timer = setInterval(() => void this.runOnce(), REFRESH_INTERVAL_MS)
+    this.timer.unref() // Doesn't keep the process alive on its own
+    void this.runOnce()
+  }
+
+  stop(): void {
+    if (this.timer) clearInterval(this.timer)
+    this.timer = null
+  }
+
+  // Refreshes batches until nothing is due (or the per-run cap). Returns the rows updated.
+  async runOnce(): Promise<number> {
+    if (this.running) return 0 // Previous run still going
+    this.running = true
+    let refreshed = 0
+    try {
+      for (let batch = 0; batch < REFRESH_MAX_BATCHES_PER_RUN; batch++) {
+        const { due, updated, stillDue } = await this.refreshBatch()
+        refreshed += updated
+        // A full batch means more may be waiting, unless some rows came back due again (short
+        // lived links, timeouts): the next batch would just pick those up again
+        if (due < REFRESH_BATCH_SIZE || stillDue > 0) break
+      }
+      if (refreshed > 0) console.log(`[PlayableUrlRefresher] Refreshed ${refreshed} playable URLs.`)
+    } catch (error) {
+      console.error('[PlayableUrlRefresher] Refresh run failed:', error)
+    } finally {
+      this.running = false
+    }
+    return refreshed
+  }
+
+  // Claim (short commit), ask Vimeo with no transaction or connection held, then save
+  private async refreshBatch(): Promise<{ due: number; updated: number; stillDue: number }> {
+    const targets = await this.calendarDayRepository.claimPlayableUrlsToRefresh(
+      new Date(Date.now() + REFRESH_WINDOW_MS),
+      REFRESH_RECENT_DAYS,
+      REFRESH_BATCH_SIZE,
+      REFRESH_CLAIM_LEASE_MS,
+    )
+    const results = await mapWithDeadline(
+      targets,
+      (target) => this.vimeoService.refreshPlayableUrl(target.vimeoUri),
+      { limiter: refreshLimiter, deadlineMs: REFRESH_BATCH_DEADLINE_MS },
+    )
+
+    const refreshBefore = Date.now() + REFRESH_WINDOW_MS
+    const updates: PlayableUrlUpdate[] = []
+    let stillDue = 0
+    targets.forEach((target, i) => {
+      const result = results[i]
+      if (result === undefined || (result.value !== null && result.expiresAt < refreshBefore)) {
+        stillDue++
+      }
+      if (result === undefined) return // Timed out, picked up again once the claim runs out
+      const expiresAt =
+        result.value === null ? refreshBefore + REFRESH_MISS_RETRY_MS : result.expiresAt
+      updates.push({
+        calendarId: target.calendarId,
+        playableUrl: result.value,
+        expiresAt: new Date(expiresAt),
+      })
+    })
+    const updated = await this.calendarDayRepository.savePlayableUrls(updates)
+    return { due: targets.length, updated, stillDue }
+  }
+}
+
+export default PlayableUrlRefresher
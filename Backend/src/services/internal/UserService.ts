@@ -4,6 +4,7 @@
 import { User, CreateUserInternalData, UpdateUserPayload } from '../../types/User'
 import UserRepository from '../../repository/UserRepository'
 import ZipcodeService from '../external/ZipcodeService'
+import { encodeGeoCell } from '../../geoCell'
 import { PoolClient } from 'pg'
 
 const MONTHLY_REPLENISH_AMOUNT = 100
@@ -47,12 +48,14 @@ class UserService {
           console.log(`[UserService.updateUser] Found new coordinates:`, coords)
           updateData.latitude = coords.latitude
           updateData.longitude = coords.longitude
+          updateData.geoCell = encodeGeoCell(coords.latitude, coords.longitude)
         } else {
           console.warn(
             `[UserService.updateUser] Could not find coordinates for zipcode ${updateData.zipcode}. Lat/Lon will be set to null.`,
           )
           updateData.latitude = null
           updateData.longitude = null
+          updateData.geoCell = null
         }
       }
     }
@@ -92,6 +95,7 @@ class UserService {
       is_profile_complete: false,
       latitude,
       longitude,
+      geoCell: latitude !== null && longitude !== null ? encodeGeoCell(latitude, longitude) : null,
       // hasSeenCalendarTutorial will be set to false by default in the repository
     }
 
@@ -0,0 +1,76 @@
+// File: src/trafficCapture.ts
+
+import fs from 'fs'
+import { Response, NextFunction } from 'express'
+import { CustomRequest } from './middleware'
+
+// Opt-in traffic recording for replay (__tests__/replayTraffic.py). With TRAFFIC_CAPTURE_FILE
+// set, every /api request is appended to that file as one JSON line once its response is done:
+//   {"ts": 1718000000123, "method": "GET", "path": "/api/stories/2024-06-10", "body": null,
+//    "user": "auth0|abc", "status": 200, "durationMs": 41.7}
+// ts is epoch milliseconds at arrival. Multipart bodies (uploads) are not recorded.
+// Credentials never reach the file: headers (Authorization, x-cron-secret) aren't recorded, replay
+// authenticates as `user` instead, and body fields named like SENSITIVE_KEYS are redacted.
+export const TRAFFIC_CAPTURE_FILE = process.env.TRAFFIC_CAPTURE_FILE
+
+const SENSITIVE_KEYS = new Set(['authorization', 'password', 'secret', 'token'])
+const REDACTED = '[REDACTED]'
+
+const redact = (value: unknown): unknown => {
+  if (Array.isArray(value)) return value.map(redact)
+  if (value && typeof value === 'object') {
+    return Object.fromEntries(
+      Object.entries(value).map(([key, field]) => [
+        key,
+        SENSITIVE_KEYS.has(key.toLowerCase()) ? REDACTED : redact(field),
+      ]),
+    )
+  }
+  return value
+}
+
+export interface CapturedRequest {
+  ts: number
+  method: string
+  path: string
+  body: unknown
+  user: string | null
+  status: number
+  durationMs: number
+}
+
+let captureStream: fs.WriteStream | null = null
+// Set once the capture file fails: later requests skip capture instead of writing to a dead stream
+let captureDisabled = false
+
+const getCaptureStream = (): fs.WriteStream => {
+  if (!captureStream) {
+    captureStream = fs.createWriteStream(TRAFFIC_CAPTURE_FILE as string, { flags: 'a' })
+    captureStream.on('error', (err) => {
+      console.error('[TrafficCapture] Could not write capture file, capture stopped:', err)
+      captureDisabled = true
+      captureStream = null
+    })
+  }
+  return captureStream
+}
+
+export const captureTraffic = (req: CustomRequest, res: Response, next: NextFunction) => {
+  if (captureDisabled) return next()
+  const ts = Date.now()
+  const start = process.hrtime.bigint()
+  res.on('finish', () => {
+    const isJson = req.is('application/json') || req.is('application/x-www-form-urlencoded')
+    const entry: CapturedRequest = {
+      ts,
+      method: req.method,
+      path: req.originalUrl,
+      body: isJson && req.body && Object.keys(req.body).length > 0 ? redact(req.body) : null,
+      user: req.userId ?? null,
+      status: res.statusCode,
+      durationMs: Number(process.hrtime.bigint() - start) / 1e6,
+    }
+    if (!captureDisabled) getCaptureStream().write(JSON.stringify(entry) + '\n')
+  })
+  next()
+}
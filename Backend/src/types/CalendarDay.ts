@@ -11,6 +11,10 @@ export interface CalendarDay {
   userVideoUrl: string | null
   vimeoUri: string | null
   processingStatus: VideoProcessingStatus
+  // Kept fresh by PlayableUrlRefresher. The general calendar_day queries don't select these
+  // (signed links are only handed out through the stories feed), so they are usually absent.
+  playableUrl?: string | null
+  playableUrlExpiresAt?: Date | null
 }
 
 // For creating a new entry
@@ -27,6 +31,18 @@ export interface UpdateCalendarDay {
   processingStatus?: VideoProcessingStatus
 }
 
+// A finished video whose stored playable link is missing or about to expire
+export interface PlayableUrlRefreshTarget {
+  calendarId: number
+  vimeoUri: string
+}
+
+export interface PlayableUrlUpdate {
+  calendarId: number
+  playableUrl: string | null
+  expiresAt: Date
+}
+
 // For nearby videos feature
 export interface NearbyVideoData {
   userId: string
@@ -45,9 +61,32 @@ export interface StoryQueryResult {
   processingStatus: VideoProcessingStatus
   isBlocked: boolean // ✅ NAYI PROPERTY: Blocked users ko filter karne ke liye.
   zipcode?: string // ✅ NAYI PROPERTY: Distance ke hisab se sort karne ke liye.
+  playableUrl: string | null // Stored link, null when there is none or it has expired
+}
+
+// Position in the stories feed, which is ordered by (distance, calendarId). `distance` is the
+// unrounded value from the query, so the next page starts exactly after the last row.
+export interface StoryCursor {
+  distance: number
+  calendarId: number
+}
+
+// limit null means the whole feed in one go (clients that don't page yet)
+export interface StoryPageRequest {
+  limit: number | null
+  after: StoryCursor | null
+}
+
+export interface StoryPage<T> {
+  stories: T[]
+  nextCursor: StoryCursor | null // null on the last page
 }
 
 // Final type with fresh playable URL for the frontend
 export interface StoryQueryResultWithUrl extends StoryQueryResult {
   playableUrl: string | null
+  // Set when the URL didn't resolve within the request deadline. A lookup that had already
+  // started keeps running and fills the URL cache, so fetching again after this many ms
+  // usually finds it; lookups still queued at the deadline are dropped and retried then
+  playableUrlRetryAfterMs?: number
 }
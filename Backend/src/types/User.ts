@@ -21,6 +21,7 @@ export interface User {
   referralSource?: string | null
   latitude?: number | null
   longitude?: number | null
+  geoCell?: string | null
   hasSeenCalendarTutorial: boolean // ✅ NAYI PROPERTY
 }
 
@@ -39,6 +40,7 @@ export interface UpdateUserPayload {
   tokens?: number
   latitude?: number | null
   longitude?: number | null
+  geoCell?: string | null
   hasSeenCalendarTutorial?: boolean // ✅ NAYI PROPERTY
 }
 